@@ -1,44 +1,38 @@
-```python
-import paramiko
 import os
 
-def fetch_failed_auth_logs(hostname, username, password):
+from my_queen.ssh_pool import default_pool
+from my_queen.remote_stream import exec_blocks, TransferStats
+
+def fetch_failed_auth_logs(hostname, username, password, pool=None, compression=None):
     # Create the PAM_test directory if it doesn't exist
     os.makedirs('PAM_test', exist_ok=True)
     
-    # SSH client setup
-    client = paramiko.SSHClient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    # SSH sessions come from the shared pool
+    pool = pool or default_pool
     
     try:
-        # Connect to the Raspberry Pi
-        client.connect(hostname, username=username, password=password)
-        
-        # Command to grep failed PAM authentication logs
-        command = "grep 'authentication failure' /var/log/auth.log"
-        
-        # Execute the command
-        stdin, stdout, stderr = client.exec_command(command)
-        
-        # Read the output
-        failed_auth_logs = stdout.read().decode()
-        
-        # Write the output to a file in PAM_test directory
-        with open('PAM_test/failed_auth_logs.txt', 'w') as f:
-            f.write(failed_auth_logs)
+        # Borrow a session to the Raspberry Pi
+        with pool.session(hostname, username, password) as client:
+            # Command to grep failed PAM authentication logs
+            command = "grep 'authentication failure' /var/log/auth.log"
+            
+            # Stream the output to a file in PAM_test directory as it arrives
+            stats = TransferStats()
+            with open('PAM_test/failed_auth_logs.txt', 'wb') as f:
+                for block in exec_blocks(client, command, compression=compression, stats=stats):
+                    f.write(block)
         
         print("Failed authentication logs have been written to PAM_test/failed_auth_logs.txt")
+        print(f"{stats.wire_bytes} bytes transferred for {stats.bytes} bytes of log ({stats.ratio:.1f}x)")
     
     except Exception as e:
         print(f"An error occurred: {e}")
-    
-    finally:
-        client.close()
 
 # Example usage
 if __name__ == "__main__":
+    # Run from the repository root so my_queen is importable: python -m PAM_test.ssh_pam_auth_log_api
     HOSTNAME = "your_raspberry_pi_ip"
     USERNAME = "your_username"
     PASSWORD = "your_password"
     
-    fetch_failed_auth_logs(HOSTNAME, USERNAME, PASSWORD)
\ No newline at end of file
+    fetch_failed_auth_logs(HOSTNAME, USERNAME, PASSWORD)
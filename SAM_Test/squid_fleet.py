@@ -0,0 +1,174 @@
+import os
+import sys
+import json
+import time
+import heapq
+import argparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from my_queen.ssh_pool import SSHSessionPool
+from my_queen.remote_stream import TransferStats
+from my_queen.squid_parser import record_epoch
+from SAM_Test.squid_log_api_wrapper import SquidLogAPI
+
+
+def load_inventory(path):
+    """List of proxies from a JSON file: [{"hostname", "port", "username", "password", "log_file_path"}, ...]."""
+    with open(path, 'r') as f:
+        inventory = json.load(f)
+    for proxy in inventory:
+        proxy.setdefault('port', 22)
+        proxy.setdefault('log_file_path', '/var/log/squid/access.log')
+    return inventory
+
+
+class SquidFleetCollector:
+    """Fetches POST requests from many Squid proxies at once.
+
+    Every proxy is polled on a bounded thread pool, so a poll takes about as
+    long as the slowest proxy rather than the sum of all of them. A proxy
+    that has not answered `timeout` seconds after its fetch started is
+    reported as timed out and left behind (its stalled read also fails
+    after `timeout`); the other results are still returned. Records get a
+    "proxy" field and are merged into one stream ordered by request time.
+    Without `pool` the collector opens its own SSHSessionPool with room for
+    one session per proxy, so every poll reuses the connections of the last.
+
+    With `new_only`, a proxy's cursor is only moved and saved here, once its
+    result has been accepted. A timed-out read therefore leaves the cursor
+    alone, and its lines are read again by the next fetch. A proxy whose
+    previous fetch is still running is skipped until that fetch has ended.
+    """
+
+    def __init__(self, inventory, max_workers=16, timeout=30, pool=None, cursor_state_dir=None,
+                 compression=None, correlation=None):
+        self.timeout = timeout
+        # Optional IPCorrelationIndex every fetched record is pushed into
+        self.correlation = correlation
+        self.max_workers = max_workers
+        self._running = {}   # name -> future of a fetch that may still be running
+        # One session per proxy stays open between polls; the shared default
+        # pool is too small for a large fleet and would keep re-handshaking
+        self.pool = pool or SSHSessionPool(max_sessions=max(len(inventory), max_workers, 1))
+        self.apis = {}
+        for proxy in inventory:
+            name = proxy.get('name') or proxy['hostname']
+            state_file = os.path.join(cursor_state_dir, f"{name}.cursor.json") if cursor_state_dir else None
+            self.apis[name] = SquidLogAPI(proxy['hostname'], proxy['port'], proxy['username'],
+                                          proxy.get('password'), proxy['log_file_path'],
+                                          pool=self.pool, cursor_state_file=state_file, timeout=timeout,
+                                          compression=proxy.get('compression', compression))
+
+    def fetch(self, new_only=False, count=100):
+        """Returns {"logs": [...], "hosts": {name: {...}}, "errors": {name: message}}.
+
+        With a correlation index, "correlations" holds the matches the new
+        records produced.
+        """
+        started = {}
+        results, hosts, errors = {}, {}, {}
+
+        def run(name, api):
+            started[name] = time.monotonic()
+            api.transfer_stats = TransferStats()
+            api.cursor.stats = api.transfer_stats
+            if new_only:
+                # The cursor is moved below, only if this result is accepted
+                return api.read_new_post_requests()
+            return api.get_last_post_requests(count), None
+
+        apis = {}
+        for name, api in self.apis.items():
+            previous = self._running.get(name)
+            if previous is not None and not previous.done():
+                # A stalled fetch from an earlier call still owns this api and its cursor
+                errors[name] = "previous fetch still running"
+                hosts[name] = {"status": "busy", "elapsed": 0.0, "count": 0}
+                continue
+            apis[name] = api
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(apis)) or 1)
+        futures = {executor.submit(run, name, api): name for name, api in apis.items()}
+        for future, name in futures.items():
+            self._running[name] = future
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=self._next_deadline(pending, futures, started),
+                                     return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = futures[future]
+                    elapsed = time.monotonic() - started[name]
+                    try:
+                        logs, position = future.result()
+                    except Exception as e:
+                        logs, position = {"error": str(e)}, None
+                    if isinstance(logs, dict):
+                        errors[name] = logs["error"]
+                        hosts[name] = {"status": "error", "elapsed": elapsed, "count": 0}
+                        continue
+                    if position is not None:
+                        cursor = self.apis[name].cursor
+                        cursor.advance(position)
+                        cursor.save()
+                    for log in logs:
+                        log["proxy"] = name
+                    results[name] = logs
+                    hosts[name] = {"status": "ok", "elapsed": elapsed, "count": len(logs),
+                                   "transfer": self.apis[name].transfer_stats.to_dict()}
+
+                now = time.monotonic()
+                for future in [f for f in pending if futures[f] in started
+                               and now - started[futures[f]] >= self.timeout]:
+                    name = futures[future]
+                    pending.discard(future)
+                    errors[name] = f"timed out after {self.timeout}s"
+                    hosts[name] = {"status": "timeout", "elapsed": now - started[name], "count": 0}
+        finally:
+            # Do not wait for hosts that timed out
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        merged = list(heapq.merge(*(sorted(logs, key=record_epoch) for logs in results.values()), key=record_epoch))
+        result = {"logs": merged, "hosts": hosts, "errors": errors}
+        if self.correlation is not None:
+            result["correlations"] = self.correlation.add_squid_records(merged)
+        return result
+
+    def _next_deadline(self, pending, futures, started):
+        now = time.monotonic()
+        remaining = [self.timeout - (now - started[futures[f]]) for f in pending if futures[f] in started]
+        # Hosts still queued behind the pool have no deadline yet; check again shortly
+        if len(remaining) < len(pending):
+            remaining.append(0.5)
+        return max(0.0, min(remaining))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Poll POST requests from many Squid proxies concurrently.')
+    parser.add_argument('inventory', help='JSON list of proxies')
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--count', type=int, default=100, help='tail length when not using --new')
+    parser.add_argument('--new', action='store_true', help='only entries appended since the previous poll')
+    parser.add_argument('--cursor-dir', help='where --new keeps each proxy\'s read position')
+    parser.add_argument('--compression', choices=['gzip', 'zstd'], help='compress log data on the proxies')
+    args = parser.parse_args()
+
+    collector = SquidFleetCollector(load_inventory(args.inventory), max_workers=args.workers,
+                                    timeout=args.timeout, cursor_state_dir=args.cursor_dir,
+                                    compression=args.compression)
+    result = collector.fetch(new_only=args.new, count=args.count)
+    for log in result["logs"]:
+        print(json.dumps(log))
+    for name, host in sorted(result["hosts"].items()):
+        if "transfer" in host:
+            transfer = host["transfer"]
+            print(f"{name}: {transfer['wire_bytes']} bytes on the wire, {transfer['bytes']} decompressed "
+                  f"({transfer['ratio']}x)", file=sys.stderr)
+    for name, error in sorted(result["errors"].items()):
+        print(f"{name}: {error}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    # Run from the repository root so my_queen is importable: python -m SAM_Test.squid_fleet
+    main()
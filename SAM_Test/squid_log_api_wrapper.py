@@ -1,52 +1,82 @@
-```python
-import paramiko
-import re
+from my_queen.ssh_pool import default_pool
+from my_queen.remote_cursor import RemoteFileCursor
+from my_queen.remote_stream import exec_blocks, TransferStats
+from my_queen.squid_parser import SquidLogParser
 
 class SquidLogAPI:
-    def __init__(self, hostname, port, username, password, log_file_path):
+    def __init__(self, hostname, port, username, password, log_file_path, pool=None,
+                 cursor_state_file=None, timeout=None, compression=None):
         self.hostname = hostname
         self.port = port
         self.username = username
         self.password = password
         self.log_file_path = log_file_path
+        # Seconds a remote read may stall before it fails (None waits forever)
+        self.timeout = timeout
+        # SSH sessions are borrowed from a shared pool instead of a new handshake per call
+        self.pool = pool or default_pool
+        # 'gzip' or 'zstd' compresses remote output before it crosses the link;
+        # transfer_stats adds up the bytes on the wire and after decompression
+        self.compression = compression
+        self.transfer_stats = TransferStats()
+        # Position in the remote log for get_new_post_requests
+        self.cursor = RemoteFileCursor(log_file_path, state_file=cursor_state_file,
+                                       compression=compression, stats=self.transfer_stats)
+        # Native or combined format, detected from the log itself
+        self.parser = SquidLogParser(methods=['POST'])
 
     def get_last_post_requests(self, count=100):
         try:
-            # Create an SSH client
-            ssh = paramiko.SSHClient()
-            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            ssh.connect(self.hostname, port=self.port, username=self.username, password=self.password)
+            return list(self.iter_last_post_requests(count))
 
+        except Exception as e:
+            return {"error": str(e)}
+
+    def iter_last_post_requests(self, count=100):
+        """Yields parsed POST requests as the remote output arrives."""
+        with self.pool.session(self.hostname, self.username, self.password, port=self.port) as ssh:
             # Command to get the last 'count' POST requests with response in the 200 range
-            command = f"tail -n {count} {self.log_file_path} | grep 'POST' | grep ' 200 '"
-            stdin, stdout, stderr = ssh.exec_command(command)
+            # (' 200 ' in combined logs, 'TCP_MISS/200 ' in native ones)
+            command = f"tail -n {count} {self.log_file_path} | grep 'POST' | grep -E '[ /]200 '"
+            for block in exec_blocks(ssh, command, timeout=self.timeout,
+                                     compression=self.compression, stats=self.transfer_stats):
+                yield from self.process_log_output(block)
 
-            # Read the output
-            output = stdout.read().decode('utf-8')
-            ssh.close()
+    def get_new_post_requests(self, status='200'):
+        """POST requests appended to the log since the previous call.
 
-            # Process the output
-            return self.process_log_output(output)
+        Only the new bytes are read over SFTP and filtered here, so every
+        line is returned exactly once, across log rotation too.
+        """
+        try:
+            logs, position = self.read_new_post_requests(status)
+            self.cursor.advance(position)
+            self.cursor.save()
+            return logs
 
         except Exception as e:
             return {"error": str(e)}
 
+    def read_new_post_requests(self, status='200'):
+        """(logs, position) of the new POST requests; the cursor is not moved.
+
+        The caller passes `position` to `cursor.advance()` and saves the
+        cursor once it has accepted the logs. Errors are raised.
+        """
+        with self.pool.session(self.hostname, self.username, self.password, port=self.port) as ssh:
+            lines, position = self.cursor.read_new(ssh, timeout=self.timeout)
+        output = b'\n'.join(lines)
+        logs = [log for log in self.process_log_output(output) if status is None or log["status"] == status]
+        return logs, position
+
     def process_log_output(self, output):
-        logs = []
-        for line in output.splitlines():
-            match = re.search(r'(?P<ip>\S+) \S+ \S+ \[(?P<date>.*?)\] "(?P<method>POST) (?P<url>.*?) HTTP/.*" (?P<status>\d{3})', line)
-            if match:
-                logs.append({
-                    "ip": match.group("ip"),
-                    "date": match.group("date"),
-                    "method": match.group("method"),
-                    "url": match.group("url"),
-                    "status": match.group("status")
-                })
-        return logs
+        if isinstance(output, str):
+            output = output.encode('utf-8')
+        return self.parser.parse_records(output)
 
 # Example usage:
 if __name__ == "__main__":
+    # Run from the repository root so my_queen is importable: python -m SAM_Test.squid_log_api_wrapper
     squid_log_api = SquidLogAPI(
         hostname='your_squid_server_ip',
         port=22,
@@ -55,4 +85,7 @@ if __name__ == "__main__":
         log_file_path='/var/log/squid/access.log'
     )
     logs = squid_log_api.get_last_post_requests()
-    print(logs)
\ No newline at end of file
+    print(logs)
+
+    # Poll for new entries only
+    print(squid_log_api.get_new_post_requests())
@@ -1,35 +1,27 @@
-```python
-import paramiko
+import shlex
 
-def get_last_100_post_requests(hostname, username, password, log_file_path):
-    # Create an SSH client
-    ssh_client = paramiko.SSHClient()
-    ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+from my_queen.ssh_pool import default_pool
+from my_queen.remote_stream import exec_lines
+
+def get_last_100_post_requests(hostname, username, password, log_file_path, pool=None, compression=None):
+    pool = pool or default_pool
     
     try:
-        # Connect to the remote server
-        ssh_client.connect(hostname, username=username, password=password)
-        
-        # Command to get the last 100 POST requests with response in the 200 range
-        command = f"tail -n 100 {log_file_path} | grep 'POST' | grep '200'"
-        
-        # Execute the command
-        stdin, stdout, stderr = ssh_client.exec_command(command)
-        
-        # Read the output
-        post_requests = stdout.readlines()
-        
-        return post_requests
+        # Borrow a pooled SSH session to the remote server
+        with pool.session(hostname, username, password) as ssh_client:
+            # Command to get the last 100 POST requests with response in the 200 range
+            command = f"tail -n 100 {shlex.quote(log_file_path)} | grep 'POST' | grep '200'"
+            
+            # Execute the command and stream the output; lines keep their newline as before
+            return [line.decode('utf-8', 'replace') + '\n'
+                    for line in exec_lines(ssh_client, command, compression=compression)]
     
     except Exception as e:
         print(f"An error occurred: {e}")
         return []
-    
-    finally:
-        # Close the SSH connection
-        ssh_client.close()
 
 if __name__ == "__main__":
+    # Run from the repository root so my_queen is importable: python -m SAM_Test.squid_post_log_api
     # Example usage
     hostname = "your_squid_proxy_host"
     username = "your_username"
@@ -39,4 +31,4 @@ if __name__ == "__main__":
     post_requests = get_last_100_post_requests(hostname, username, password, log_file_path)
     
     for request in post_requests:
-        print(request.strip())
\ No newline at end of file
+        print(request.strip())
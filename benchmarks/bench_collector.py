@@ -0,0 +1,184 @@
+"""
+Throughput benchmark for MaliciousCommandCollector.
+
+Run from the repository root:
+    python -m benchmarks.bench_collector --lines 2000000 --files 4 --workers 1 4
+    python -m benchmarks.bench_collector --size-mb 2048 --files 8 --workers 8 --compare
+
+Synthetic logs are generated once per parameter set (see synthetic_logs.py)
+and reused. Every case runs in a fresh interpreter so peak RSS is not
+inherited from an earlier case. Each run appends one JSON line to the
+results file with the git commit, the parameters and, per case, wall time,
+lines/s and peak RSS for collect_commands and save_to_json. --compare prints
+the change against the previous run with the same parameters.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import platform
+import resource
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+
+from benchmarks.synthetic_logs import generate_dir, parse_mix
+
+DEFAULT_RESULTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results', 'collector.jsonl')
+
+
+def _peak_rss_mb(who):
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss = resource.getrusage(who).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def run_stage(config):
+    # Runs inside the child interpreter and prints one JSON result
+    from my_queen.collect_malicious_commands import MaliciousCommandCollector
+
+    collector = MaliciousCommandCollector(honeypot_dir=config['data_dir'])
+    t0 = time.perf_counter()
+    collector.collect_commands(workers=config['workers'])
+    collect_s = time.perf_counter() - t0
+    collect_rss = _peak_rss_mb(resource.RUSAGE_SELF)
+
+    suffix = '.ndjson' if config['ndjson'] else '.json'
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, 'out' + suffix)
+        t0 = time.perf_counter()
+        collector.save_to_json(output, ndjson=config['ndjson'])
+        save_s = time.perf_counter() - t0
+        output_mb = os.path.getsize(output) / (1024 * 1024)
+
+    print(json.dumps({
+        'collect_s': collect_s,
+        'save_s': save_s,
+        'collect_peak_rss_mb': collect_rss,
+        'peak_rss_mb': _peak_rss_mb(resource.RUSAGE_SELF),
+        'worker_peak_rss_mb': _peak_rss_mb(resource.RUSAGE_CHILDREN),
+        'output_mb': output_mb,
+        'distinct_commands': sum(len(commands) for commands in collector.commands.ttps.values()),
+    }))
+
+
+def prepare_data(args, params):
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:12]
+    data_dir = args.data_dir or os.path.join(tempfile.gettempdir(), 'my_queen_bench_' + digest)
+    marker = os.path.join(data_dir, '.params.json')
+    if os.path.exists(marker):
+        with open(marker) as f:
+            cached = json.load(f)
+        if cached['params'] == params:
+            return data_dir, cached['lines'], cached['bytes']
+    print(f"Generating synthetic logs in {data_dir} ...", file=sys.stderr)
+    lines, size = generate_dir(data_dir, params['files'], params['lines'], params['size_mb'],
+                               params['seed'], params['mix'], params['noise_ratio'], params['format'])
+    with open(marker, 'w') as f:
+        json.dump({'params': params, 'lines': lines, 'bytes': size}, f)
+    return data_dir, lines, size
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous_run(results_file, params):
+    if not os.path.exists(results_file):
+        return None
+    last = None
+    with open(results_file) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if record.get('params') == params:
+                    last = record
+    return last
+
+
+def print_table(record, previous=None):
+    before = {(c['workers'], c['ndjson']): c for c in (previous or {}).get('cases', [])}
+    header = f"{'workers':>7} {'ndjson':>6} {'lines/s':>12} {'collect s':>10} {'save s':>8} {'wall s':>8} {'peak MB':>8} {'worker MB':>9}"
+    if previous:
+        header += f" {'lines/s vs ' + str(previous.get('git_commit')):>20}"
+    print(header)
+    for case in record['cases']:
+        row = (f"{case['workers']:>7} {str(case['ndjson']):>6} {case['lines_per_s']:>12,.0f} "
+               f"{case['collect_s']:>10.2f} {case['save_s']:>8.2f} {case['wall_s']:>8.2f} "
+               f"{case['peak_rss_mb']:>8.1f} {case['worker_peak_rss_mb']:>9.1f}")
+        old = before.get((case['workers'], case['ndjson']))
+        if old:
+            change = (case['lines_per_s'] / old['lines_per_s'] - 1) * 100
+            row += f" {change:>+19.1f}%"
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark MaliciousCommandCollector throughput.')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--lines', type=int, help='total synthetic lines (default 500000)')
+    group.add_argument('--size-mb', type=float, help='total synthetic size in MiB')
+    parser.add_argument('--files', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--mix', type=parse_mix, help='technique weights, e.g. T1105=5,T1082=2')
+    parser.add_argument('--noise-ratio', type=float, default=0.5)
+    parser.add_argument('--format', choices=['cowrie', 'json'], default='cowrie')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1])
+    parser.add_argument('--ndjson', action='store_true', help='also time save_to_json(ndjson=True)')
+    parser.add_argument('--data-dir', help='where to generate (or reuse) the synthetic logs')
+    parser.add_argument('--results', default=DEFAULT_RESULTS, help='JSON-lines file results are appended to')
+    parser.add_argument('--compare', action='store_true', help='compare with the previous run of the same parameters')
+    parser.add_argument('--stage', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        run_stage(json.loads(args.stage))
+        return
+
+    if args.lines is None and args.size_mb is None:
+        args.lines = 500000
+    params = {'lines': args.lines, 'size_mb': args.size_mb, 'files': args.files, 'seed': args.seed,
+              'mix': args.mix, 'noise_ratio': args.noise_ratio, 'format': args.format}
+    data_dir, total_lines, total_bytes = prepare_data(args, params)
+
+    cases = []
+    for workers in args.workers:
+        for ndjson in ([False, True] if args.ndjson else [False]):
+            config = {'data_dir': data_dir, 'workers': workers, 'ndjson': ndjson}
+            t0 = time.perf_counter()
+            out = subprocess.run([sys.executable, '-m', 'benchmarks.bench_collector', '--stage', json.dumps(config)],
+                                 capture_output=True, text=True, check=True).stdout
+            wall_s = time.perf_counter() - t0
+            result = json.loads(out.strip().splitlines()[-1])
+            result.update(workers=workers, ndjson=ndjson, wall_s=wall_s,
+                          lines_per_s=total_lines / result['collect_s'])
+            cases.append(result)
+
+    record = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'params': params,
+        'input_lines': total_lines,
+        'input_mb': total_bytes / (1024 * 1024),
+        'cases': cases,
+    }
+    previous = previous_run(args.results, params) if args.compare else None
+    print(f"{total_lines:,} lines, {total_bytes / 1024 / 1024:.1f} MiB in {params['files']} files")
+    print_table(record, previous)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+    with open(args.results, 'a') as f:
+        f.write(json.dumps(record) + '\n')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Throughput of the Squid access.log parser.
+
+Run from the repository root:
+    python -m benchmarks.bench_squid_parser
+    python -m benchmarks.bench_squid_parser --lines 2000000 --post-ratio 0.05
+
+Native and combined logs are generated from a fixed seed. For each format
+the table shows lines/s for the per-line `re.search` loop the API used
+before (combined only, it cannot read native lines), for parse_records,
+for parse_columns and for parse_records restricted to POST.
+"""
+
+import re
+import time
+import random
+import argparse
+
+from my_queen.squid_parser import SquidLogParser
+
+METHODS = ['GET', 'CONNECT', 'HEAD', 'PUT']
+RESULTS = ['TCP_MISS', 'TCP_HIT', 'TCP_TUNNEL', 'TCP_DENIED', 'TCP_REFRESH_MODIFIED']
+STATUSES = [200, 200, 200, 204, 301, 304, 403, 404, 503]
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+OLD_RE = r'(?P<ip>\S+) \S+ \S+ \[(?P<date>.*?)\] "(?P<method>POST) (?P<url>.*?) HTTP/.*" (?P<status>\d{3})'
+
+
+def make_log(log_format, count, post_ratio, rng):
+    lines = []
+    clock = 1704067200.0
+    for _ in range(count):
+        clock += rng.random() * 0.05
+        ip = f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}"
+        method = 'POST' if rng.random() < post_ratio else rng.choice(METHODS)
+        url = f"http://host{rng.randrange(500)}.example.com/path/{rng.randrange(10 ** 6)}?q={rng.randrange(10 ** 4)}"
+        status = rng.choice(STATUSES)
+        size = rng.randrange(100, 10 ** 6)
+        if log_format == 'native':
+            lines.append(f"{clock:.3f} {rng.randrange(1, 20000):>6} {ip} {rng.choice(RESULTS)}/{status} {size} "
+                         f"{method} {url} - HIER_DIRECT/93.184.216.34 text/html")
+        else:
+            t = time.gmtime(clock)
+            date = f"{t.tm_mday:02d}/{MONTHS[t.tm_mon - 1]}/{t.tm_year}:{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d} +0000"
+            lines.append(f'{ip} - - [{date}] "{method} {url} HTTP/1.1" {status} {size} "-" "Mozilla/5.0" '
+                         f'{rng.choice(RESULTS)}:HIER_DIRECT')
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def old_parse(text):
+    logs = []
+    for line in text.splitlines():
+        match = re.search(OLD_RE, line)
+        if match:
+            logs.append({
+                "ip": match.group("ip"),
+                "date": match.group("date"),
+                "method": match.group("method"),
+                "url": match.group("url"),
+                "status": match.group("status")
+            })
+    return logs
+
+
+def timed(count, fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return count / (time.perf_counter() - t0), len(result) if isinstance(result, list) else len(result['ip'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Squid access.log parser.')
+    parser.add_argument('--lines', type=int, default=500000)
+    parser.add_argument('--post-ratio', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'format':>9} {'case':>14} {'lines/s':>12} {'rows':>9}")
+    for log_format in ('native', 'combined'):
+        data = make_log(log_format, args.lines, args.post_ratio, rng)
+        cases = []
+        if log_format == 'combined':
+            cases.append(('old re.search', old_parse, data.decode('utf-8')))
+        cases += [
+            ('records', SquidLogParser().parse_records, data),
+            ('columns', SquidLogParser().parse_columns, data),
+            ('records POST', SquidLogParser(methods=['POST']).parse_records, data),
+            ('columns POST', SquidLogParser(methods=['POST']).parse_columns, data),
+        ]
+        for name, fn, payload in cases:
+            rate, rows = timed(args.lines, fn, payload)
+            print(f"{log_format:>9} {name:>14} {rate:>12,.0f} {rows:>9}")
+
+
+if __name__ == "__main__":
+    main()
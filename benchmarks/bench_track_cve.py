@@ -0,0 +1,150 @@
+"""
+End-to-end benchmark of scripts/track_cve_2025.py against a local CSE stand-in.
+
+Run from the repository root:
+    python -m benchmarks.bench_track_cve --articles 10000 100000
+    python -m benchmarks.bench_track_cve --articles 1000000 --latency 0.05 --rate-429 0.01 --workers 32
+
+A MockCSEServer (see mock_cse_server.py) runs in this process. Each size
+runs in a fresh interpreter, so peak RSS is not inherited from an earlier
+size. That interpreter points the tracker at the mock and times these stages
+over the same articles:
+
+    fetch       fetch_articles over enough keywords to return --articles results
+    parse_date  parse_date on every publish date
+    sanitize    sanitize_for_markdown on every title and snippet
+    summarize   summarize_articles
+    readme      update_readme_section into a temporary README
+
+For each stage the table shows seconds, items/s and peak RSS so far. With
+--trace-memory it also shows the stage's own peak Python allocation
+(tracemalloc slows every stage down). No credentials are needed, and the
+response cache is disabled.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import resource
+import argparse
+import tempfile
+import subprocess
+
+from benchmarks.mock_cse_server import MockCSEServer
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts')
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def run_stages(config):
+    # Runs inside the child interpreter and prints one JSON result
+    os.environ.update({
+        'GOOGLE_CSE_API_KEY': 'benchmark', 'GOOGLE_CSE_ID': 'benchmark', 'CACHE_DIR': '',
+        'CSE_QPS': str(config['qps']), 'CSE_BURST': str(config['workers']),
+        'FETCH_WORKERS': str(config['workers']),
+    })
+    sys.path.insert(0, SCRIPTS_DIR)
+    import logging
+    import tracemalloc
+    import track_cve_2025 as tracker
+
+    logging.getLogger().setLevel(logging.WARNING)
+    tracker.CSE_URL = config['url']
+    keywords = [f"keyword {i}" for i in range(config['keywords'])]
+    articles, summary = [], {}
+    readme = os.path.join(tempfile.mkdtemp(prefix='bench_track_cve_'), 'README.md')
+
+    def fetch():
+        articles.extend(tracker.fetch_articles(keywords, workers=config['workers'], max_pages=config['pages']))
+        return len(articles)
+
+    def parse_dates():
+        return sum(tracker.parse_date(art['publish_date_raw']) is not None for art in articles)
+
+    def sanitize():
+        for art in articles:
+            tracker.sanitize_for_markdown(art['title'])
+            tracker.sanitize_for_markdown(art['snippet'])
+        return 2 * len(articles)
+
+    def summarize():
+        summary.update(tracker.summarize_articles(articles))
+        return len(articles)
+
+    def readme_section():
+        tracker.update_readme_section(readme, summary)
+        return len(summary)
+
+    stages = []
+    for name, fn in [('fetch', fetch), ('parse_date', parse_dates), ('sanitize', sanitize),
+                     ('summarize', summarize), ('readme', readme_section)]:
+        if config['trace_memory']:
+            tracemalloc.start()
+        t0 = time.perf_counter()
+        items = fn()
+        seconds = time.perf_counter() - t0
+        stage = {'stage': name, 'seconds': seconds, 'items': items, 'items_per_s': items / seconds if seconds else 0,
+                 'peak_rss_mb': _peak_rss_mb()}
+        if config['trace_memory']:
+            stage['traced_peak_mb'] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+        stages.append(stage)
+    print(json.dumps({'articles': len(articles), 'cves': len(summary), 'stages': stages}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the CVE tracker against a local CSE stand-in.')
+    parser.add_argument('--articles', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--page-size', type=int, default=100,
+                        help='results per request (single-page fetches only; paged fetches use 10 like the real API)')
+    parser.add_argument('--pages', type=int, default=1, help='pages per keyword (CSE start parameter)')
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--qps', type=float, default=100000, help='limiter rate; lower it to benchmark throttling')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds the mock adds to every response')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='share of mock responses that are 429')
+    parser.add_argument('--snippet-len', type=int, default=160)
+    parser.add_argument('--duplicate-ratio', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--trace-memory', action='store_true', help='per-stage tracemalloc peak (slower)')
+    parser.add_argument('--stage', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        run_stages(json.loads(args.stage))
+        return
+
+    per_keyword = args.page_size if args.pages == 1 else 10 * args.pages
+    server = MockCSEServer(latency=args.latency, rate_429=args.rate_429, retry_after=0.1,
+                           total_results=per_keyword, page_size=args.page_size if args.pages == 1 else 10,
+                           snippet_len=args.snippet_len, duplicate_ratio=args.duplicate_ratio, seed=args.seed)
+    header = f"{'articles':>9} {'stage':>10} {'seconds':>9} {'items/s':>12} {'peak MB':>8}"
+    if args.trace_memory:
+        header += f" {'traced MB':>9}"
+    with server:
+        print(header)
+        for count in args.articles:
+            config = {'url': server.url, 'keywords': math.ceil(count / per_keyword), 'pages': args.pages,
+                      'workers': args.workers, 'qps': args.qps, 'trace_memory': args.trace_memory}
+            requests_before = server.requests
+            out = subprocess.run([sys.executable, '-m', 'benchmarks.bench_track_cve', '--stage', json.dumps(config)],
+                                 capture_output=True, text=True, check=True).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            for stage in result['stages']:
+                row = (f"{result['articles']:>9} {stage['stage']:>10} {stage['seconds']:>9.2f} "
+                       f"{stage['items_per_s']:>12,.0f} {stage['peak_rss_mb']:>8.1f}")
+                if args.trace_memory:
+                    row += f" {stage['traced_peak_mb']:>9.1f}"
+                print(row)
+            print(f"{'':>9} {result['cves']} CVEs, {server.requests - requests_before} requests, "
+                  f"{server.throttled} throttled so far")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Throughput of the compiled TTP rule engine as the rule set grows.
+
+Run from the repository root:
+    python -m benchmarks.bench_ttp_rules
+    python -m benchmarks.bench_ttp_rules --sizes 10 100 1000 5000 --lines 200000 --naive
+
+Rules and command lines are generated from a fixed seed, so numbers are
+comparable between runs. --naive also times a loop that tries every rule in
+turn on a smaller sample, for reference.
+"""
+
+import re
+import time
+import random
+import string
+import argparse
+
+from my_queen.ttp_rules import TTPRule, TTPRuleEngine
+
+BASE_COMMANDS = [
+    "cd /tmp", "uname -a", "cat /proc/cpuinfo", "ls -la", "echo hello",
+    "free -m", "ps aux", "nproc", "w", "history -c",
+]
+
+
+def make_rules(count, rng):
+    rules = []
+    for i in range(count):
+        keywords = [_token(rng) for _ in range(rng.randint(1, 3))]
+        patterns = []
+        if i % 10 == 0:
+            patterns.append(_token(rng) + r'\s+-[a-z]\s+\d+')
+        rules.append(TTPRule(f"T{1000 + i}", keywords=keywords, patterns=patterns))
+    return rules
+
+
+def make_lines(rules, count, rng, hit_ratio=0.3):
+    lines = []
+    for _ in range(count):
+        parts = [rng.choice(BASE_COMMANDS) for _ in range(rng.randint(1, 4))]
+        if rng.random() < hit_ratio:
+            rule = rng.choice(rules)
+            parts.insert(rng.randrange(len(parts) + 1), rng.choice(rule.keywords) + " -x /tmp/a")
+        lines.append("; ".join(parts))
+    return lines
+
+
+def naive_classify(compiled_rules, command):
+    for technique, regexes in compiled_rules:
+        for regex in regexes:
+            if regex.search(command):
+                return technique
+    return None
+
+
+def bench(sizes, line_count, naive):
+    rng = random.Random(1337)
+    print(f"{'rules':>6} {'compile s':>10} {'lines/s':>12} {'matched':>8}" + (f" {'naive lines/s':>14}" if naive else ""))
+    for size in sizes:
+        rules = make_rules(size, rng)
+        lines = make_lines(rules, line_count, rng)
+
+        t0 = time.perf_counter()
+        engine = TTPRuleEngine(rules)
+        compile_time = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        matched = sum(1 for line in lines if engine.classify(line))
+        rate = line_count / (time.perf_counter() - t0)
+
+        row = f"{size:>6} {compile_time:>10.3f} {rate:>12,.0f} {matched:>8}"
+        if naive:
+            compiled = [(r.technique, [re.compile(r'(?<![\w./-])' + re.escape(k) + r'(?![\w./-])') for k in r.keywords]
+                         + [re.compile(p) for p in r.patterns]) for r in rules]
+            sample = lines[:max(1, line_count // 20)]
+            t0 = time.perf_counter()
+            for line in sample:
+                naive_classify(compiled, line)
+            row += f" {len(sample) / (time.perf_counter() - t0):>14,.0f}"
+        print(row)
+
+
+def _token(rng):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 10)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark TTP rule classification throughput.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 5000])
+    parser.add_argument('--lines', type=int, default=100000)
+    parser.add_argument('--naive', action='store_true', help='also time a per-rule loop')
+    args = parser.parse_args()
+    bench(args.sizes, args.lines, args.naive)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Local stand-in for the CKAN action API's package_search.
+
+    python -m benchmarks.mock_ckan_server --port 5000 --datasets 20000 --latency 0.02
+    python qldat/sync_qld_catalogue.py --output qld_datasets.csv --base-url http://127.0.0.1:5000/api/3/action
+
+It serves GET /api/3/action/package_search?start=...&rows=...&fq=... with
+synthetic datasets shaped like data.qld.gov.au's (organization, resources
+with formats, tags, multi-line notes). Results are sorted by
+metadata_modified then id, as the sync asks for, and
+`fq=metadata_modified:[<time>Z TO *]` keeps only datasets modified at or
+after that time. `touch`, `add` and `delete` change the catalogue between
+syncs, so an incremental sync can be checked against a full one.
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+ORGANIZATIONS = ['transport-and-main-roads', 'queensland-health', 'environment-and-science', 'education',
+                 'natural-resources-mines-and-energy', 'queensland-police-service']
+FORMATS = ['CSV', 'XLSX', 'JSON', 'PDF', 'GeoJSON', 'SHP', 'API', '']
+TAGS = ['roads', 'health', 'water', 'schools', 'crime', 'budget', 'spatial', 'census', 'energy', 'transport']
+CREATED = datetime(2015, 1, 1)
+
+
+class MockCKANServer:
+    """Threaded HTTP server answering package_search over an in-memory catalogue."""
+
+    def __init__(self, host='127.0.0.1', port=0, datasets=1000, latency=0.0, max_rows=1000, seed=1):
+        self.latency = latency
+        self.max_rows = max_rows
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._clock = CREATED
+        self._next_id = 0
+        self.datasets = {}
+        self.add(datasets)
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/3/action"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def add(self, count):
+        """Adds `count` new datasets; returns their ids."""
+        with self._lock:
+            ids = []
+            for _ in range(count):
+                number = self._next_id
+                self._next_id += 1
+                dataset_id = f"{number:08d}-0000-4000-8000-{self._rng.randrange(16 ** 12):012x}"
+                self.datasets[dataset_id] = self._dataset(dataset_id, number)
+                ids.append(dataset_id)
+            return ids
+
+    def touch(self, count):
+        """Edits `count` random datasets, which moves them to the end of the sort order; returns their ids."""
+        with self._lock:
+            ids = self._rng.sample(sorted(self.datasets), min(count, len(self.datasets)))
+            for dataset_id in ids:
+                dataset = self.datasets[dataset_id]
+                dataset['title'] += ' (updated)'
+                dataset['metadata_modified'] = self._tick()
+            return ids
+
+    def delete(self, count):
+        """Removes `count` random datasets; returns their ids."""
+        with self._lock:
+            ids = self._rng.sample(sorted(self.datasets), min(count, len(self.datasets)))
+            for dataset_id in ids:
+                del self.datasets[dataset_id]
+            return ids
+
+    def package_search(self, start=0, rows=10, fq=None):
+        """The result of one package_search call."""
+        with self._lock:
+            datasets = sorted(self.datasets.values(), key=lambda d: (d['metadata_modified'], d['id']))
+        if fq:
+            # Only the range query the sync sends: metadata_modified:[<time>Z TO *]
+            since = fq.split('[', 1)[1].split(' TO', 1)[0].rstrip('Z')
+            datasets = [d for d in datasets if d['metadata_modified'] >= since]
+        return {'count': len(datasets), 'sort': 'metadata_modified asc, id asc',
+                'results': datasets[start:start + min(rows, self.max_rows)]}
+
+    def _tick(self):
+        # Strictly increasing modification times, microseconds like CKAN's
+        self._clock += timedelta(seconds=self._rng.randrange(1, 3600), microseconds=self._rng.randrange(10 ** 6))
+        return self._clock.isoformat()
+
+    def _dataset(self, dataset_id, number):
+        rng = self._rng
+        modified = self._tick()
+        resources = [{'format': rng.choice(FORMATS)} for _ in range(rng.randrange(4))]
+        return {
+            'id': dataset_id,
+            'name': f"dataset-{number}",
+            'title': f"Dataset {number}",
+            'organization': {'name': rng.choice(ORGANIZATIONS)},
+            'license_id': 'cc-by-4.0',
+            'metadata_created': min(CREATED + timedelta(days=number % 3000), self._clock).isoformat(),
+            'metadata_modified': modified,
+            'num_resources': len(resources),
+            'resources': resources,
+            'tags': [{'name': tag} for tag in rng.sample(TAGS, rng.randrange(4))],
+            'notes': f"Records for dataset {number}.\r\nUpdated as required, see the resources.",
+        }
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                query = parse_qs(url.query)
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                if not url.path.endswith('/package_search'):
+                    self._send(404, {'success': False, 'error': {'__type': 'Not Found Error'}})
+                    return
+                result = server.package_search(int(query.get('start', ['0'])[0]), int(query.get('rows', ['10'])[0]),
+                                               query.get('fq', [None])[0])
+                self._send(200, {'success': True, 'result': result})
+
+            def _send(self, status, body):
+                body = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json;charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a synthetic CKAN package_search locally.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--datasets', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--max-rows', type=int, default=1000, help='cap on rows per page, like CKAN\'s')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    server = MockCKANServer(args.host, args.port, args.datasets, args.latency, args.max_rows, args.seed)
+    print(f"Serving {server.url}", flush=True)
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+        print(f"{server.requests} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Local stand-in for the Google Custom Search JSON API.
+
+    python -m benchmarks.mock_cse_server --port 8765 --latency 0.05 --rate-429 0.02
+
+It serves GET /customsearch/v1?q=...&start=...&num=... with synthetic results
+shaped like the real API ("items" with title/link/snippet/pagemap metatags,
+"queries.nextPage" while more results exist). Results are deterministic for
+a given seed, query and start index. Newer articles come first, so
+sort=date paging and high-water stops behave like the real API. Unlike the
+real API, `--page-size` may exceed 10 (it applies whenever a request has no
+`num`), so a benchmark can reach a million articles with fewer requests.
+`--rate-429` answers that share of requests with 429 and a Retry-After
+header.
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+VENDORS = ['Ivanti', 'Fortinet', 'Citrix', 'Cisco', 'Microsoft', 'Apache', 'Atlassian', 'VMware', 'SAP', 'Oracle']
+PRODUCTS = ['VPN gateway', 'Exchange', 'Confluence', 'NetScaler', 'FortiOS', 'Tomcat', 'ESXi', 'WebLogic']
+VICTIM_PHRASES = ['victims include hospitals', 'hundreds of organizations affected', 'systems compromised',
+                  'ransom demands followed', 'no victims reported yet']
+# Publish date formats seen in real pagemap metatags; the last one is not ISO at all
+DATE_FORMATS = ['%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%dT%H:%M:%S+00:00', '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%B %d, %Y']
+NEWEST = datetime(2025, 12, 31, 12, 0, 0)
+
+
+class MockCSEServer:
+    """Threaded HTTP server answering Custom Search queries with synthetic results."""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, rate_429=0.0, retry_after=0.5,
+                 total_results=100, page_size=10, snippet_len=160, cve_pool=5000, duplicate_ratio=0.1, seed=1):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.total_results = total_results
+        self.page_size = page_size
+        self.snippet_len = snippet_len
+        self.cve_pool = cve_pool
+        self.duplicate_ratio = duplicate_ratio
+        self.seed = seed
+        self.requests = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/customsearch/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def page(self, q, start, num):
+        """The response body for one query page."""
+        count = max(0, min(num, self.total_results - start + 1))
+        items = [self._item(q, start + i) for i in range(count)]
+        queries = {'request': [{'searchTerms': q, 'startIndex': start, 'count': count}]}
+        if start + count <= self.total_results:
+            queries['nextPage'] = [{'searchTerms': q, 'startIndex': start + count, 'count': num}]
+        return {'kind': 'customsearch#search', 'queries': queries,
+                'searchInformation': {'totalResults': str(self.total_results)}, 'items': items}
+
+    def _item(self, q, index):
+        rng = random.Random(f"{self.seed}:{q}:{index}")
+        if rng.random() < self.duplicate_ratio:
+            # The same article returned for another query
+            rng = random.Random(f"{self.seed}:shared:{rng.randrange(1000)}")
+        article = rng.randrange(10 ** 9)
+        cve = f"CVE-2025-{rng.randrange(self.cve_pool) + 1000}"
+        vendor, product = rng.choice(VENDORS), rng.choice(PRODUCTS)
+        title = f"<b>{vendor}</b> {product} flaw {cve} exploited in the wild | Security News"
+        words = [f"Attackers exploit {cve} in {vendor} {product}.", rng.choice(VICTIM_PHRASES) + '.',
+                 'Patch now & review `config` files | details <a href="#">here</a>.']
+        snippet = ' '.join(words)
+        while len(snippet) < self.snippet_len:
+            snippet += ' ' + rng.choice(words)
+        published = NEWEST - timedelta(hours=index * 6 + rng.randrange(6))
+        return {
+            'kind': 'customsearch#result',
+            'title': title,
+            'link': f"https://www.news{article % 97}.example.com/{article}/{cve.lower()}/?utm_source=feed",
+            'snippet': snippet[:self.snippet_len],
+            'pagemap': {'metatags': [{'article:published_time': published.strftime(rng.choice(DATE_FORMATS))}]},
+        }
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                query = parse_qs(urlsplit(self.path).query)
+                with server._lock:
+                    server.requests += 1
+                if server.latency or server.jitter:
+                    time.sleep(server.latency + random.random() * server.jitter)
+                if server.rate_429 and random.random() < server.rate_429:
+                    with server._lock:
+                        server.throttled += 1
+                    body = json.dumps({'error': {'code': 429, 'message': 'Rate Limit Exceeded'}}).encode()
+                    self._send(429, body, {'Retry-After': str(server.retry_after)})
+                    return
+                q = query.get('q', [''])[0]
+                start = int(query.get('start', ['1'])[0])
+                num = int(query.get('num', [str(server.page_size)])[0])
+                # num is capped at 10 by the real API; here by the configured page size
+                body = json.dumps(server.page(q, start, max(1, min(num, server.page_size)))).encode()
+                self._send(200, body)
+
+            def _send(self, status, body, headers=None):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=UTF-8')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve synthetic Custom Search results locally.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random extra seconds, up to this much')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='share of requests answered with 429')
+    parser.add_argument('--retry-after', type=float, default=0.5)
+    parser.add_argument('--total-results', type=int, default=100, help='results per query')
+    parser.add_argument('--page-size', type=int, default=10, help='results per page (the real API caps it at 10)')
+    parser.add_argument('--snippet-len', type=int, default=160)
+    parser.add_argument('--cve-pool', type=int, default=5000, help='distinct CVE ids to draw from')
+    parser.add_argument('--duplicate-ratio', type=float, default=0.1, help='share of results shared across queries')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    server = MockCSEServer(args.host, args.port, args.latency, args.jitter, args.rate_429, args.retry_after,
+                           args.total_results, args.page_size, args.snippet_len, args.cve_pool,
+                           args.duplicate_ratio, args.seed)
+    print(f"Serving {server.url}", flush=True)
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+        print(f"{server.requests} requests, {server.throttled} throttled")
+
+
+if __name__ == "__main__":
+    main()
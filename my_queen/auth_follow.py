@@ -0,0 +1,216 @@
+import os
+import json
+import time
+import shlex
+import socket
+import logging
+import tempfile
+
+import paramiko
+
+from my_queen.auth_log_parser import AuthLogParser, FAILURE, INVALID_USER
+from my_queen.remote_cursor import RemoteFileCursor
+
+logger = logging.getLogger(__name__)
+
+# tail -F notices when the followed file is rotated or truncated
+_REOPENED = (b'has been replaced', b'has appeared', b'file truncated')
+
+
+class AuthLogFollower:
+    """Follows a remote auth log over one long-lived SSH channel.
+
+    In file mode the channel runs ``tail -F`` from the last delivered byte.
+    The position (inode + offset, as in RemoteFileCursor) moves with every
+    complete line. When tail reports a rotation or truncation it is reset.
+    After a disconnect the follower reconnects: bytes written meanwhile,
+    including the rest of a log rotated to ``.1``, are read first, then
+    ``tail -F`` resumes. With `journal=True` it runs ``journalctl -f -o
+    json`` on the auth facilities and resumes after the last journal
+    cursor instead.
+
+    Only events whose result is in `results` are delivered, via
+    `events()` (a generator) or `run(callback)`. With `state_file`, the
+    position is saved every `save_interval` seconds and on `stop()`, so a
+    restarted follower picks up where the last one stopped. Journal lines
+    that are not valid JSON are logged and skipped. One-off commands on the
+    followed connection (the stat after a rotation) fail after
+    `command_timeout` seconds, which makes the follower reconnect.
+    """
+
+    def __init__(self, pool, hostname, username, password=None, port=22, log_path='/var/log/auth.log',
+                 state_file=None, journal=False, results=(FAILURE, INVALID_USER), parser=None,
+                 reconnect_delay=5, max_reconnect_delay=300, save_interval=5, command_timeout=30):
+        self.pool = pool
+        self.hostname = hostname
+        self.username = username
+        self.password = password
+        self.port = port
+        self.log_path = log_path
+        self.state_file = state_file
+        self.journal = journal
+        self.results = set(results) if results else None
+        self.parser = parser or AuthLogParser()
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.save_interval = save_interval
+        self.command_timeout = command_timeout
+        self.cursor = RemoteFileCursor(log_path, state_file=None if journal else state_file)
+        self.journal_cursor = self._load_journal_cursor() if journal else None
+        self._channel = None
+        self._stopped = False
+        self._last_save = time.monotonic()
+
+    def events(self):
+        delay = self.reconnect_delay
+        while not self._stopped:
+            client = None
+            try:
+                client = self.pool.acquire(self.hostname, self.username, self.password, self.port)
+                stream = self._follow_journal(client) if self.journal else self._follow_file(client)
+                for event in stream:
+                    delay = self.reconnect_delay
+                    if self.results is None or event['result'] in self.results:
+                        yield event
+                    self._maybe_save()
+            except (OSError, EOFError, paramiko.SSHException):
+                pass
+            finally:
+                if client is not None:
+                    # The long-lived channel leaves the connection in no state to share
+                    self.pool.discard(client)
+                self.save()
+            if self._stopped:
+                break
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def run(self, callback):
+        for event in self.events():
+            callback(event)
+
+    def stop(self):
+        self._stopped = True
+        if self._channel is not None:
+            self._channel.close()
+
+    def save(self):
+        if not self.state_file:
+            return
+        if self.journal:
+            dirn = os.path.dirname(self.state_file) or '.'
+            with tempfile.NamedTemporaryFile('w', delete=False, dir=dirn) as tmp:
+                json.dump({'journal_cursor': self.journal_cursor}, tmp)
+                temp_name = tmp.name
+            os.replace(temp_name, self.state_file)
+        else:
+            self.cursor.save()
+        self._last_save = time.monotonic()
+
+    def _maybe_save(self):
+        if time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+    def _load_journal_cursor(self):
+        if self.state_file and os.path.exists(self.state_file):
+            with open(self.state_file, 'r') as f:
+                return json.load(f).get('journal_cursor')
+        return None
+
+    def _follow_file(self, client):
+        # Catch up on whatever was written while disconnected, across rotation.
+        # The cursor moves line by line as in the tail loop below, so events
+        # not yet delivered are read again after a stop or a crash.
+        for line, position in self.cursor.iter_new(client, timeout=self.command_timeout):
+            self.cursor.advance(position)
+            event = self.parser.parse_line(line)
+            if event is not None:
+                yield event
+        self.cursor.advance(self.cursor.end_position)
+
+        # tail's own notices go to stdout too, so a rotation is seen exactly
+        # between the last line of the old file and the first of the new one
+        command = f"tail -F -c +{self.cursor.offset + 1} {shlex.quote(self.log_path)} 2>&1"
+        carry = b''
+        for data in self._stream(client, command):
+            data = carry + data
+            end = data.rfind(b'\n') + 1
+            carry = data[end:]
+            for line in data[:end].splitlines(keepends=True):
+                if line.startswith(b'tail: '):
+                    if any(marker in line for marker in _REOPENED):
+                        # New (or truncated) file: tail starts over at its first byte. If the
+                        # stat fails the cursor is left on the old file and the reconnect
+                        # reads the rest of it from the rotated copy.
+                        inode = self._inode(client)
+                        self.cursor.inode, self.cursor.offset = inode, 0
+                    continue
+                self.cursor.offset += len(line)
+                event = self.parser.parse_line(line)
+                if event is not None:
+                    yield event
+
+    def _follow_journal(self, client):
+        # auth and authpriv facilities; journalctl ORs matches on one field
+        command = "journalctl -f -o json --no-pager SYSLOG_FACILITY=4 SYSLOG_FACILITY=10"
+        if self.journal_cursor:
+            command += f" --after-cursor={shlex.quote(self.journal_cursor)}"
+        else:
+            command += " -n 0"
+        carry = b''
+        for data in self._stream(client, command):
+            data = carry + data
+            end = data.rfind(b'\n') + 1
+            carry = data[end:]
+            for line in data[:end].splitlines():
+                try:
+                    entry = json.loads(line)
+                    if not isinstance(entry, dict):
+                        raise ValueError("not a JSON object")
+                    timestamp = int(entry.get('__REALTIME_TIMESTAMP', 0)) / 1e6
+                except ValueError as e:
+                    # One garbled line (e.g. cut off by journald) must not end the follower
+                    logger.warning("Skipping journal line from %s that is not valid JSON (%s): %r",
+                                   self.hostname, e, line[:200])
+                    continue
+                self.journal_cursor = entry.get('__CURSOR', self.journal_cursor)
+                message = entry.get('MESSAGE')
+                if not isinstance(message, str):
+                    continue
+                event = self.parser.parse_message(
+                    message, timestamp, entry.get('_HOSTNAME'),
+                    entry.get('SYSLOG_IDENTIFIER'), entry.get('_PID'))
+                if event is not None:
+                    yield event
+
+    def _stream(self, client, command):
+        channel = client.get_transport().open_session()
+        self._channel = channel
+        try:
+            channel.settimeout(1.0)
+            channel.exec_command(command)
+            while not self._stopped:
+                while channel.recv_stderr_ready():
+                    channel.recv_stderr(4096)
+                try:
+                    data = channel.recv(65536)
+                except socket.timeout:
+                    continue
+                if not data:
+                    raise EOFError(f"Remote follow command ended: {command}")
+                yield data
+        finally:
+            self._channel = None
+            channel.close()
+
+    def _inode(self, client):
+        # Raises OSError (socket.timeout included) or SSHException, which events() turns into a reconnect
+        command = f"stat -L -c %i {shlex.quote(self.log_path)}"
+        stdin, stdout, stderr = client.exec_command(command, timeout=self.command_timeout)
+        try:
+            output = stdout.read().strip()
+        finally:
+            stdout.channel.close()
+        if not output.isdigit():
+            raise OSError(f"Cannot stat {self.log_path} on {self.hostname}: {output[:200]!r}")
+        return int(output)
@@ -0,0 +1,241 @@
+import re
+import sys
+import json
+import time
+import argparse
+from collections import deque, OrderedDict
+from datetime import datetime
+
+FAILURE = 'failure'
+SUCCESS = 'success'
+INVALID_USER = 'invalid_user'
+
+# "Oct 16 22:47:01 host sshd[123]: msg" or "2024-10-16T22:47:01.123+00:00 host sshd[123]: msg"
+_LINE_RE = re.compile(
+    r'^(?:(?P<syslog>[A-Z][a-z]{2} [ \d]\d \d\d:\d\d:\d\d)|(?P<iso>\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d+)?(?:Z|[+-]\d\d:?\d\d)?))'
+    r' (?P<host>\S+) (?P<service>[\w.\-/]+)(?:\[(?P<pid>\d+)\])?: (?P<message>.*)$')
+_REPEATED_RE = re.compile(r'^message repeated (?P<times>\d+) times: \[ ?(?P<message>.*?) ?\]$')
+
+# sshd / PAM messages, most frequent first; each sets the result of the event.
+# pam_*(sshd:...) failures are left out: with UsePAM, sshd logs its own
+# "Failed ..." line for the same attempt, and counting both would double it.
+_MESSAGES = [
+    (FAILURE, re.compile(r'^Failed (?P<method>\S+) for (?:invalid user )?(?P<user>.*?) '
+                         r'from (?P<ip>\S+) port (?P<port>\d+)')),
+    (INVALID_USER, re.compile(r'^Invalid user (?P<user>.*?) from (?P<ip>\S+)(?: port (?P<port>\d+))?')),
+    (FAILURE, re.compile(r'^pam_\w+\((?!sshd:)(?P<method>[^)]+)\): authentication failure;.*?'
+                         r'(?: rhost=(?P<ip>\S*))?(?:\s+user=(?P<user>\S+))?\s*$')),
+    (SUCCESS, re.compile(r'^Accepted (?P<method>\S+) for (?P<user>\S+) from (?P<ip>\S+) port (?P<port>\d+)')),
+    (FAILURE, re.compile(r'^(?:error: )?maximum authentication attempts exceeded for (?:invalid user )?'
+                         r'(?P<user>.*?) from (?P<ip>\S+) port (?P<port>\d+)')),
+]
+
+
+class AuthLogParser:
+    """Turns sshd and PAM auth.log lines into event dicts.
+
+    Each event has timestamp (epoch seconds), host, service, pid, user,
+    ip, port, method, result and count (more than 1 for syslog "message
+    repeated N times" lines). result is FAILURE for a rejected attempt,
+    SUCCESS for a login, or INVALID_USER for sshd's "Invalid user" notice;
+    that notice comes before the attempt's own failure line. PAM failures
+    logged for sshd are skipped, since sshd's own "Failed ..." line reports
+    the same attempt. Lines that are not authentication results give None. Classic syslog timestamps
+    carry no year; `year` (default: the current one) is used, and dates
+    that would lie in the future are taken to be from the year before.
+    """
+
+    def __init__(self, year=None):
+        self.year = year
+        self._times = {}
+
+    def parse_line(self, line):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', 'replace')
+        match = _LINE_RE.match(line.rstrip('\r\n'))
+        if not match:
+            return None
+        return self.parse_message(match.group('message'), self._timestamp(match.group('syslog'), match.group('iso')),
+                                  match.group('host'), match.group('service'), match.group('pid'))
+
+    def parse_message(self, message, timestamp, host=None, service=None, pid=None):
+        """Like parse_line for a message whose metadata is already known (e.g. from journald)."""
+        count = 1
+        repeated = _REPEATED_RE.match(message)
+        if repeated:
+            count = int(repeated.group('times'))
+            message = repeated.group('message')
+
+        for result, regex in _MESSAGES:
+            found = regex.match(message)
+            if found:
+                break
+        else:
+            return None
+        fields = found.groupdict()
+        port = fields.get('port')
+        return {
+            'timestamp': timestamp,
+            'host': host,
+            'service': service,
+            'pid': int(pid) if pid else None,
+            'user': fields.get('user') or None,
+            'ip': fields.get('ip') or None,
+            'port': int(port) if port else None,
+            'method': fields.get('method'),
+            'result': result,
+            'count': count,
+        }
+
+    def parse(self, lines):
+        for line in lines:
+            event = self.parse_line(line)
+            if event is not None:
+                yield event
+
+    def _timestamp(self, syslog, iso):
+        if iso is not None:
+            return datetime.fromisoformat(iso.replace('Z', '+00:00')).timestamp()
+        # Lines of one second share a timestamp, parse each distinct one once
+        cached = self._times.get(syslog)
+        if cached is None:
+            if len(self._times) > 100000:
+                self._times.clear()
+            now = datetime.now()
+            parsed = datetime.strptime(f"{self.year or now.year} {syslog}", '%Y %b %d %H:%M:%S')
+            if self.year is None and parsed > now.replace(microsecond=0) and (parsed - now).days >= 1:
+                parsed = parsed.replace(year=parsed.year - 1)
+            cached = self._times[syslog] = parsed.timestamp()
+        return cached
+
+
+class BruteForceDetector:
+    """Per-source-IP sliding window over failed logins.
+
+    Each IP keeps a deque of (time, count) pairs for its failures inside
+    the last `window` seconds, plus their running total. New failures are
+    appended, including "message repeated N times" ones as a single pair,
+    and expired ones are popped from the front, so every update is O(1)
+    amortized. IPs with no recent failures are dropped from the front of
+    an LRU, keeping memory proportional to the IPs active in the window.
+    An alert is raised when an IP reaches `threshold` failures, at most
+    once per `cooldown` seconds per IP, and when an IP that is over the
+    threshold then logs in successfully. Alert times are kept in their own
+    LRU for `cooldown` seconds, so the cooldown still holds after an IP's
+    window has emptied.
+    """
+
+    def __init__(self, threshold=5, window=60, cooldown=300):
+        self.threshold = threshold
+        self.window = window
+        self.cooldown = cooldown
+        self._ips = OrderedDict()       # ip -> [deque of (time, count), users, failures in window]
+        self._alerted = OrderedDict()   # ip -> time of its last brute_force alert, oldest first
+
+    def feed(self, event):
+        """Updates the window with one parsed event; returns an alert dict or None."""
+        ip = event.get('ip')
+        if not ip:
+            return None
+        now = event['timestamp']
+        self._expire(now)
+        state = self._ips.get(ip)
+
+        if event['result'] == SUCCESS:
+            if state is not None:
+                self._trim(state, now)
+            if state is not None and state[2] >= self.threshold:
+                return self._alert('success_after_failures', ip, state, event)
+            return None
+        if event['result'] != FAILURE:
+            return None
+
+        if state is None:
+            state = self._ips[ip] = [deque(), set(), 0]
+        else:
+            self._ips.move_to_end(ip)
+        count = event.get('count', 1)
+        state[0].append((now, count))
+        state[2] += count
+        self._trim(state, now)
+        users = state[1]
+        if event.get('user') and len(users) < 50:
+            users.add(event['user'])
+        last_alert = self._alerted.get(ip)
+        if state[2] >= self.threshold and (last_alert is None or now - last_alert >= self.cooldown):
+            self._alerted[ip] = now
+            self._alerted.move_to_end(ip)
+            return self._alert('brute_force', ip, state, event)
+        return None
+
+    def process(self, events):
+        """Yields alerts as the events stream in."""
+        for event in events:
+            alert = self.feed(event)
+            if alert is not None:
+                yield alert
+
+    def _trim(self, state, now):
+        times = state[0]
+        while times and times[0][0] <= now - self.window:
+            state[2] -= times.popleft()[1]
+
+    def _expire(self, now):
+        # IPs are ordered by their latest failure, oldest first
+        ips = self._ips
+        while ips:
+            ip, state = next(iter(ips.items()))
+            if state[0] and state[0][-1][0] > now - self.window:
+                break
+            ips.popitem(last=False)
+        alerted = self._alerted
+        while alerted:
+            ip, last_alert = next(iter(alerted.items()))
+            if now - last_alert < self.cooldown:
+                break
+            alerted.popitem(last=False)
+
+    def _alert(self, kind, ip, state, event):
+        times = state[0]
+        return {
+            'type': kind,
+            'ip': ip,
+            'failures': state[2],
+            'window': self.window,
+            'first_failure': times[0][0] if times else None,
+            'last_failure': times[-1][0] if times else None,
+            'users': sorted(state[1]),
+            'host': event['host'],
+            'timestamp': event['timestamp'],
+            'user': event.get('user'),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parse auth.log and report brute-force attempts as they happen.')
+    parser.add_argument('log', nargs='?', default='-', help='auth.log path, or - for stdin (e.g. piped from tail -F)')
+    parser.add_argument('--threshold', type=int, default=5, help='failures per window that raise an alert')
+    parser.add_argument('--window', type=float, default=60, help='sliding window in seconds')
+    parser.add_argument('--cooldown', type=float, default=300, help='seconds between alerts for one IP')
+    parser.add_argument('--year', type=int, help='year for syslog timestamps without one')
+    parser.add_argument('--events', action='store_true', help='print every parsed event, not only alerts')
+    args = parser.parse_args()
+
+    auth_parser = AuthLogParser(year=args.year)
+    detector = BruteForceDetector(args.threshold, args.window, args.cooldown)
+    stream = sys.stdin if args.log == '-' else open(args.log, 'r', errors='replace')
+    try:
+        for event in auth_parser.parse(stream):
+            if args.events:
+                print(json.dumps(event), flush=True)
+            alert = detector.feed(event)
+            if alert is not None:
+                alert['detected_at'] = time.time()
+                print(json.dumps(alert), flush=True)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+if __name__ == "__main__":
+    main()
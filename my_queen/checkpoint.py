@@ -0,0 +1,91 @@
+import os
+import json
+import zlib
+import tempfile
+
+# Number of leading bytes fingerprinted to tell a truncated-and-regrown file
+# from one that was only appended to.
+HEAD_BYTES = 256
+
+
+class CheckpointStore:
+    """Remembers how far each honeypot log has been read between runs.
+
+    Entries are keyed by path but matched by (device, inode) first, so a log
+    that was renamed by rotation (``honeypot.log`` -> ``honeypot.log.1``)
+    keeps its offset and only its unread tail gets parsed. Compressed
+    archives are recorded as read in full; when one turns out to hold a plain
+    log that was already partly read, only the bytes after that offset count.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        self.load()
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as checkpoint_file:
+                self.files = json.load(checkpoint_file).get('files', {})
+
+    def save(self):
+        dirn = os.path.dirname(self.path) or '.'
+        with tempfile.NamedTemporaryFile('w', delete=False, dir=dirn) as tmp:
+            json.dump({'files': self.files}, tmp, indent=4)
+            temp_name = tmp.name
+        os.replace(temp_name, self.path)
+
+    def resume_offset(self, file_path, st):
+        entry = self._find(file_path, st)
+        if entry is None:
+            return 0
+        # Truncated (copytruncate rotation) or rewritten in place: start over
+        if st.st_size < entry['offset']:
+            return 0
+        if _head_crc(file_path, entry['head_len']) != entry['head_crc']:
+            return 0
+        return entry['offset']
+
+    def is_complete(self, file_path, st):
+        # A compressed archive that was read in full and has not changed since
+        entry = self._find(file_path, st)
+        return entry is not None and entry.get('compressed') and entry['size'] == st.st_size
+
+    def match_head(self, head):
+        """Offset already read from a plain log whose first bytes match `head`."""
+        for entry in self.files.values():
+            if entry.get('compressed') or not entry['head_len']:
+                continue
+            if zlib.crc32(head[:entry['head_len']]) == entry['head_crc']:
+                return entry['offset']
+        return 0
+
+    def record(self, file_path, st, offset, compressed=False):
+        for other in [p for p, e in self.files.items()
+                      if p != file_path and e['dev'] == st.st_dev and e['inode'] == st.st_ino]:
+            del self.files[other]
+        head_len = 0 if compressed else min(HEAD_BYTES, offset)
+        self.files[file_path] = {
+            'dev': st.st_dev,
+            'inode': st.st_ino,
+            'size': st.st_size,
+            'offset': offset,
+            'head_len': head_len,
+            'head_crc': _head_crc(file_path, head_len),
+            'compressed': compressed,
+        }
+
+    def forget_missing(self):
+        for file_path in [p for p in self.files if not os.path.exists(p)]:
+            del self.files[file_path]
+
+    def _find(self, file_path, st):
+        for entry in self.files.values():
+            if entry['dev'] == st.st_dev and entry['inode'] == st.st_ino:
+                return entry
+        return None
+
+
+def _head_crc(file_path, length):
+    with open(file_path, 'rb') as file:
+        return zlib.crc32(file.read(length))
@@ -1,39 +1,270 @@
-```python
 import os
+import re
 import json
-from collections import defaultdict
+import copy
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from my_queen.checkpoint import CheckpointStore, HEAD_BYTES
+from my_queen.command_clusters import cluster_commands
+from my_queen.command_index import CommandIndex
+from my_queen.command_store import CommandStore
+from my_queen.log_readers import (is_honeypot_log, is_compressed, read_head,
+                                  iter_mmap_lines, iter_stream_lines)
+from my_queen.ttp_rules import TTPRuleEngine, DEFAULT_RULES_FILE
+
+# Files larger than this are cut into byte ranges so one big log can be
+# spread over several workers.
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+
+# Cowrie-style text log: "2024-05-01T10:00:00.123456Z [...] CMD: uname -a"
+CMD_RE = re.compile(r'\bCMD: (.*)$')
+LOG_TIMESTAMP_RE = re.compile(r'^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}')
+LOG_TIMESTAMP_BYTES_RE = re.compile(LOG_TIMESTAMP_RE.pattern.encode())
+
+
+def _normalize_seen(timestamp):
+    if not isinstance(timestamp, str) or len(timestamp) < 19:
+        return None
+    return timestamp[:19].replace(' ', 'T')
+
+
+# Collector copy used inside each pool worker (set by _init_worker).
+_worker_collector = None
+
+
+def _init_worker(collector):
+    global _worker_collector
+    _worker_collector = collector
+
+
+def _parse_range(task):
+    file_path, start, end = task
+    commands = CommandStore()
+    _worker_collector._process_log_file(file_path, start, end, commands)
+    return commands
+
 
 class MaliciousCommandCollector:
-    def __init__(self, honeypot_dir):
+    def __init__(self, honeypot_dir, checkpoint_file=None, rules_file=DEFAULT_RULES_FILE):
         self.honeypot_dir = honeypot_dir
-        self.commands = defaultdict(list)
-
-    def collect_commands(self):
-        for filename in os.listdir(self.honeypot_dir):
-            if filename.endswith('.log'):
-                self._process_log_file(os.path.join(self.honeypot_dir, filename))
-
-    def _process_log_file(self, file_path):
-        with open(file_path, 'r') as file:
-            for line in file:
-                command, ttp = self._extract_command_and_ttp(line)
-                if command and ttp:
-                    self.commands[ttp].append(command)
-
-    def _extract_command_and_ttp(self, line):
-        # Placeholder for actual extraction logic
-        parts = line.strip().split(' ')
-        if len(parts) < 2:
+        self.commands = CommandStore()
+        self.checkpoint = CheckpointStore(checkpoint_file) if checkpoint_file else None
+        self.rules = TTPRuleEngine.from_file(rules_file)
+
+    def collect_commands(self, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, full=False):
+        # With a checkpoint store only the bytes appended since the last run
+        # are parsed, unless a full re-run is asked for.
+        plan = []
+        for file_path in self._list_log_files():
+            st = os.stat(file_path)
+            if is_compressed(file_path):
+                plan.append(self._plan_compressed(file_path, st, full))
+                continue
+            if self.checkpoint is None:
+                plan.append((file_path, st, 0, st.st_size))
+                continue
+            start = 0 if full else self.checkpoint.resume_offset(file_path, st)
+            # Stop at the last complete line, a half-written one is picked up next run
+            end = self._last_line_end(file_path, start, st.st_size)
+            plan.append((file_path, st, start, end))
+
+        if workers is None or workers <= 1:
+            for file_path, st, start, end in plan:
+                self._process_log_file(file_path, start, end)
+        else:
+            tasks = []
+            for file_path, st, start, end in plan:
+                tasks.extend(self._split_file(file_path, start, end, chunk_size))
+
+            # The workers only need the parsing logic, not what was already collected
+            worker_copy = copy.copy(self)
+            worker_copy.commands = CommandStore()
+            worker_copy.checkpoint = None
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(worker_copy,)) as executor:
+                # map() yields in task order, so merging keeps the serial ordering
+                for partial in executor.map(_parse_range, tasks):
+                    self.commands.merge(partial)
+
+        if self.checkpoint is not None:
+            for file_path, st, start, end in plan:
+                if is_compressed(file_path):
+                    self.checkpoint.record(file_path, st, st.st_size, compressed=True)
+                else:
+                    self.checkpoint.record(file_path, st, end)
+            self.checkpoint.forget_missing()
+            self.checkpoint.save()
+
+    def _plan_compressed(self, file_path, st, full):
+        # Archives are streamed whole: (start, end) is (decompressed bytes to
+        # skip, None), or (0, 0) when there is nothing new to read.
+        if self.checkpoint is None or full:
+            return (file_path, st, 0, None)
+        if self.checkpoint.is_complete(file_path, st):
+            return (file_path, st, 0, 0)
+        # A rotated log that was compressed after we read part of it
+        skip = self.checkpoint.match_head(read_head(file_path, HEAD_BYTES))
+        return (file_path, st, skip, None)
+
+    def _list_log_files(self):
+        return [os.path.join(self.honeypot_dir, filename)
+                for filename in sorted(os.listdir(self.honeypot_dir))
+                if is_honeypot_log(filename)]
+
+    def _last_line_end(self, file_path, start, size):
+        with open(file_path, 'rb') as file:
+            pos = size
+            while pos > start:
+                block_start = max(start, pos - 65536)
+                file.seek(block_start)
+                block = file.read(pos - block_start)
+                newline = block.rfind(b'\n')
+                if newline != -1:
+                    return block_start + newline + 1
+                pos = block_start
+        return start
+
+    def _split_file(self, file_path, start, end, chunk_size):
+        # Cut [start, end) into (path, start, end) ranges that all end on a line boundary
+        if is_compressed(file_path):
+            return [(file_path, start, end)] if end != 0 else []
+        ranges = []
+        with open(file_path, 'rb') as file:
+            while start < end:
+                stop = start + chunk_size
+                if stop >= end:
+                    stop = end
+                else:
+                    file.seek(stop)
+                    file.readline()
+                    stop = min(file.tell(), end)
+                ranges.append((file_path, start, stop))
+                start = stop
+        return ranges
+
+    def _process_log_file(self, file_path, start=0, end=None, commands=None):
+        if commands is None:
+            commands = self.commands
+        for line in self._read_lines(file_path, start, end):
+            command, ttp, seen = self._parse_line(line)
+            if command and ttp:
+                commands.add(ttp, command, seen, source=file_path)
+
+    def _read_lines(self, file_path, start=0, end=None):
+        if is_compressed(file_path):
+            if end == 0:
+                return iter(())
+            return iter_stream_lines(file_path, skip=start, accept=self._accept_line)
+        return iter_mmap_lines(file_path, start, end, accept=self._accept_line)
+
+    def _accept_line(self, raw):
+        # Bytes-level prefilter: a line that matches no rule is never decoded.
+        # Log lines that cannot hold a command are dropped before the rule scan.
+        if raw[:1] == b'{':
+            # JSON escapes can hide a match from the raw scan, so only check the field
+            return b'"input"' in raw
+        if LOG_TIMESTAMP_BYTES_RE.match(raw):
+            marker = raw.find(b'CMD: ')
+            return marker != -1 and self.rules.accepts(raw, marker + 5)
+        return self.rules.accepts(raw)
+
+    def _parse_line(self, line):
+        # Returns (command, ttp, seen); seen is a UTC "YYYY-MM-DDTHH:MM:SS" string or None
+        command, seen = self._extract_command(line)
+        if not command:
+            return None, None, None
+        return command, self.rules.classify(command), seen
+
+    def _extract_command(self, line):
+        line = line.strip()
+        if line.startswith('{'):
+            # Cowrie JSON log, one event per line
+            try:
+                event = json.loads(line)
+            except ValueError:
+                return None, None
+            if isinstance(event, dict) and isinstance(event.get('input'), str):
+                return event['input'].strip(), _normalize_seen(event.get('timestamp'))
             return None, None
-        command = parts[0]
-        ttp = parts[1]  # This should be replaced with actual TTP extraction logic
-        return command, ttp
+        timestamp = LOG_TIMESTAMP_RE.match(line)
+        match = CMD_RE.search(line)
+        if match:
+            return match.group(1).strip(), _normalize_seen(timestamp and timestamp.group())
+        if timestamp:
+            # Other honeypot events (logins, connections, ...) are not commands
+            return None, None
+        # Plain command dumps, one command per line
+        return line, None
+
+    def cluster_commands(self, threshold=0.5, num_perm=64):
+        # Near-duplicate clusters per TTP, one representative each (see command_clusters)
+        return {ttp: cluster_commands({command: stats.count for command, stats in commands.items()},
+                                      threshold=threshold, num_perm=num_perm)
+                for ttp, commands in self.commands.items()}
 
-    def save_to_json(self, output_file):
+    def save_clusters_to_json(self, output_file, threshold=0.5, num_perm=64):
         with open(output_file, 'w') as json_file:
-            json.dump(self.commands, json_file, indent=4)
+            json.dump(self.cluster_commands(threshold, num_perm), json_file, indent=4)
+
+    def load_from_json(self, input_file, ndjson=False):
+        # Seed the results with a previous run's output before an incremental pass
+        with open(input_file, 'r') as json_file:
+            if ndjson:
+                self.commands.load_ndjson(json_file)
+            else:
+                self.commands.load_json(json_file)
+
+    def save_to_json(self, output_file, ndjson=False):
+        # ndjson=True streams one {"ttp", "command", "count", ...} record per line
+        dirn = os.path.dirname(output_file) or '.'
+        with tempfile.NamedTemporaryFile('w', delete=False, dir=dirn) as json_file:
+            if ndjson:
+                self.commands.write_ndjson(json_file)
+            else:
+                self.commands.write_json(json_file)
+            temp_name = json_file.name
+        os.replace(temp_name, output_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Collect and categorize malicious commands from honeypot logs.')
+    parser.add_argument('honeypot_dir', nargs='?', default='path/to/honeypots')
+    parser.add_argument('--output', default='malicious_commands.json')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of worker processes (1 keeps the serial path)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help='split files larger than this many bytes across workers')
+    parser.add_argument('--checkpoint',
+                        help='checkpoint file; when set only new bytes are parsed and merged into --output')
+    parser.add_argument('--ndjson', action='store_true',
+                        help='read and write --output as newline-delimited JSON records')
+    parser.add_argument('--index',
+                        help='also write the results into this SQLite index (query with python -m my_queen.command_index)')
+    parser.add_argument('--clusters',
+                        help='also write near-duplicate command clusters (MinHash/LSH) to this JSON file')
+    parser.add_argument('--cluster-threshold', type=float, default=0.5,
+                        help='estimated Jaccard similarity above which commands share a cluster')
+    parser.add_argument('--rules', default=DEFAULT_RULES_FILE,
+                        help='JSON rule file mapping commands to MITRE ATT&CK techniques')
+    parser.add_argument('--full', action='store_true',
+                        help='ignore the checkpoint and rescan every file from the start')
+    args = parser.parse_args()
+
+    collector = MaliciousCommandCollector(honeypot_dir=args.honeypot_dir,
+                                          checkpoint_file=args.checkpoint,
+                                          rules_file=args.rules)
+    if args.checkpoint and not args.full and os.path.exists(args.output):
+        collector.load_from_json(args.output, ndjson=args.ndjson)
+    collector.collect_commands(workers=args.workers, chunk_size=args.chunk_size, full=args.full)
+    collector.save_to_json(output_file=args.output, ndjson=args.ndjson)
+    if args.clusters:
+        collector.save_clusters_to_json(args.clusters, threshold=args.cluster_threshold)
+    if args.index:
+        with CommandIndex(args.index) as index:
+            index.add_store(collector.commands)
+
 
 if __name__ == "__main__":
-    collector = MaliciousCommandCollector(honeypot_dir='path/to/honeypots')
-    collector.collect_commands()
-    collector.save_to_json(output_file='malicious_commands.json')
\ No newline at end of file
+    main()
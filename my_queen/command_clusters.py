@@ -0,0 +1,123 @@
+import re
+import zlib
+import random
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python signatures are used instead
+    np = None
+
+MASK64 = (1 << 64) - 1
+
+# Parts attackers vary between otherwise identical payloads
+_URL_RE = re.compile(r'\b(?:https?|ftp|tftp)://\S+')
+_IPV4_RE = re.compile(r'\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b')
+_HEX_RE = re.compile(r'\b[0-9a-fA-F]{8,}\b')
+_DIGITS_RE = re.compile(r'\d+')
+
+
+def normalize_command(command):
+    command = _URL_RE.sub('<url>', command)
+    command = _IPV4_RE.sub('<ip>', command)
+    command = _HEX_RE.sub('<hex>', command)
+    return _DIGITS_RE.sub('0', command)
+
+
+def shingles(command, k=5):
+    text = normalize_command(command)
+    if len(text) <= k:
+        return {zlib.crc32(text.encode('utf-8'))}
+    data = text.encode('utf-8')
+    return {zlib.crc32(data[i:i + k]) for i in range(len(data) - k + 1)}
+
+
+class MinHasher:
+    """MinHash signatures over 32-bit shingle hashes (multiply-shift hashing)."""
+
+    def __init__(self, num_perm=64, seed=1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.a = [rng.getrandbits(64) | 1 for _ in range(num_perm)]
+        self.b = [rng.getrandbits(64) for _ in range(num_perm)]
+        if np is not None:
+            self._a = np.array(self.a, dtype=np.uint64)[:, None]
+            self._b = np.array(self.b, dtype=np.uint64)[:, None]
+
+    def signature(self, shingle_hashes):
+        if np is not None:
+            x = np.fromiter(shingle_hashes, dtype=np.uint64, count=len(shingle_hashes))[None, :]
+            with np.errstate(over='ignore'):
+                return tuple(((self._a * x + self._b) >> np.uint64(32)).min(axis=1).tolist())
+        return tuple(min(((a * x + b) & MASK64) >> 32 for x in shingle_hashes)
+                     for a, b in zip(self.a, self.b))
+
+
+def choose_bands(num_perm, threshold):
+    # (bands, rows) whose LSH threshold (1/bands)^(1/rows) is closest to `threshold`
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+def cluster_commands(commands, threshold=0.5, num_perm=64, seed=1, max_anchors=8):
+    """Group near-duplicate commands with MinHash + LSH banding.
+
+    `commands` maps command -> occurrence count. Only commands that share an
+    LSH bucket are compared, and a pair is merged when its estimated Jaccard
+    similarity reaches `threshold`, so the work grows roughly linearly with
+    the number of commands. Returns a list of clusters, largest first, each
+    {'representative', 'members', 'count'}; the representative is the
+    member seen most often.
+    """
+    hasher = MinHasher(num_perm, seed)
+    bands, rows = choose_bands(num_perm, threshold)
+    min_agree = threshold * num_perm
+
+    items = list(commands.items())
+    signatures = [hasher.signature(shingles(command)) for command, count in items]
+    parent = list(range(len(items)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for band in range(bands):
+        start = band * rows
+        # Each bucket keeps a few anchors; a new member is compared with them
+        # instead of with every other member of the bucket
+        buckets = {}
+        for i, sig in enumerate(signatures):
+            anchors = buckets.setdefault(sig[start:start + rows], [])
+            for anchor in anchors:
+                if find(i) == find(anchor):
+                    break
+                agree = sum(1 for x, y in zip(sig, signatures[anchor]) if x == y)
+                if agree >= min_agree:
+                    parent[find(i)] = find(anchor)
+                    break
+            else:
+                if len(anchors) < max_anchors:
+                    anchors.append(i)
+
+    groups = {}
+    for i in range(len(items)):
+        groups.setdefault(find(i), []).append(i)
+
+    clusters = []
+    for members in groups.values():
+        representative = max(members, key=lambda i: (items[i][1], -i))
+        clusters.append({
+            'representative': items[representative][0],
+            'members': len(members),
+            'count': sum(items[i][1] for i in members),
+        })
+    clusters.sort(key=lambda c: (-c['count'], c['representative']))
+    return clusters
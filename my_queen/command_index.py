@@ -0,0 +1,189 @@
+import json
+import sqlite3
+import argparse
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS commands (
+    id INTEGER PRIMARY KEY,
+    ttp TEXT NOT NULL,
+    command TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    first_seen TEXT,
+    last_seen TEXT,
+    UNIQUE (ttp, command)
+);
+CREATE INDEX IF NOT EXISTS idx_commands_first_seen ON commands (first_seen);
+CREATE INDEX IF NOT EXISTS idx_commands_last_seen ON commands (last_seen);
+CREATE TABLE IF NOT EXISTS command_sources (
+    source_file TEXT NOT NULL,
+    command_id INTEGER NOT NULL REFERENCES commands (id),
+    PRIMARY KEY (source_file, command_id)
+) WITHOUT ROWID;
+"""
+
+# Trigram full-text index for substring search (SQLite >= 3.34). Without it
+# substring queries fall back to an instr() scan. Both are case-sensitive,
+# like the shell, so a query gives the same rows whatever the term's length.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS commands_fts
+    USING fts5(command, content='commands', content_rowid='id', tokenize='trigram case_sensitive 1');
+CREATE TRIGGER IF NOT EXISTS commands_fts_insert AFTER INSERT ON commands BEGIN
+    INSERT INTO commands_fts (rowid, command) VALUES (new.id, new.command);
+END;
+"""
+
+UPSERT_ACCUMULATE = """
+INSERT INTO commands (ttp, command, count, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (ttp, command) DO UPDATE SET
+    count = count + excluded.count,
+    first_seen = coalesce(min(first_seen, excluded.first_seen), first_seen, excluded.first_seen),
+    last_seen = coalesce(max(last_seen, excluded.last_seen), last_seen, excluded.last_seen)
+"""
+
+UPSERT_TOTALS = UPSERT_ACCUMULATE.replace("count = count + excluded.count", "count = excluded.count")
+
+INSERT_SOURCE = """
+INSERT OR IGNORE INTO command_sources (source_file, command_id)
+SELECT ?, id FROM commands WHERE ttp = ? AND command = ?
+"""
+
+
+class CommandIndex:
+    """SQLite store of collected commands, indexed for analyst queries.
+
+    Rows are one distinct (ttp, command) pair each, with its count and
+    first/last seen times. Source files are kept in a side table. Queries
+    can filter by TTP, time range, source file and command substring.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+        self.has_fts = self._create_fts()
+
+    def _create_fts(self):
+        try:
+            with self.conn:
+                existing = self.conn.execute(
+                    "SELECT sql FROM sqlite_master WHERE name = 'commands_fts'").fetchone()
+                rebuild = existing is not None and 'case_sensitive 1' not in existing[0]
+                if rebuild:
+                    # Indexes made before the search was case-sensitive
+                    self.conn.execute("DROP TABLE commands_fts")
+                self.conn.executescript(FTS_SCHEMA)
+                if rebuild:
+                    self.conn.execute("INSERT INTO commands_fts (commands_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError:
+            return False
+
+    def add_store(self, store, batch_size=10000, accumulate=False):
+        """Write a CommandStore into the index, batch_size records per transaction.
+
+        By default counts are replaced by the store's totals, which is what a
+        collector run holds (full rescan, or previous output plus new bytes).
+        With accumulate=True counts are added, for feeding per-run deltas.
+        """
+        upsert = UPSERT_ACCUMULATE if accumulate else UPSERT_TOTALS
+        rows = []
+        sources = []
+        for record in store.iter_records():
+            rows.append((record['ttp'], record['command'], record['count'],
+                         record['first_seen'], record['last_seen']))
+            sources.extend((source, record['ttp'], record['command']) for source in record['sources'])
+            if len(rows) >= batch_size:
+                self._write_batch(upsert, rows, sources)
+                rows, sources = [], []
+        if rows:
+            self._write_batch(upsert, rows, sources)
+
+    def _write_batch(self, upsert, rows, sources):
+        with self.conn:
+            self.conn.executemany(upsert, rows)
+            self.conn.executemany(INSERT_SOURCE, sources)
+
+    def query(self, ttp=None, since=None, until=None, source_file=None, contains=None, limit=None):
+        """Commands matching every given filter, most recently seen first.
+
+        since/until select commands whose [first_seen, last_seen] span
+        overlaps the range; both are "YYYY-MM-DDTHH:MM:SS" strings (a date
+        prefix such as "2024-05" works too).
+        """
+        clauses = []
+        params = []
+        if ttp is not None:
+            clauses.append("c.ttp = ?")
+            params.append(ttp)
+        if since is not None:
+            clauses.append("c.last_seen >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("c.first_seen <= ?")
+            params.append(until)
+        if source_file is not None:
+            clauses.append("c.id IN (SELECT command_id FROM command_sources WHERE source_file = ?)")
+            params.append(source_file)
+        if contains:
+            if self.has_fts and len(contains) >= 3:
+                clauses.append("c.id IN (SELECT rowid FROM commands_fts WHERE commands_fts MATCH ?)")
+                params.append('"' + contains.replace('"', '""') + '"')
+            else:
+                clauses.append("instr(c.command, ?) > 0")
+                params.append(contains)
+
+        sql = "SELECT c.id, c.ttp, c.command, c.count, c.first_seen, c.last_seen FROM commands c"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY c.last_seen DESC, c.id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        results = []
+        for row in self.conn.execute(sql, params):
+            record = dict(row)
+            record['sources'] = [r[0] for r in self.conn.execute(
+                "SELECT source_file FROM command_sources WHERE command_id = ? ORDER BY source_file",
+                (record.pop('id'),))]
+            results.append(record)
+        return results
+
+    def ttp_counts(self):
+        return {row['ttp']: row['total'] for row in self.conn.execute(
+            "SELECT ttp, sum(count) AS total FROM commands GROUP BY ttp ORDER BY total DESC")}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the collected honeypot command index.')
+    parser.add_argument('db_path')
+    parser.add_argument('--ttp')
+    parser.add_argument('--since')
+    parser.add_argument('--until')
+    parser.add_argument('--source-file')
+    parser.add_argument('--contains')
+    parser.add_argument('--limit', type=int, default=100)
+    args = parser.parse_args()
+
+    with CommandIndex(args.db_path) as index:
+        for record in index.query(ttp=args.ttp, since=args.since, until=args.until,
+                                  source_file=args.source_file, contains=args.contains,
+                                  limit=args.limit):
+            print(json.dumps(record))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import sys
+import json
+
+
+class CommandStats:
+    __slots__ = ('count', 'first_seen', 'last_seen', 'sources')
+
+    def __init__(self, count=0, first_seen=None, last_seen=None, sources=()):
+        self.count = count
+        self.first_seen = first_seen
+        self.last_seen = last_seen
+        # Created on first use: most commands come from a single file
+        self.sources = set(sources) if sources else None
+
+    def add(self, seen=None, count=1, source=None):
+        self.count += count
+        if source is not None:
+            if self.sources is None:
+                self.sources = set()
+            self.sources.add(sys.intern(source))
+        if seen is not None:
+            if self.first_seen is None or seen < self.first_seen:
+                self.first_seen = seen
+            if self.last_seen is None or seen > self.last_seen:
+                self.last_seen = seen
+
+    def merge(self, other):
+        self.count += other.count
+        if other.sources:
+            if self.sources is None:
+                self.sources = set()
+            self.sources.update(other.sources)
+        if other.first_seen is not None:
+            self.add(other.first_seen, count=0)
+        if other.last_seen is not None:
+            self.add(other.last_seen, count=0)
+
+
+class CommandStore:
+    """Distinct commands per TTP with occurrence counts and first/last seen times.
+
+    Memory grows with the number of distinct commands, not with the number
+    of log lines. Command strings and source file names are interned so
+    each one is stored once.
+    """
+
+    def __init__(self):
+        self.ttps = {}
+
+    def add(self, ttp, command, seen=None, count=1, source=None):
+        commands = self.ttps.get(ttp)
+        if commands is None:
+            commands = self.ttps[ttp] = {}
+        stats = commands.get(command)
+        if stats is None:
+            stats = commands[sys.intern(command)] = CommandStats()
+        stats.add(seen, count, source)
+
+    def merge(self, other):
+        for ttp, commands in other.ttps.items():
+            mine = self.ttps.get(ttp)
+            if mine is None:
+                mine = self.ttps[ttp] = {}
+            for command, stats in commands.items():
+                current = mine.get(command)
+                if current is None:
+                    mine[sys.intern(command)] = CommandStats(stats.count, stats.first_seen,
+                                                             stats.last_seen, stats.sources)
+                else:
+                    current.merge(stats)
+
+    def __getitem__(self, ttp):
+        return self.ttps[ttp]
+
+    def __contains__(self, ttp):
+        return ttp in self.ttps
+
+    def __len__(self):
+        return len(self.ttps)
+
+    def __iter__(self):
+        return iter(self.ttps)
+
+    def items(self):
+        return self.ttps.items()
+
+    def iter_records(self):
+        for ttp, commands in self.ttps.items():
+            for command, stats in commands.items():
+                yield {
+                    'ttp': ttp,
+                    'command': command,
+                    'count': stats.count,
+                    'first_seen': stats.first_seen,
+                    'last_seen': stats.last_seen,
+                    'sources': sorted(stats.sources or ()),
+                }
+
+    def to_dict(self):
+        return {ttp: [{'command': command, 'count': stats.count,
+                       'first_seen': stats.first_seen, 'last_seen': stats.last_seen,
+                       'sources': sorted(stats.sources or ())}
+                      for command, stats in commands.items()]
+                for ttp, commands in self.ttps.items()}
+
+    def write_json(self, file):
+        json.dump(self.to_dict(), file, indent=4)
+
+    def write_ndjson(self, file):
+        # One record per line, written as it is produced
+        for record in self.iter_records():
+            file.write(json.dumps(record))
+            file.write('\n')
+
+    def load_json(self, file):
+        for ttp, entries in json.load(file).items():
+            for entry in entries:
+                if isinstance(entry, str):
+                    # Output of older versions: one list item per occurrence
+                    self.add(ttp, entry)
+                else:
+                    self._add_record(ttp, entry)
+
+    def load_ndjson(self, file):
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                self._add_record(record['ttp'], record)
+
+    def _add_record(self, ttp, record):
+        command = record['command']
+        self.add(ttp, command, record.get('first_seen'), record.get('count', 1))
+        if record.get('last_seen') is not None:
+            self.add(ttp, command, record['last_seen'], count=0)
+        for source in record.get('sources', ()):
+            self.add(ttp, command, count=0, source=source)
@@ -0,0 +1,158 @@
+import bisect
+import threading
+from collections import OrderedDict
+
+from my_queen.auth_log_parser import FAILURE, INVALID_USER
+from my_queen.squid_parser import record_epoch
+
+PAM = 'pam'
+SQUID = 'squid'
+
+
+class _IPEvents:
+    __slots__ = ('times', 'events')
+
+    def __init__(self):
+        # One time-sorted list per source
+        self.times = {PAM: [], SQUID: []}
+        self.events = {PAM: [], SQUID: []}
+
+
+class IPCorrelationIndex:
+    """Source IPs seen both failing SSH/PAM logins and POSTing through Squid.
+
+    Events are kept per IP in time-sorted lists, one per source. Adding
+    an event looks up the other source's events for that IP within
+    `window` seconds by binary search, so every new correlation is
+    returned as it happens instead of after an offline join. Events older
+    than `retention` seconds (measured against the newest timestamp
+    seen) are expired, IPs with nothing left are dropped from the front of
+    an LRU, and each IP keeps at most `max_events` per source. The index is
+    thread-safe, so several collectors can push into it at once.
+    """
+
+    def __init__(self, window=600, retention=3600, max_events=1000):
+        self.window = window
+        self.retention = max(retention, window)
+        self.max_events = max_events
+        self._ips = OrderedDict()   # ip -> _IPEvents, least recently updated first
+        self._watermark = None
+        self._lock = threading.Lock()
+
+    def add_pam_event(self, event):
+        """Adds a parsed auth event (AuthLogParser); returns the new correlations."""
+        if event.get('result') not in (FAILURE, INVALID_USER) or not event.get('ip'):
+            return []
+        summary = {'time': event['timestamp'], 'host': event.get('host'), 'user': event.get('user'),
+                   'result': event['result']}
+        return self._add(event['ip'], PAM, summary)
+
+    def add_squid_record(self, record):
+        """Adds a parsed Squid record (SquidLogParser.parse_records); only successful POSTs count."""
+        if record.get('method') != 'POST' or not str(record.get('status', '')).startswith('2'):
+            return []
+        summary = {'time': record_epoch(record), 'url': record.get('url'), 'proxy': record.get('proxy'),
+                   'status': record.get('status')}
+        return self._add(record['ip'], SQUID, summary)
+
+    def add_pam_events(self, events):
+        matches = []
+        for event in events:
+            matches.extend(self.add_pam_event(event))
+        return matches
+
+    def add_squid_records(self, records):
+        matches = []
+        for record in records:
+            matches.extend(self.add_squid_record(record))
+        return matches
+
+    def _add(self, ip, source, summary):
+        timestamp = summary['time']
+        other = SQUID if source == PAM else PAM
+        with self._lock:
+            if self._watermark is None or timestamp > self._watermark:
+                self._watermark = timestamp
+                self._expire()
+            if timestamp < self._watermark - self.retention:
+                return []
+
+            entry = self._ips.get(ip)
+            if entry is None:
+                entry = self._ips[ip] = _IPEvents()
+            else:
+                self._ips.move_to_end(ip)
+            times, events = entry.times[source], entry.events[source]
+            # Usually an append; out-of-order events are inserted in place
+            position = bisect.bisect_right(times, timestamp)
+            times.insert(position, timestamp)
+            events.insert(position, summary)
+            if len(times) > self.max_events:
+                del times[0], events[0]
+            self._trim(entry)
+
+            other_times = entry.times[other]
+            lo = bisect.bisect_left(other_times, timestamp - self.window)
+            hi = bisect.bisect_right(other_times, timestamp + self.window)
+            return [self._match(ip, summary if source == PAM else match, match if source == PAM else summary)
+                    for match in entry.events[other][lo:hi]]
+
+    def _match(self, ip, pam, squid):
+        return {'ip': ip, 'pam': pam, 'squid': squid, 'delta': squid['time'] - pam['time']}
+
+    def _expire(self):
+        cutoff = self._watermark - self.retention
+        ips = self._ips
+        # Only the least recently updated IPs can be entirely stale
+        while ips:
+            ip, entry = next(iter(ips.items()))
+            newest = max((times[-1] for times in entry.times.values() if times), default=None)
+            if newest is not None and newest >= cutoff:
+                break
+            ips.popitem(last=False)
+
+    def _trim(self, entry):
+        cutoff = self._watermark - self.retention
+        for source in (PAM, SQUID):
+            times = entry.times[source]
+            drop = bisect.bisect_left(times, cutoff)
+            if drop:
+                del times[:drop], entry.events[source][:drop]
+
+    def query(self, window=None, ip=None):
+        """All (pam, squid) pairs within `window` seconds (default: the index window), per IP.
+
+        Each IP is a linear merge of its two sorted lists, not a join of
+        everything against everything.
+        """
+        window = self.window if window is None else window
+        results = []
+        with self._lock:
+            if ip is None:
+                items = list(self._ips.items())
+            else:
+                items = [(ip, self._ips[ip])] if ip in self._ips else []
+            for address, entry in items:
+                self._trim(entry)
+                pam_times, squid_times = entry.times[PAM], entry.times[SQUID]
+                if not pam_times or not squid_times:
+                    continue
+                lo = 0
+                for i, pam_time in enumerate(pam_times):
+                    while lo < len(squid_times) and squid_times[lo] < pam_time - window:
+                        lo += 1
+                    hi = lo
+                    while hi < len(squid_times) and squid_times[hi] <= pam_time + window:
+                        results.append(self._match(address, entry.events[PAM][i], entry.events[SQUID][hi]))
+                        hi += 1
+        return results
+
+    def correlated_ips(self, window=None):
+        """{ip: number of correlated pairs} for IPs seen on both sides within the window."""
+        counts = {}
+        for match in self.query(window):
+            counts[match['ip']] = counts.get(match['ip'], 0) + 1
+        return counts
+
+    def __len__(self):
+        return len(self._ips)
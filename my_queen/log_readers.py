@@ -0,0 +1,130 @@
+import os
+import re
+import bz2
+import gzip
+import lzma
+import mmap
+
+try:
+    import zstandard
+except ImportError:  # only needed for .zst archives
+    zstandard = None
+
+# honeypot.log, honeypot.log.1, honeypot.log.gz, honeypot.log.2.zst, ...
+LOG_NAME_RE = re.compile(r'\.log(?:\.\d+)?(?:\.(?:gz|bz2|xz|zst))?$')
+
+COMPRESSED_SUFFIXES = ('.gz', '.bz2', '.xz', '.zst')
+
+# The mmap scanner hands out the file in windows of about this many bytes,
+# each cut on a line boundary and split in one C-level call.
+SCAN_WINDOW = 8 * 1024 * 1024
+
+
+def is_honeypot_log(filename):
+    return LOG_NAME_RE.search(filename) is not None
+
+
+def is_compressed(file_path):
+    return file_path.endswith(COMPRESSED_SUFFIXES)
+
+
+def open_log(file_path):
+    """Open a (possibly compressed) log as a binary stream that decompresses as it is read."""
+    if file_path.endswith('.gz'):
+        return gzip.open(file_path, 'rb')
+    if file_path.endswith('.bz2'):
+        return bz2.open(file_path, 'rb')
+    if file_path.endswith('.xz'):
+        return lzma.open(file_path, 'rb')
+    if file_path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError(f"zstandard is required to read {file_path} (pip install zstandard)")
+        raw = open(file_path, 'rb')
+        return _ClosingReader(zstandard.ZstdDecompressor().stream_reader(raw), raw)
+    return open(file_path, 'rb')
+
+
+def read_head(file_path, length):
+    # First `length` bytes of the decompressed content
+    with open_log(file_path) as stream:
+        return stream.read(length)
+
+
+def iter_stream_lines(file_path, skip=0, accept=None):
+    """Yield decoded lines of a compressed log, streaming, after the first `skip` bytes."""
+    with open_log(file_path) as stream:
+        while skip > 0:
+            block = stream.read(min(skip, 1024 * 1024))
+            if not block:
+                return
+            skip -= len(block)
+        for raw in _iter_raw_lines(stream):
+            if accept is None or accept(raw):
+                yield raw.decode('utf-8', errors='replace')
+
+
+def iter_mmap_lines(file_path, start=0, end=None, accept=None):
+    """Yield decoded lines of a plain log between byte offsets start and end.
+
+    The file is scanned as bytes through mmap. Only lines for which
+    accept(raw_bytes) is true get decoded, so uninteresting lines cost a
+    split and a predicate call rather than a full text decode.
+    """
+    with open(file_path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if end is None or end > size:
+            end = size
+        if start >= end:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = start
+            while pos < end:
+                stop = min(pos + SCAN_WINDOW, end)
+                if stop < end:
+                    newline = mm.rfind(b'\n', pos, stop)
+                    if newline != -1:
+                        stop = newline + 1
+                    else:
+                        newline = mm.find(b'\n', stop, end)
+                        stop = end if newline == -1 else newline + 1
+                lines = mm[pos:stop].split(b'\n')
+                if lines[-1] == b'':
+                    lines.pop()
+                pos = stop
+                for raw in lines:
+                    if accept is None or accept(raw):
+                        yield raw.decode('utf-8', errors='replace')
+
+
+def _iter_raw_lines(stream):
+    pending = b''
+    while True:
+        block = stream.read(1024 * 1024)
+        if not block:
+            break
+        lines = (pending + block).split(b'\n')
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+class _ClosingReader:
+    # zstandard's stream_reader does not close the file it wraps
+
+    def __init__(self, reader, raw):
+        self.reader = reader
+        self.raw = raw
+
+    def read(self, size=-1):
+        return self.reader.read(size)
+
+    def close(self):
+        self.reader.close()
+        self.raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,33 +1,100 @@
-```python
-import paramiko
 import os
 import re
+import shlex
+
+from my_queen.ssh_pool import default_pool
+from my_queen.remote_cursor import RemoteFileCursor
+from my_queen.remote_stream import exec_lines, TransferStats
+from my_queen.auth_log_parser import AuthLogParser, BruteForceDetector
+from my_queen.auth_follow import AuthLogFollower
 
 class PAMAuthLogAPI:
-    def __init__(self, hostname, username, password):
+    def __init__(self, hostname, username, password, pool=None, compression=None,
+                 log_path='/var/log/auth.log', port=22, timeout=None, cursor_state_file=None):
         self.hostname = hostname
+        self.port = port
         self.username = username
         self.password = password
-        self.ssh_client = paramiko.SSHClient()
-        self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        self.log_path = log_path
+        # Seconds a remote read may stall before it fails (None waits forever)
+        self.timeout = timeout
+        # connect() borrows a session from the pool, close() hands it back
+        self.pool = pool or default_pool
+        self.ssh_client = None
+        # 'gzip' or 'zstd' compresses the output on the remote side; the
+        # bytes on the wire and after decompression add up in transfer_stats
+        self.compression = compression
+        self.transfer_stats = TransferStats()
+        # Position in the remote log for iter_new_auth_events; the first read starts at the top
+        self.cursor = RemoteFileCursor(log_path, state_file=cursor_state_file, from_start=True,
+                                       compression=compression, stats=self.transfer_stats)
 
     def connect(self):
-        self.ssh_client.connect(self.hostname, username=self.username, password=self.password)
+        if self.ssh_client is None:
+            self.ssh_client = self.pool.acquire(self.hostname, self.username, self.password, self.port)
+
+    def iter_failed_auths(self):
+        # Lines are yielded as they arrive instead of buffering the whole grep
+        for line in exec_lines(self.ssh_client, f"grep 'failed' {shlex.quote(self.log_path)}",
+                               timeout=self.timeout, compression=self.compression, stats=self.transfer_stats):
+            yield line.decode('utf-8', 'replace') + '\n'
+
+    def iter_auth_events(self, parser=None):
+        # Failed, invalid-user and accepted logins from sshd and PAM, parsed as they arrive
+        parser = parser or AuthLogParser()
+        command = ("grep -E 'Failed |Invalid user |authentication failure|Accepted |maximum authentication attempts' "
+                   f"{shlex.quote(self.log_path)}")
+        lines = exec_lines(self.ssh_client, command, timeout=self.timeout,
+                           compression=self.compression, stats=self.transfer_stats)
+        return parser.parse(lines)
+
+    def iter_new_auth_events(self, parser=None):
+        """Events from the lines appended since the cursor's position, as they stream in.
+
+        The cursor is not moved. Once the events are stored, the caller
+        passes `cursor.end_position` to `cursor.advance()` and saves the
+        cursor, so a failed run reads the same lines again. Errors are raised.
+        """
+        parser = parser or AuthLogParser()
+        return parser.parse(line for line, position in self.cursor.iter_new(self.ssh_client, timeout=self.timeout))
+
+    def detect_brute_force(self, detector=None):
+        # Alerts from a BruteForceDetector fed with iter_auth_events()
+        detector = detector or BruteForceDetector()
+        return detector.process(self.iter_auth_events())
+
+    def follow_failed_auths(self, callback=None, state_file=None, journal=False, **kwargs):
+        """New failure events only, from one long-lived `tail -F` (or journalctl -f) channel.
+
+        Returns the AuthLogFollower's event generator, or with `callback`
+        calls it for each event until the follower is stopped. With
+        `state_file` a restart resumes from the last delivered event.
+        """
+        follower = AuthLogFollower(self.pool, self.hostname, self.username, self.password, port=self.port,
+                                   log_path=self.log_path, state_file=state_file, journal=journal, **kwargs)
+        self.follower = follower
+        if callback is None:
+            return follower.events()
+        follower.run(callback)
 
     def fetch_failed_auths(self):
-        stdin, stdout, stderr = self.ssh_client.exec_command("grep 'failed' /var/log/auth.log")
-        failed_auths = stdout.read().decode()
-        return failed_auths
+        return ''.join(self.iter_failed_auths())
 
     def write_to_file(self, data, output_folder):
+        # `data` is a string or an iterable of lines, such as iter_failed_auths()
         if not os.path.exists(output_folder):
             os.makedirs(output_folder)
         output_file_path = os.path.join(output_folder, 'failed_auths.log')
         with open(output_file_path, 'w') as file:
-            file.write(data)
+            if isinstance(data, str):
+                file.write(data)
+            else:
+                file.writelines(data)
 
     def close(self):
-        self.ssh_client.close()
+        if self.ssh_client is not None:
+            self.pool.release(self.ssh_client)
+            self.ssh_client = None
 
 def main():
     hostname = 'your_raspberry_pi_ip'
@@ -37,9 +104,10 @@ def main():
 
     pam_api = PAMAuthLogAPI(hostname, username, password)
     pam_api.connect()
-    failed_auths = pam_api.fetch_failed_auths()
-    pam_api.write_to_file(failed_auths, output_folder)
+    pam_api.write_to_file(pam_api.iter_failed_auths(), output_folder)
+    for alert in pam_api.detect_brute_force():
+        print(alert)
     pam_api.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
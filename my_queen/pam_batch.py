@@ -0,0 +1,200 @@
+import os
+import sys
+import json
+import fcntl
+import time
+import uuid
+import socket
+import argparse
+import tempfile
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+from my_queen.ssh_pool import SSHSessionPool
+from my_queen.pam_auth_log_api import PAMAuthLogAPI
+from my_queen.auth_log_parser import FAILURE, INVALID_USER
+
+
+def load_inventory(path):
+    """List of hosts from a JSON file: [{"hostname", "username", "password", "port", "log_path"}, ...]."""
+    with open(path, 'r') as f:
+        inventory = json.load(f)
+    for host in inventory:
+        host.setdefault('port', 22)
+        host.setdefault('log_path', '/var/log/auth.log')
+    return inventory
+
+
+def new_run_id():
+    # Sorts by start time and is unique across concurrent runs and machines
+    return f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class _ShardWriter:
+    # One temporary file per day for a host; published with os.replace on commit
+
+    def __init__(self, output_dir, host, run_id):
+        self.output_dir = output_dir
+        self.host = host
+        self.run_id = run_id
+        self.files = {}     # day -> (file, temp path, final path)
+        self.counts = {}
+
+    def write(self, event):
+        day = datetime.fromtimestamp(event['timestamp'], timezone.utc).strftime('%Y-%m-%d')
+        entry = self.files.get(day)
+        if entry is None:
+            shard_dir = os.path.join(self.output_dir, f"host={self.host.replace(os.sep, '_')}", f"day={day}")
+            os.makedirs(shard_dir, exist_ok=True)
+            final_path = os.path.join(shard_dir, f"failed_auths-{self.run_id}.jsonl")
+            tmp = tempfile.NamedTemporaryFile('w', delete=False, dir=shard_dir, suffix='.tmp')
+            entry = self.files[day] = (tmp, tmp.name, final_path)
+            self.counts[day] = 0
+        entry[0].write(json.dumps(event) + '\n')
+        self.counts[day] += 1
+
+    def commit(self):
+        shards = []
+        for day, (tmp, temp_name, final_path) in sorted(self.files.items()):
+            tmp.close()
+            os.replace(temp_name, final_path)
+            shards.append({'day': day, 'path': os.path.relpath(final_path, self.output_dir),
+                           'events': self.counts[day], 'bytes': os.path.getsize(final_path)})
+        self.files = {}
+        return shards
+
+    def abort(self):
+        for tmp, temp_name, final_path in self.files.values():
+            tmp.close()
+            os.remove(temp_name)
+        self.files = {}
+
+
+class PAMBatchCollector:
+    """Collects failed-auth events from every host of an inventory in parallel.
+
+    Hosts are fetched on a bounded thread pool (with an SSH pool of the
+    same size), so wall time grows with hosts / workers. Each host's events
+    are parsed as they stream in and written to per-host, per-day shards:
+
+        <output_dir>/host=<name>/day=<YYYY-MM-DD>/failed_auths-<run_id>.jsonl
+
+    Shards are written to temporary files and moved into place only when
+    the host finished, and every file name carries the run id, so
+    concurrent or repeated runs never overwrite each other. Each run ends
+    with ``<output_dir>/manifests/<run_id>.json`` listing every host's
+    status, shards and transfer stats.
+
+    Each host keeps a RemoteFileCursor in `cursor_dir` (default
+    ``<output_dir>/cursors``). The first run reads the whole log, later runs
+    only the lines appended since, so no event is stored twice. The cursor
+    is saved, and events are pushed to `correlation`, only after the
+    host's shards were committed; a failed host is read again next run.
+    A per-host lock file next to the cursor is held from the read to the
+    save, so concurrent runs take turns on a host instead of both
+    collecting the same lines.
+    """
+
+    def __init__(self, inventory, output_dir, max_workers=16, timeout=60, compression=None,
+                 results=(FAILURE, INVALID_USER), pool=None, correlation=None, cursor_dir=None):
+        self.inventory = inventory
+        self.output_dir = output_dir
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.compression = compression
+        self.results = set(results)
+        self.pool = pool or SSHSessionPool(max_sessions=max_workers)
+        # Optional IPCorrelationIndex every collected event is pushed into
+        self.correlation = correlation
+        self.cursor_dir = cursor_dir or os.path.join(output_dir, 'cursors')
+
+    def run(self, run_id=None):
+        run_id = run_id or new_run_id()
+        started = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        t0 = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(self.inventory)))) as executor:
+            hosts = list(executor.map(lambda host: self._collect_host(host, run_id), self.inventory))
+
+        manifest = {
+            'run_id': run_id,
+            'started': started,
+            'elapsed': time.monotonic() - t0,
+            'output_dir': os.path.abspath(self.output_dir),
+            'hosts': hosts,
+            'events': sum(host['events'] for host in hosts),
+            'failed_hosts': [host['name'] for host in hosts if host['status'] != 'ok'],
+        }
+        self._write_manifest(run_id, manifest)
+        return manifest
+
+    def _collect_host(self, host, run_id):
+        name = host.get('name') or host['hostname']
+        t0 = time.monotonic()
+        cursor_file = self._cursor_file(name)
+        with open(cursor_file + '.lock', 'a') as lock:
+            # Held until the cursor is saved; the cursor is loaded only once it is ours
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            api = PAMAuthLogAPI(host['hostname'], host['username'], host.get('password'), pool=self.pool,
+                                compression=host.get('compression', self.compression), log_path=host['log_path'],
+                                port=host['port'], timeout=self.timeout, cursor_state_file=cursor_file)
+            writer = _ShardWriter(self.output_dir, name, run_id)
+            try:
+                api.connect()
+                for event in api.iter_new_auth_events():
+                    if event['result'] in self.results:
+                        writer.write(event)
+                shards = writer.commit()
+                api.cursor.advance(api.cursor.end_position)
+                api.cursor.save()
+            except Exception as e:
+                writer.abort()
+                return {'name': name, 'status': 'error', 'error': str(e), 'events': 0, 'shards': [],
+                        'elapsed': time.monotonic() - t0}
+            finally:
+                api.close()
+        if self.correlation is not None:
+            # Only events that made it into a committed shard, read back from disk
+            # so a large first run is not held in memory
+            for shard in shards:
+                with open(os.path.join(self.output_dir, shard['path']), 'r') as f:
+                    for line in f:
+                        self.correlation.add_pam_event(json.loads(line))
+        return {'name': name, 'status': 'ok', 'events': sum(shard['events'] for shard in shards),
+                'shards': shards, 'transfer': api.transfer_stats.to_dict(), 'elapsed': time.monotonic() - t0}
+
+    def _cursor_file(self, name):
+        os.makedirs(self.cursor_dir, exist_ok=True)
+        return os.path.join(self.cursor_dir, f"{name.replace(os.sep, '_')}.cursor.json")
+
+    def _write_manifest(self, run_id, manifest):
+        manifest_dir = os.path.join(self.output_dir, 'manifests')
+        os.makedirs(manifest_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', delete=False, dir=manifest_dir, suffix='.tmp') as tmp:
+            json.dump(manifest, tmp, indent=4)
+            temp_name = tmp.name
+        os.replace(temp_name, os.path.join(manifest_dir, f"{run_id}.json"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Collect failed SSH/PAM logins from many hosts in parallel.')
+    parser.add_argument('inventory', help='JSON list of hosts')
+    parser.add_argument('--output-dir', default='PAM_test/collected')
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--timeout', type=float, default=60, help='seconds a host may stall before it is failed')
+    parser.add_argument('--compression', choices=['gzip', 'zstd'])
+    parser.add_argument('--cursor-dir', help="where each host's read position is kept (default: <output-dir>/cursors)")
+    args = parser.parse_args()
+
+    collector = PAMBatchCollector(load_inventory(args.inventory), args.output_dir, max_workers=args.workers,
+                                  timeout=args.timeout, compression=args.compression, cursor_dir=args.cursor_dir)
+    manifest = collector.run()
+    print(f"Run {manifest['run_id']}: {manifest['events']} events from {len(manifest['hosts'])} hosts "
+          f"in {manifest['elapsed']:.1f}s")
+    for host in manifest['hosts']:
+        if host['status'] != 'ok':
+            print(f"{host['name']}: {host['error']}", file=sys.stderr)
+    sys.exit(1 if manifest['failed_hosts'] else 0)
+
+
+if __name__ == "__main__":
+    main()
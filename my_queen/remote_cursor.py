@@ -0,0 +1,182 @@
+import os
+import json
+import shlex
+import tempfile
+
+from my_queen.remote_stream import exec_chunks
+
+READ_CHUNK = 1024 * 1024
+
+
+class RemoteFileCursor:
+    """Reads only the bytes appended to a remote log since the last call.
+
+    The cursor remembers the remote file's inode and the byte offset just
+    past the last complete line that was handed out. Each `read_lines` call
+    stats the log (and its ``.1`` rotation), then seeks over SFTP and reads
+    the new bytes. When the inode changed, the rest of the rotated file is
+    read first and the new file from the start, so no line is skipped or
+    repeated. A half-written last line is left for the next call.
+
+    With `state_file`, the position survives restarts; call `save()` once
+    the returned lines have been handled. `read_new` returns the lines and
+    the position after them without moving the cursor, for callers that
+    only accept the lines later (`advance` then moves it); `iter_new` streams
+    them with the position after each line. With `compression`, the byte
+    range is read by `tail | head` piped through gzip or zstd instead of
+    SFTP, and `stats` (a TransferStats) counts the saving.
+    """
+
+    def __init__(self, path, state_file=None, from_start=False, rotated_suffix='.1',
+                 compression=None, stats=None):
+        self.path = path
+        self.rotated_path = path + rotated_suffix
+        self.state_file = state_file
+        self.from_start = from_start
+        self.compression = compression
+        self.stats = stats
+        self.inode = None
+        self.offset = 0
+        # Where the last iter_new/read_new stopped; see iter_new
+        self.end_position = None
+        self.load()
+
+    def load(self):
+        if self.state_file and os.path.exists(self.state_file):
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+            if state.get('path') == self.path:
+                self.inode = state['inode']
+                self.offset = state['offset']
+
+    def save(self):
+        if not self.state_file:
+            return
+        dirn = os.path.dirname(self.state_file) or '.'
+        with tempfile.NamedTemporaryFile('w', delete=False, dir=dirn) as tmp:
+            json.dump({'path': self.path, 'inode': self.inode, 'offset': self.offset}, tmp)
+            temp_name = tmp.name
+        os.replace(temp_name, self.state_file)
+
+    def read_lines(self, ssh, timeout=None):
+        """New complete lines (bytes, without the newline) from an SSHClient."""
+        lines, position = self.read_new(ssh, timeout)
+        self.advance(position)
+        return lines
+
+    def advance(self, position):
+        """Moves the cursor to a position returned by read_new."""
+        self.inode, self.offset = position
+
+    def read_new(self, ssh, timeout=None):
+        """(lines, position) like read_lines, but the cursor stays where it is."""
+        lines = [line for line, position in self.iter_new(ssh, timeout)]
+        return lines, self.end_position
+
+    def iter_new(self, ssh, timeout=None):
+        """Streams (line, position after that line) without moving the cursor.
+
+        Lines arrive as the remote bytes do, so a large backlog is never held
+        in memory. Once the iterator is exhausted, `end_position` is the
+        position past the last complete line, which can differ from the last
+        yielded one (after a rotation, or on a first run without `from_start`).
+        """
+        self.end_position = (self.inode, self.offset)
+        current, rotated = self._stat(ssh, timeout)
+        if current is None:
+            return
+        inode, size = current
+
+        cursor_inode, offset = self.inode, self.offset
+        if cursor_inode is None:
+            # First run: only what gets written from now on, unless asked otherwise
+            cursor_inode, offset = inode, (0 if self.from_start else size)
+
+        # Nothing is moved here, so a failed or discarded read is retried
+        # from the same place next time
+        reader = _RangeReader(ssh, timeout, self.compression, self.stats)
+        try:
+            if inode != cursor_inode:
+                if rotated is not None and rotated[0] == cursor_inode:
+                    # The rotated file is finished, its last line will not grow
+                    yield from self._iter_lines(reader, self.rotated_path, cursor_inode, offset, rotated[1],
+                                                finished=True)
+                offset = 0
+            elif size < offset:
+                # Truncated in place (copytruncate)
+                offset = 0
+            self.end_position = (inode, offset)
+            yield from self._iter_lines(reader, self.path, inode, offset, size)
+        finally:
+            reader.close()
+
+    def _iter_lines(self, reader, path, inode, start, end, finished=False):
+        # (line, position) for the complete lines of path[start:end]; a half-written last
+        # line is left for the next read unless the file is `finished`
+        offset, carry = start, b''
+        for data in self._iter_range(reader, path, start, end):
+            lines = (carry + data).split(b'\n')
+            carry = lines.pop()
+            for line in lines:
+                offset += len(line) + 1
+                if not finished:
+                    self.end_position = (inode, offset)
+                yield line.rstrip(b'\r'), (inode, offset)
+        if carry and finished:
+            yield carry.rstrip(b'\r'), (inode, end)
+
+    def _stat(self, ssh, timeout=None):
+        command = (f"stat -L -c '%i %s' {shlex.quote(self.path)} 2>/dev/null || echo -; "
+                   f"stat -L -c '%i %s' {shlex.quote(self.rotated_path)} 2>/dev/null || echo -")
+        stdin, stdout, stderr = ssh.exec_command(command, timeout=timeout)
+        results = []
+        for line in stdout.read().decode('utf-8').splitlines()[:2]:
+            parts = line.split()
+            results.append((int(parts[0]), int(parts[1])) if len(parts) == 2 else None)
+        while len(results) < 2:
+            results.append(None)
+        return results
+
+    def _iter_range(self, reader, path, start, end):
+        # The bytes of path[start:end], in chunks as they arrive
+        if end <= start:
+            return
+        if reader.compression:
+            command = f"tail -c +{start + 1} {shlex.quote(path)} | head -c {end - start}"
+            yield from exec_chunks(reader.ssh, command, timeout=reader.timeout,
+                                   compression=reader.compression, stats=reader.stats)
+            return
+        with reader.sftp().open(path, 'rb') as remote:
+            remote.seek(start)
+            remote.prefetch(end)
+            remaining = end - start
+            while remaining > 0:
+                part = remote.read(min(READ_CHUNK, remaining))
+                if not part:
+                    break
+                remaining -= len(part)
+                if reader.stats is not None:
+                    reader.stats.wire_bytes += len(part)
+                    reader.stats.bytes += len(part)
+                yield part
+
+
+class _RangeReader:
+    # Opens the SFTP session only when an uncompressed read needs it
+
+    def __init__(self, ssh, timeout, compression, stats):
+        self.ssh = ssh
+        self.timeout = timeout
+        self.compression = compression
+        self.stats = stats
+        self._sftp = None
+
+    def sftp(self):
+        if self._sftp is None:
+            self._sftp = self.ssh.open_sftp()
+            self._sftp.get_channel().settimeout(self.timeout)
+        return self._sftp
+
+    def close(self):
+        if self._sftp is not None:
+            self._sftp.close()
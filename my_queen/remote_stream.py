@@ -0,0 +1,194 @@
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # only needed for compression='zstd'
+    zstandard = None
+
+CHUNK_SIZE = 64 * 1024
+# How much of a remote command's stderr is kept for its error message
+STDERR_LIMIT = 64 * 1024
+
+# Remote filters appended to the command for each compression mode
+COMPRESSORS = {
+    'gzip': 'gzip -c -1',
+    'zstd': 'zstd -c -q -3',
+}
+
+
+class RemoteCommandError(RuntimeError):
+    """A remote command exited with a failure status."""
+
+    def __init__(self, command, status, stderr=b''):
+        self.command = command
+        self.status = status
+        self.stderr = bytes(stderr)
+        message = self.stderr.decode('utf-8', 'replace').strip() or 'no error output'
+        super().__init__(f"Remote command failed with exit status {status}: {message}")
+
+
+class TransferStats:
+    """Bytes received over SSH against bytes after decompression."""
+
+    def __init__(self):
+        self.wire_bytes = 0
+        self.bytes = 0
+
+    @property
+    def ratio(self):
+        return self.bytes / self.wire_bytes if self.wire_bytes else 1.0
+
+    def to_dict(self):
+        return {'wire_bytes': self.wire_bytes, 'bytes': self.bytes, 'ratio': round(self.ratio, 2)}
+
+
+def iter_channel_chunks(channel, chunk_size=CHUNK_SIZE, stderr=None):
+    """Raw stdout reads until EOF; stderr is drained as it arrives so it
+    cannot fill the SSH window and stall stdout. The start of it is kept in
+    `stderr` (a bytearray) when one is given."""
+    while True:
+        while channel.recv_stderr_ready():
+            _keep_stderr(stderr, channel.recv_stderr(chunk_size))
+        data = channel.recv(chunk_size)
+        if not data:
+            return
+        yield data
+
+
+def _keep_stderr(stderr, data):
+    if stderr is not None and len(stderr) < STDERR_LIMIT:
+        stderr += data[:STDERR_LIMIT - len(stderr)]
+
+
+def check_exit_status(channel, command, stderr=None, timeout=None, chunk_size=CHUNK_SIZE):
+    """Waits for the remote command to exit and raises RemoteCommandError on failure.
+
+    Exit status 1 without any error output is grep's "no lines matched", so
+    it counts as success. Anything else non-zero, such as a missing log, a
+    permission error or a missing gzip/zstd, is raised with its stderr.
+    """
+    stderr = bytearray() if stderr is None else stderr
+    # The rest of stderr can arrive after stdout has ended
+    while True:
+        data = channel.recv_stderr(chunk_size)
+        if not data:
+            break
+        _keep_stderr(stderr, data)
+    if not channel.status_event.wait(timeout):
+        raise RemoteCommandError(command, None, b'timed out waiting for the exit status')
+    status = channel.recv_exit_status()
+    if status == 0 or (status == 1 and not stderr.strip()):
+        return
+    raise RemoteCommandError(command, status, stderr)
+
+
+def iter_line_blocks(chunks):
+    """Regroups arbitrary chunks into blocks of complete lines.
+
+    Each block ends on a newline; the tail of a line that straddles two
+    chunks is carried over to the next block, and a last line without a
+    newline is yielded on its own at the end.
+    """
+    carry = b''
+    for data in chunks:
+        end = data.rfind(b'\n') + 1
+        if not end:
+            carry += data
+            continue
+        yield carry + data[:end]
+        carry = data[end:]
+    if carry:
+        yield carry + b'\n'
+
+
+def iter_channel_blocks(channel, chunk_size=CHUNK_SIZE):
+    """Yields the channel's stdout as blocks of complete lines, holding only
+    one read's worth of data at a time."""
+    return iter_line_blocks(iter_channel_chunks(channel, chunk_size))
+
+
+def iter_channel_lines(channel, chunk_size=CHUNK_SIZE):
+    """Yields the channel's stdout one line at a time (bytes, no newline)."""
+    for block in iter_channel_blocks(channel, chunk_size):
+        yield from block.splitlines()
+
+
+def compressed_command(command, compression):
+    if compression is None:
+        return command
+    if compression not in COMPRESSORS:
+        raise ValueError(f"Unknown compression: {compression}")
+    # pipefail (where the shell has it) keeps the command's own failure visible past the compressor
+    return f"set -o pipefail 2>/dev/null; ( {command} ) | {COMPRESSORS[compression]}"
+
+
+def decompress_chunks(chunks, compression, stats=None):
+    """Decompresses a gzip or zstd stream chunk by chunk, counting bytes in `stats`."""
+    if compression == 'gzip':
+        decompressor = zlib.decompressobj(wbits=31)
+        flush = decompressor.flush
+    elif compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstandard is required for compression='zstd' (pip install zstandard)")
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+        flush = decompressor.flush
+    else:
+        decompressor = None
+
+    for data in chunks:
+        if stats is not None:
+            stats.wire_bytes += len(data)
+        if decompressor is not None:
+            data = decompressor.decompress(data)
+        if data:
+            if stats is not None:
+                stats.bytes += len(data)
+            yield data
+    if decompressor is not None:
+        data = flush()
+        if data:
+            if stats is not None:
+                stats.bytes += len(data)
+            yield data
+
+
+def exec_chunks(ssh, command, chunk_size=CHUNK_SIZE, timeout=None, compression=None, stats=None):
+    """Runs `command` on an SSHClient and streams its raw (decompressed) output.
+
+    With `compression` ('gzip' or 'zstd') the output is compressed on the
+    remote side and decompressed here as it arrives. `stats`, a
+    TransferStats, is updated with the bytes on the wire and after
+    decompression. The channel is closed when the generator finishes or is
+    closed early, which also stops the remote command. Once the output has
+    ended, a failed exit status raises RemoteCommandError (see
+    check_exit_status), so a failure never looks like an empty log.
+    """
+    remote_command = compressed_command(command, compression)
+    stdin, stdout, stderr = ssh.exec_command(remote_command, timeout=timeout)
+    channel = stdout.channel
+    errors = bytearray()
+    try:
+        stdin.close()
+        yield from decompress_chunks(iter_channel_chunks(channel, chunk_size, errors), compression, stats)
+        check_exit_status(channel, remote_command, errors, timeout, chunk_size)
+    finally:
+        channel.close()
+
+
+def exec_blocks(ssh, command, chunk_size=CHUNK_SIZE, timeout=None, compression=None, stats=None):
+    """Like exec_chunks, regrouped into blocks of complete lines."""
+    chunks = exec_chunks(ssh, command, chunk_size, timeout, compression, stats)
+    try:
+        yield from iter_line_blocks(chunks)
+    finally:
+        chunks.close()
+
+
+def exec_lines(ssh, command, chunk_size=CHUNK_SIZE, timeout=None, compression=None, stats=None):
+    """Like exec_blocks, one line at a time (bytes, no newline)."""
+    blocks = exec_blocks(ssh, command, chunk_size, timeout, compression, stats)
+    try:
+        for block in blocks:
+            yield from block.splitlines()
+    finally:
+        blocks.close()
@@ -1,31 +1,22 @@
-```python
-import paramiko
 import re
 
-def get_squid_logs(hostname, port, username, password):
-    # Create an SSH client
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+from my_queen.ssh_pool import default_pool
+from my_queen.remote_stream import exec_lines
+
+def get_squid_logs(hostname, port, username, password, pool=None, compression=None):
+    pool = pool or default_pool
     
     try:
-        # Connect to the remote server
-        ssh.connect(hostname, port=port, username=username, password=password)
-        
-        # Execute the command to get the last 100 POST requests from Squid logs
-        command = "tail -n 100 /var/log/squid/access.log | grep 'POST' | grep '200'"
-        stdin, stdout, stderr = ssh.exec_command(command)
-        
-        # Read the output
-        output = stdout.read().decode('utf-8')
-        return output.splitlines()
+        # Borrow a pooled SSH session to the remote server
+        with pool.session(hostname, username, password, port=port) as ssh:
+            # Execute the command to get the last 100 POST requests from Squid logs
+            command = "tail -n 100 /var/log/squid/access.log | grep 'POST' | grep '200'"
+            # Stream the output line by line; compression is None, 'gzip' or 'zstd'
+            return [line.decode('utf-8', 'replace') for line in exec_lines(ssh, command, compression=compression)]
     
     except Exception as e:
         print(f"Error: {e}")
         return []
-    
-    finally:
-        # Close the SSH connection
-        ssh.close()
 
 if __name__ == "__main__":
     # Example usage
@@ -36,4 +27,4 @@ if __name__ == "__main__":
 
     logs = get_squid_logs(hostname, port, username, password)
     for log in logs:
-        print(log)
\ No newline at end of file
+        print(log)
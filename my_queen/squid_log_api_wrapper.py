@@ -1,34 +1,24 @@
-```python
-import paramiko
 import json
 
-def get_last_post_requests(hostname, username, password):
-    # Create an SSH client
-    client = paramiko.SSHClient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+from my_queen.ssh_pool import default_pool
+from my_queen.remote_stream import exec_lines
 
-    try:
-        # Connect to the server
-        client.connect(hostname, username=username, password=password)
-
-        # Command to get the last 100 POST requests from the Squid logs
-        command = "tail -n 100 /var/log/squid/access.log | grep 'POST' | grep '200'"
+def get_last_post_requests(hostname, username, password, pool=None, compression=None):
+    pool = pool or default_pool
 
-        # Execute the command
-        stdin, stdout, stderr = client.exec_command(command)
-        output = stdout.read().decode('utf-8')
+    try:
+        # Borrow a pooled SSH session to the server
+        with pool.session(hostname, username, password) as client:
+            # Command to get the last 100 POST requests from the Squid logs
+            command = "tail -n 100 /var/log/squid/access.log | grep 'POST' | grep '200'"
 
-        # Process the output into a list
-        logs = output.strip().split('\n')
-        return logs
+            # Execute the command and stream its output into a list
+            return [line.decode('utf-8', 'replace') for line in exec_lines(client, command, compression=compression)]
 
     except Exception as e:
         print(f"An error occurred: {e}")
         return []
 
-    finally:
-        client.close()
-
 if __name__ == "__main__":
     # Example usage
     hostname = "your_squid_server_ip"
@@ -36,4 +26,4 @@ if __name__ == "__main__":
     password = "your_password"
 
     logs = get_last_post_requests(hostname, username, password)
-    print(json.dumps(logs, indent=4))
\ No newline at end of file
+    print(json.dumps(logs, indent=4))
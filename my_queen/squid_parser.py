@@ -0,0 +1,169 @@
+import re
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:  # columns stay plain lists
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:  # to_dataframe is unavailable
+    pd = None
+
+NATIVE = 'native'
+COMBINED = 'combined'
+
+# Squid's default logformat:
+#   time elapsed remotehost code/status bytes method URL rfc931 peerstatus/peerhost type
+_NATIVE = (rb'^(?P<timestamp>\d+\.\d+) +(?P<elapsed>-?\d+) (?P<ip>\S+) (?P<result_code>[^/\s]+)/(?P<status>{status}) '
+           rb'(?P<bytes>\d+) (?P<method>{method}) (?P<url>\S+)')
+# Apache combined, as written by `logformat combined`
+_COMBINED = (rb'^(?P<ip>\S+) \S+ \S+ \[(?P<date>[^\]]+)\] "(?P<method>{method}) (?P<url>\S+)[^"]*" '
+             rb'(?P<status>{status}) (?P<bytes>\d+|-)')
+
+_NATIVE_LINE_RE = re.compile(rb'\s*\d+\.\d+ +-?\d+ ')
+_COMBINED_LINE_RE = re.compile(rb'\s*\S+ \S+ \S+ \[')
+
+COLUMNS = ('timestamp', 'elapsed', 'ip', 'result_code', 'status', 'bytes', 'method', 'url')
+
+
+def detect_format(data):
+    """NATIVE or COMBINED from the first line that looks like either; None if neither."""
+    for line in data.splitlines():
+        if _NATIVE_LINE_RE.match(line):
+            return NATIVE
+        if _COMBINED_LINE_RE.match(line):
+            return COMBINED
+    return None
+
+
+def _alternation(values, default):
+    if not values:
+        return default
+    return b'(?:' + b'|'.join(re.escape(str(v).encode('ascii')) for v in values) + b')'
+
+
+class SquidLogParser:
+    """Parses Squid access.log text in native or Apache-combined format.
+
+    Input is bytes. One precompiled regex is run over the whole buffer
+    with `findall`, so lines are never split or decoded first. Method and
+    status filters are compiled into the regex, and non-matching lines are
+    skipped inside the regex engine. `log_format='auto'` picks the format from
+    the first recognisable line of each buffer.
+
+    `parse_records` returns one dict per line, like the old
+    `process_log_output`. `parse_columns` returns one list per field
+    (numeric fields become numpy arrays when numpy is available), and
+    `to_dataframe` wraps those columns in a pandas DataFrame.
+    """
+
+    def __init__(self, log_format='auto', methods=None, statuses=None):
+        if log_format not in ('auto', NATIVE, COMBINED):
+            raise ValueError(f"Unknown Squid log format: {log_format}")
+        self.log_format = log_format
+        method = b'(?:' + _alternation(methods, rb'[A-Z_]+') + b')'
+        status = _alternation(statuses, rb'\d{3}')
+        self._regexes = {
+            NATIVE: re.compile(_NATIVE.replace(b'{method}', method).replace(b'{status}', status), re.M),
+            COMBINED: re.compile(_COMBINED.replace(b'{method}', method).replace(b'{status}', status), re.M),
+        }
+        self._epochs = {}
+
+    def _regex(self, data):
+        log_format = self.log_format
+        if log_format == 'auto':
+            log_format = detect_format(data)
+            if log_format is None:
+                return None, None
+        return log_format, self._regexes[log_format]
+
+    def parse_records(self, data):
+        log_format, regex = self._regex(data)
+        if regex is None:
+            return []
+        records = []
+        for match in regex.finditer(data):
+            fields = {key: value.decode('utf-8', 'replace') for key, value in match.groupdict().items()}
+            if log_format == NATIVE:
+                fields['date'] = fields.pop('timestamp')
+            records.append({
+                "ip": fields["ip"],
+                "date": fields["date"],
+                "method": fields["method"],
+                "url": fields["url"],
+                "status": fields["status"],
+                "bytes": fields["bytes"],
+                "elapsed": fields.get("elapsed"),
+                "result_code": fields.get("result_code"),
+            })
+        return records
+
+    def parse_columns(self, data):
+        """Dict of COLUMNS; timestamp is epoch seconds, elapsed is -1 when not logged."""
+        log_format, regex = self._regex(data)
+        if regex is None:
+            return {name: [] for name in COLUMNS}
+        groups = regex.groupindex
+        rows = regex.findall(data)
+        columns = dict(zip(sorted(groups, key=groups.get), zip(*rows))) if rows else {name: () for name in groups}
+
+        if log_format == NATIVE:
+            timestamps = columns['timestamp']
+            elapsed = columns['elapsed']
+            result_codes = _decode(columns['result_code'])
+        else:
+            epochs = self._combined_epochs(set(columns['date']))
+            timestamps = [epochs[date] for date in columns['date']]
+            elapsed = None
+            result_codes = [''] * len(rows)
+
+        return {
+            'timestamp': _numeric(timestamps, float),
+            'elapsed': _numeric(elapsed, int) if elapsed is not None else _numeric([-1] * len(rows), int),
+            'ip': _decode(columns['ip']),
+            'result_code': result_codes,
+            'status': _numeric(columns['status'], int),
+            'bytes': _numeric([b'0' if value == b'-' else value for value in columns['bytes']], int),
+            'method': _decode(columns['method']),
+            'url': _decode(columns['url']),
+        }
+
+    def to_dataframe(self, data):
+        if pd is None:
+            raise ImportError("to_dataframe requires pandas")
+        return pd.DataFrame(self.parse_columns(data), columns=list(COLUMNS))
+
+    def _combined_epochs(self, dates):
+        # Many lines share a second, so each distinct date is parsed once
+        epochs = self._epochs
+        if len(epochs) > 100000:
+            epochs.clear()
+        for date in dates:
+            if date not in epochs:
+                epochs[date] = datetime.strptime(date.decode('ascii'), '%d/%b/%Y:%H:%M:%S %z').timestamp()
+        return epochs
+
+
+def record_epoch(record):
+    """Epoch seconds of a parse_records dict, whichever format it came from."""
+    date = record["date"]
+    if record.get("elapsed") is not None:
+        return float(date)
+    return datetime.strptime(date, '%d/%b/%Y:%H:%M:%S %z').timestamp()
+
+
+def _decode(values):
+    # Every distinct value is decoded once
+    cache = {}
+    return [cache[v] if v in cache else cache.setdefault(v, v.decode('utf-8', 'replace')) for v in values]
+
+
+def _numeric(values, kind):
+    if np is not None:
+        dtype = np.float64 if kind is float else np.int64
+        if values and isinstance(values[0], bytes):
+            return np.array(values, dtype=bytes).astype(dtype)
+        return np.array(values, dtype=dtype)
+    return [kind(value) for value in values]
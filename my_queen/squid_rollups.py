@@ -0,0 +1,388 @@
+import os
+import sys
+import json
+import math
+import heapq
+import base64
+import hashlib
+import argparse
+import tempfile
+from array import array
+
+from my_queen.squid_parser import SquidLogParser, record_epoch
+from my_queen.remote_stream import iter_line_blocks
+
+MASK64 = (1 << 64) - 1
+
+
+def _hash64(key):
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _encode(buffer):
+    return base64.b64encode(bytes(buffer)).decode('ascii')
+
+
+class CountMinSketch:
+    """Approximate counts in fixed memory; estimates never undercount."""
+
+    def __init__(self, width=2048, depth=4):
+        self.width = width
+        self.depth = depth
+        self.table = array('Q', bytes(8 * width * depth))
+
+    def _cells(self, key):
+        h = _hash64(key)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        width = self.width
+        return [row * width + (h1 + row * h2) % width for row in range(self.depth)]
+
+    def add(self, key, count=1):
+        table = self.table
+        estimate = None
+        for cell in self._cells(key):
+            table[cell] += count
+            if estimate is None or table[cell] < estimate:
+                estimate = table[cell]
+        return estimate
+
+    def estimate(self, key):
+        table = self.table
+        return min(table[cell] for cell in self._cells(key))
+
+    def merge(self, other):
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("Count-Min sketches of different sizes cannot be merged")
+        table = self.table
+        for i, value in enumerate(other.table):
+            if value:
+                table[i] += value
+
+    def to_dict(self):
+        return {'width': self.width, 'depth': self.depth, 'table': _encode(self.table)}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['width'], data['depth'])
+        sketch.table = array('Q', base64.b64decode(data['table']))
+        return sketch
+
+
+class HeavyHitters:
+    """The `k` keys with the highest Count-Min estimates seen so far."""
+
+    def __init__(self, k=100, width=2048, depth=4):
+        self.k = k
+        self.sketch = CountMinSketch(width, depth)
+        self.top = {}       # key -> estimate
+        self._heap = []     # (estimate, key) per top key, estimates may lag behind
+
+    def add(self, key, count=1):
+        """Counts `key`; returns the key it pushed out of the top-k, if any."""
+        estimate = self.sketch.add(key, count)
+        top = self.top
+        if key in top:
+            # Its heap entry is left as a lower bound and refreshed lazily
+            top[key] = estimate
+            return None
+        if len(top) < self.k:
+            top[key] = estimate
+            heapq.heappush(self._heap, (estimate, key))
+            return None
+        smallest_estimate, smallest = self._smallest()
+        if estimate <= smallest_estimate:
+            return None
+        heapq.heapreplace(self._heap, (estimate, key))
+        del top[smallest]
+        top[key] = estimate
+        return smallest
+
+    def _smallest(self):
+        # The heap holds one entry per top key; refresh entries that went stale
+        heap = self._heap
+        while heap[0][0] != self.top[heap[0][1]]:
+            heapq.heapreplace(heap, (self.top[heap[0][1]], heap[0][1]))
+        return heap[0]
+
+    def items(self, n=None):
+        ranked = sorted(self.top.items(), key=lambda item: (-item[1], item[0]))
+        return ranked if n is None else ranked[:n]
+
+    def estimate(self, key):
+        return self.sketch.estimate(key)
+
+    def merge(self, other):
+        self.sketch.merge(other.sketch)
+        candidates = set(self.top) | set(other.top)
+        ranked = sorted(((self.sketch.estimate(key), key) for key in candidates), reverse=True)[:self.k]
+        self.top = {key: estimate for estimate, key in ranked}
+        self._heap = [(estimate, key) for key, estimate in self.top.items()]
+        heapq.heapify(self._heap)
+
+    def to_dict(self):
+        return {'k': self.k, 'sketch': self.sketch.to_dict(), 'top': self.top}
+
+    @classmethod
+    def from_dict(cls, data):
+        hitters = cls(data['k'])
+        hitters.sketch = CountMinSketch.from_dict(data['sketch'])
+        hitters.top = dict(data['top'])
+        hitters._heap = [(estimate, key) for key, estimate in hitters.top.items()]
+        heapq.heapify(hitters._heap)
+        return hitters
+
+
+class HyperLogLog:
+    """Distinct count estimate with 2**p one-byte registers (about 1.04/sqrt(2**p) error)."""
+
+    def __init__(self, p=12):
+        self.p = p
+        self.registers = bytearray(1 << p)
+
+    def add(self, key):
+        h = _hash64(key)
+        p = self.p
+        index = h >> (64 - p)
+        rest = (h << p) & MASK64
+        rank = 64 - rest.bit_length() + 1 if rest else 64 - p + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def merge(self, other):
+        if self.p != other.p:
+            raise ValueError("HyperLogLogs of different precision cannot be merged")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def to_dict(self):
+        return {'p': self.p, 'registers': _encode(self.registers)}
+
+    @classmethod
+    def from_dict(cls, data):
+        hll = cls(data['p'])
+        hll.registers = bytearray(base64.b64decode(data['registers']))
+        return hll
+
+
+class RollupBucket:
+    """Sketches for one time bucket of POST traffic."""
+
+    def __init__(self, top_k=100, width=2048, depth=4, ip_precision=14, url_ip_precision=10):
+        self.top_k = top_k
+        self.url_ip_precision = url_ip_precision
+        self.requests = 0
+        self.urls = HeavyHitters(top_k, width, depth)
+        self.ips = HeavyHitters(top_k, width, depth)
+        self.distinct_ips = HyperLogLog(ip_precision)
+        # Distinct clients are tracked only for the URLs currently in the top-k
+        self.url_ips = {}
+
+    def add(self, url, ip):
+        self.requests += 1
+        evicted = self.urls.add(url)
+        if evicted is not None:
+            self.url_ips.pop(evicted, None)
+        if url in self.urls.top:
+            hll = self.url_ips.get(url)
+            if hll is None:
+                hll = self.url_ips[url] = HyperLogLog(self.url_ip_precision)
+            hll.add(ip)
+        self.ips.add(ip)
+        self.distinct_ips.add(ip)
+
+    def merge(self, other):
+        self.requests += other.requests
+        self.urls.merge(other.urls)
+        self.ips.merge(other.ips)
+        self.distinct_ips.merge(other.distinct_ips)
+        for url, hll in other.url_ips.items():
+            if url in self.url_ips:
+                self.url_ips[url].merge(hll)
+            else:
+                self.url_ips[url] = HyperLogLog.from_dict(hll.to_dict())
+        self.url_ips = {url: hll for url, hll in self.url_ips.items() if url in self.urls.top}
+
+    def to_dict(self):
+        return {
+            'top_k': self.top_k,
+            'url_ip_precision': self.url_ip_precision,
+            'requests': self.requests,
+            'urls': self.urls.to_dict(),
+            'ips': self.ips.to_dict(),
+            'distinct_ips': self.distinct_ips.to_dict(),
+            'url_ips': {url: hll.to_dict() for url, hll in self.url_ips.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        bucket = cls(data['top_k'], url_ip_precision=data['url_ip_precision'])
+        bucket.requests = data['requests']
+        bucket.urls = HeavyHitters.from_dict(data['urls'])
+        bucket.ips = HeavyHitters.from_dict(data['ips'])
+        bucket.distinct_ips = HyperLogLog.from_dict(data['distinct_ips'])
+        bucket.url_ips = {url: HyperLogLog.from_dict(hll) for url, hll in data['url_ips'].items()}
+        return bucket
+
+
+class SquidRollup:
+    """Sliding-window rollups of parsed Squid POST records in fixed memory.
+
+    Records are counted into time buckets of `bucket_seconds`; only the
+    newest `retention` buckets are kept, and each bucket holds sketches of
+    fixed size (Count-Min + heavy hitters for URLs and client IPs,
+    HyperLogLog for distinct clients overall and per top URL). Queries
+    merge the buckets that fall in the requested window. Rollups built on
+    different proxies with the same settings merge bucket by bucket, and
+    to_dict/from_dict round-trip through JSON.
+    """
+
+    def __init__(self, bucket_seconds=60, retention=60, top_k=100, width=2048, depth=4,
+                 ip_precision=14, url_ip_precision=10):
+        self.bucket_seconds = bucket_seconds
+        self.retention = retention
+        self.settings = {'top_k': top_k, 'width': width, 'depth': depth,
+                         'ip_precision': ip_precision, 'url_ip_precision': url_ip_precision}
+        self.buckets = {}   # bucket start (epoch seconds) -> RollupBucket
+
+    def add(self, timestamp, url, ip):
+        start = int(timestamp // self.bucket_seconds) * self.bucket_seconds
+        bucket = self.buckets.get(start)
+        if bucket is None:
+            if len(self.buckets) >= self.retention and start < min(self.buckets):
+                return  # older than anything still kept
+            bucket = self.buckets[start] = RollupBucket(**self.settings)
+            self._expire()
+        bucket.add(url, ip)
+
+    def add_records(self, records):
+        for record in records:
+            self.add(record_epoch(record), record["url"], record["ip"])
+
+    def add_columns(self, columns):
+        # Output of SquidLogParser.parse_columns
+        for timestamp, url, ip in zip(columns['timestamp'], columns['url'], columns['ip']):
+            self.add(float(timestamp), url, ip)
+
+    def _expire(self):
+        while len(self.buckets) > self.retention:
+            del self.buckets[min(self.buckets)]
+
+    def window(self, seconds=None, now=None):
+        """One RollupBucket merged from the buckets of the last `seconds` (all kept buckets if None)."""
+        merged = RollupBucket(**self.settings)
+        if not self.buckets:
+            return merged
+        end = now if now is not None else max(self.buckets) + self.bucket_seconds
+        for start, bucket in self.buckets.items():
+            if seconds is None or (end - seconds <= start < end):
+                merged.merge(bucket)
+        return merged
+
+    def top_urls(self, n=10, seconds=None, now=None):
+        window = self.window(seconds, now)
+        return [{'url': url, 'requests': count,
+                 'distinct_ips': window.url_ips[url].count() if url in window.url_ips else None}
+                for url, count in window.urls.items(n)]
+
+    def top_ips(self, n=10, seconds=None, now=None):
+        window = self.window(seconds, now)
+        span = seconds or self.bucket_seconds * max(1, len(self.buckets))
+        return [{'ip': ip, 'requests': count, 'per_second': count / span} for ip, count in window.ips.items(n)]
+
+    def ip_rate(self, ip, seconds=None, now=None):
+        """Requests per second from `ip` over the window."""
+        window = self.window(seconds, now)
+        span = seconds or self.bucket_seconds * max(1, len(self.buckets))
+        return window.ips.estimate(ip) / span
+
+    def distinct_ips(self, seconds=None, now=None):
+        return self.window(seconds, now).distinct_ips.count()
+
+    def merge(self, other):
+        if (other.bucket_seconds, other.settings) != (self.bucket_seconds, self.settings):
+            raise ValueError("Rollups with different settings cannot be merged")
+        for start, bucket in other.buckets.items():
+            if start in self.buckets:
+                self.buckets[start].merge(bucket)
+            else:
+                self.buckets[start] = RollupBucket.from_dict(bucket.to_dict())
+        self._expire()
+
+    def to_dict(self):
+        return {
+            'bucket_seconds': self.bucket_seconds,
+            'retention': self.retention,
+            'settings': self.settings,
+            'buckets': {str(start): bucket.to_dict() for start, bucket in sorted(self.buckets.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        rollup = cls(data['bucket_seconds'], data['retention'], **data['settings'])
+        rollup.buckets = {int(start): RollupBucket.from_dict(bucket) for start, bucket in data['buckets'].items()}
+        return rollup
+
+    def save(self, path):
+        dirn = os.path.dirname(path) or '.'
+        with tempfile.NamedTemporaryFile('w', delete=False, dir=dirn) as tmp:
+            json.dump(self.to_dict(), tmp)
+            temp_name = tmp.name
+        os.replace(temp_name, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+
+# Bytes of a local log parsed at a time, so memory stays flat however large the log
+READ_BLOCK = 8 * 1024 * 1024
+
+
+def add_log_file(rollup, path, squid_parser=None, block_size=READ_BLOCK):
+    """Adds a local access.log to `rollup`, parsing it in blocks of complete lines."""
+    squid_parser = squid_parser or SquidLogParser(methods=['POST'])
+    with open(path, 'rb') as f:
+        for block in iter_line_blocks(iter(lambda: f.read(block_size), b'')):
+            rollup.add_columns(squid_parser.parse_columns(block))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Roll up Squid POST traffic into mergeable sketches.')
+    parser.add_argument('logs', nargs='*', help='local access.log files to add')
+    parser.add_argument('--load', nargs='*', default=[], help='saved rollups to merge in')
+    parser.add_argument('--save', help='write the merged rollup here')
+    parser.add_argument('--bucket-seconds', type=int, default=60)
+    parser.add_argument('--retention', type=int, default=60, help='number of buckets kept')
+    parser.add_argument('--window', type=int, help='seconds to report on (default: everything kept)')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    rollup = SquidRollup(args.bucket_seconds, args.retention)
+    for path in args.load:
+        rollup.merge(SquidRollup.load(path))
+    squid_parser = SquidLogParser(methods=['POST'])
+    for path in args.logs:
+        add_log_file(rollup, path, squid_parser)
+
+    json.dump({
+        'distinct_ips': rollup.distinct_ips(args.window),
+        'top_urls': rollup.top_urls(args.top, args.window),
+        'top_ips': rollup.top_ips(args.top, args.window),
+    }, sys.stdout, indent=4)
+    print()
+    if args.save:
+        rollup.save(args.save)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+
+import paramiko
+
+
+class SSHSessionPool:
+    """Shared, reusable SSH connections keyed by (hostname, port, username).
+
+    Borrowing a session skips the TCP + key exchange + auth handshake when
+    an idle connection to the same host is available. Connections get a
+    transport keepalive, are health-checked before being handed out, and
+    are closed after `idle_timeout` seconds unused. At most `max_sessions`
+    connections are open at once; when the pool is full, idle connections to
+    other hosts are closed first, then callers wait up to `acquire_timeout`.
+    """
+
+    def __init__(self, max_sessions=16, idle_timeout=300, keepalive=30,
+                 connect_timeout=10, acquire_timeout=60):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.keepalive = keepalive
+        self.connect_timeout = connect_timeout
+        self.acquire_timeout = acquire_timeout
+        self._cond = threading.Condition()
+        self._idle = {}     # key -> [(client, last_used)]
+        self._owner = {}    # id(client) -> key, for every open connection
+        self._opening = 0   # connections being established outside the lock
+
+    @contextmanager
+    def session(self, hostname, username, password=None, port=22, **connect_kwargs):
+        client = self.acquire(hostname, username, password, port, **connect_kwargs)
+        try:
+            yield client
+        except BaseException:
+            # The connection may be in an unknown state (this includes a
+            # streaming generator closed half way), do not hand it out again
+            self.discard(client)
+            raise
+        else:
+            self.release(client)
+
+    def acquire(self, hostname, username, password=None, port=22, **connect_kwargs):
+        key = (hostname, port, username)
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            client = self._take_idle_or_slot(key, deadline)
+            if client is None:
+                break
+            # Checked outside the lock, send_ignore can block on a dead link
+            if self._is_healthy(client):
+                return client
+            self.discard(client)
+
+        try:
+            client = self._connect(hostname, username, password, port, **connect_kwargs)
+        except Exception:
+            with self._cond:
+                self._opening -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._opening -= 1
+            self._owner[id(client)] = key
+        return client
+
+    def release(self, client):
+        healthy = self._is_healthy(client)
+        with self._cond:
+            key = self._owner.get(id(client))
+            if key is None:
+                return
+            if healthy:
+                self._idle.setdefault(key, []).append((client, time.monotonic()))
+            else:
+                self._close_locked(client)
+            self._cond.notify()
+
+    def discard(self, client):
+        with self._cond:
+            self._close_locked(client)
+            self._cond.notify()
+
+    def evict_idle(self):
+        with self._cond:
+            self._evict_idle_locked()
+            self._cond.notify_all()
+
+    def close_all(self):
+        with self._cond:
+            for idle in self._idle.values():
+                for client, last_used in idle:
+                    self._close_locked(client)
+            self._idle.clear()
+            self._cond.notify_all()
+
+    def _connect(self, hostname, username, password, port, **connect_kwargs):
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        connect_kwargs.setdefault('timeout', self.connect_timeout)
+        client.connect(hostname, port=port, username=username, password=password, **connect_kwargs)
+        if self.keepalive:
+            client.get_transport().set_keepalive(self.keepalive)
+        return client
+
+    def _take_idle_or_slot(self, key, deadline):
+        # An idle client for `key`, or None once a slot for a new connection is reserved.
+        # A returned client stays in self._owner, so it still counts towards max_sessions.
+        with self._cond:
+            while True:
+                self._evict_idle_locked()
+                idle = self._idle.get(key)
+                if idle:
+                    client, last_used = idle.pop()
+                    return client
+                if len(self._owner) + self._opening < self.max_sessions:
+                    self._opening += 1
+                    return None
+                if self._close_oldest_idle_locked():
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    hostname, port, username = key
+                    raise TimeoutError(f"No SSH session available for {username}@{hostname}:{port}")
+                self._cond.wait(remaining)
+
+    def _is_healthy(self, client):
+        transport = client.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        try:
+            transport.send_ignore()
+        except (EOFError, OSError, paramiko.SSHException):
+            return False
+        return True
+
+    def _evict_idle_locked(self):
+        now = time.monotonic()
+        for key, idle in list(self._idle.items()):
+            keep = []
+            for client, last_used in idle:
+                if now - last_used > self.idle_timeout:
+                    self._close_locked(client)
+                else:
+                    keep.append((client, last_used))
+            if keep:
+                self._idle[key] = keep
+            else:
+                del self._idle[key]
+
+    def _close_oldest_idle_locked(self):
+        oldest = None
+        for key, idle in self._idle.items():
+            for position, (client, last_used) in enumerate(idle):
+                if oldest is None or last_used < oldest[2]:
+                    oldest = (key, position, last_used)
+        if oldest is None:
+            return False
+        key, position, last_used = oldest
+        client, _ = self._idle[key].pop(position)
+        if not self._idle[key]:
+            del self._idle[key]
+        self._close_locked(client)
+        return True
+
+    def _close_locked(self, client):
+        # Callers take the client out of self._idle themselves
+        self._owner.pop(id(client), None)
+        try:
+            client.close()
+        except Exception:
+            pass
+
+
+# Pool shared by the Squid and PAM helpers unless they are given their own
+default_pool = SSHSessionPool()
+atexit.register(default_pool.close_all)
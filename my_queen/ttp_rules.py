@@ -0,0 +1,249 @@
+import os
+import re
+import json
+
+DEFAULT_RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ttp_rules.json')
+
+# Keywords are matched as whole shell words: a keyword that starts (ends)
+# with a word character may not be glued to another word or option.
+# A keyword may follow a '/': a path keyword ('etc/passwd') anywhere, as in
+# '/etc/passwd', a command keyword only where the path is run as a command
+# ('./xmrig', 'nohup /tmp/kinsing'), so 'cat /etc/passwd' is not 'passwd'.
+_BEFORE_WORD = r'(?<![\w.-])'
+_AFTER_WORD = r'(?![\w./-])'
+# What may come before a path that is run as a command
+_COMMAND_START_RE = re.compile(r'(?:^|[;&|(`\n]|\b(?:sudo|nohup|exec|env|nice|setsid|time))\s*$')
+
+_REGEX_SPECIAL = set('.^$*+?{}[]()|')
+_QUANTIFIERS = set('*+?{')
+# Global inline flags, e.g. '(?i)' in '(?i)wget'; only valid at the start of a pattern
+_GLOBAL_FLAGS_RE = re.compile(r'^\(\?([aiLmsux]+)\)')
+
+
+class TTPRule:
+    def __init__(self, technique, name='', keywords=(), patterns=()):
+        self.technique = technique
+        self.name = name
+        self.keywords = list(keywords)
+        self.patterns = list(patterns)
+
+
+class TTPRuleEngine:
+    """Maps shell commands to MITRE ATT&CK techniques.
+
+    All rules are compiled into a single regular expression. Keywords and the
+    literal prefixes of regex patterns are folded into a prefix trie, so at
+    any position in a command only the branch for the next character is
+    followed and the cost grows slowly with the size of the rule set. The
+    expression only finds the positions where some rule matches (searching
+    again from the next character, so matches may overlap); every rule that
+    can start there is then confirmed with its own matcher. When several rules
+    match, the one listed first in the rule file wins.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self._keyword_rule = {}
+        self._keywords = {}     # length -> {keyword: (rule index, compiled keyword, command only)}
+        self._prefixed = {}     # literal prefix -> [(rule index, compiled pattern)]
+        self._unprefixed = []   # (rule index, compiled pattern) for patterns without a prefix
+        word_leaves = []   # keywords that need a word boundary in front
+        free_leaves = []   # other keywords and patterns with a literal prefix
+        unprefixed = []
+
+        for index, rule in enumerate(self.rules):
+            for pattern in rule.patterns:
+                pattern = _scope_inline_flags(pattern)
+                try:
+                    compiled = re.compile(f'(?:{pattern})')
+                    re.compile(f'(?:{pattern})'.encode('utf-8'))
+                except re.error as e:
+                    raise ValueError(f"Invalid pattern for {rule.technique}: {pattern!r} ({e}; "
+                                     f"inline flags are only allowed at the start of a pattern)"
+                                     if '(?' in pattern else
+                                     f"Invalid pattern for {rule.technique}: {pattern!r} ({e})")
+                prefix, tail = _split_literal_prefix(pattern)
+                if prefix:
+                    self._prefixed.setdefault(prefix, []).append((index, compiled))
+                    free_leaves.append((prefix, f'(?:{tail})', 0))
+                else:
+                    self._unprefixed.append((index, compiled))
+                    unprefixed.append(f'(?:{pattern})')
+            for keyword in rule.keywords:
+                if not keyword or keyword in self._keyword_rule:
+                    continue
+                self._keyword_rule[keyword] = index
+                head, leaves = '', free_leaves
+                if re.match(r'\w', keyword):
+                    head, leaves = _BEFORE_WORD, word_leaves
+                tail = _AFTER_WORD if re.search(r'\w$', keyword) else ''
+                # Command keywords after a '/' are only taken where the path is run
+                command_only = bool(head) and '/' not in keyword
+                self._keywords.setdefault(len(keyword), {})[keyword] = (
+                    index, re.compile(head + re.escape(keyword) + tail), command_only)
+                leaves.append((keyword, tail, 1))
+        self._prefix_lengths = sorted({len(prefix) for prefix in self._prefixed})
+        self._keyword_lengths = sorted(self._keywords.items())
+
+        parts = unprefixed
+        if free_leaves:
+            parts.append(_trie_regex(free_leaves))
+        if word_leaves:
+            parts.append(_BEFORE_WORD + _trie_regex(word_leaves))
+        source = '|'.join(parts) if parts else r'(?!)'
+        self._regex = re.compile(source)
+        # Same expression over raw bytes, used to skip log lines before decoding them
+        self._bytes_regex = re.compile(source.encode('utf-8'))
+
+    @classmethod
+    def from_file(cls, rules_file=DEFAULT_RULES_FILE):
+        with open(rules_file, 'r') as f:
+            data = json.load(f)
+        rules = []
+        for entry in data.get('rules', []):
+            if 'technique' not in entry:
+                raise ValueError(f"Rule without a technique in {rules_file}: {entry}")
+            rules.append(TTPRule(entry['technique'], entry.get('name', ''),
+                                 entry.get('keywords', ()), entry.get('patterns', ())))
+        return cls(rules)
+
+    def classify(self, command):
+        best = None
+        for pos in self._match_starts(command):
+            for index in self._rules_at(command, pos):
+                if best is None or index < best:
+                    best = index
+            if best == 0:
+                break
+        return None if best is None else self.rules[best].technique
+
+    def techniques(self, command):
+        indexes = set()
+        for pos in self._match_starts(command):
+            indexes.update(self._rules_at(command, pos))
+        return [self.rules[i].technique for i in sorted(indexes)]
+
+    def accepts(self, raw, pos=0):
+        # Whether any rule matches the raw bytes (from offset pos on)
+        return self._bytes_regex.search(raw, pos) is not None
+
+    def _match_starts(self, command):
+        # Every position where some rule matches. Each search restarts one
+        # character after the previous match start, not after its end, so
+        # overlapping matches are all found.
+        match = self._regex.search(command)
+        while match is not None:
+            yield match.start()
+            match = self._regex.search(command, match.start() + 1)
+
+    def _rules_at(self, command, pos):
+        # Every rule matching at pos, each confirmed with its own matcher
+        for length, keywords in self._keyword_lengths:
+            entry = keywords.get(command[pos:pos + length])
+            if entry is not None and entry[1].match(command, pos):
+                if entry[2] and pos and command[pos - 1] == '/' and not _runs_as_command(command, pos):
+                    continue
+                yield entry[0]
+        for length in self._prefix_lengths:
+            for index, compiled in self._prefixed.get(command[pos:pos + length], ()):
+                if compiled.match(command, pos):
+                    yield index
+        for index, compiled in self._unprefixed:
+            if compiled.match(command, pos):
+                yield index
+
+
+def _runs_as_command(command, pos):
+    # Whether the path ending just before pos ('/tmp/' in '/tmp/kinsing') is in command position
+    start = pos
+    while start and not command[start - 1].isspace() and command[start - 1] not in ';&|(`':
+        start -= 1
+    return _COMMAND_START_RE.search(command, 0, start) is not None
+
+
+def _scope_inline_flags(pattern):
+    # '(?i)wget' -> '(?i:wget)': global flags cannot sit inside the combined
+    # expression, so they are scoped to the pattern they came with
+    match = _GLOBAL_FLAGS_RE.match(pattern)
+    if not match:
+        return pattern
+    rest = pattern[match.end():]
+    # In verbose mode a trailing comment would swallow the closing parenthesis
+    return f"(?{match.group(1)}:{rest}{chr(10) if 'x' in match.group(1) else ''})"
+
+
+def _split_literal_prefix(pattern):
+    # Leading run of plain characters, e.g. 'echo' in r'echo\s+-e'. Patterns
+    # with a top-level alternation have no usable prefix.
+    if _has_top_level_alternation(pattern):
+        return '', pattern
+    chars = []
+    ends = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            if i + 1 < len(pattern) and not pattern[i + 1].isalnum():
+                chars.append(pattern[i + 1])
+                i += 2
+                ends.append(i)
+                continue
+            break
+        if char in _REGEX_SPECIAL:
+            break
+        chars.append(char)
+        i += 1
+        ends.append(i)
+    # A quantifier applies to the character before it, which is not literal then
+    if chars and i < len(pattern) and pattern[i] in _QUANTIFIERS:
+        chars.pop()
+        ends.pop()
+    if not chars:
+        return '', pattern
+    return ''.join(chars), pattern[ends[-1]:]
+
+
+def _has_top_level_alternation(pattern):
+    depth = 0
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            i += 2
+            continue
+        if in_class:
+            if char == ']':
+                in_class = False
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return True
+        i += 1
+    return False
+
+
+def _trie_regex(leaves):
+    # leaves: (literal, tail regex, order). Pattern tails are tried before
+    # keyword tails at the same node because they are the more specific rules.
+    trie = {}
+    for literal, tail, order in leaves:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node.setdefault('', []).append((order, tail))
+    return _node_regex(trie)
+
+
+def _node_regex(node):
+    # Longer continuations come before the tails ending at this node
+    branches = [re.escape(char) + _node_regex(child)
+                for char, child in sorted(node.items(), key=lambda item: item[0]) if char != '']
+    branches.extend(tail for order, tail in sorted(node.get('', []), key=lambda leaf: leaf[0]))
+    if len(branches) == 1:
+        return branches[0]
+    return '(?:' + '|'.join(branches) + ')'
@@ -0,0 +1,254 @@
+"""
+Sync the Queensland Open Data catalogue (CKAN) to CSV or Parquet.
+
+    python qldat/sync_qld_catalogue.py --output qld_datasets.csv
+    python qldat/sync_qld_catalogue.py --output qld_datasets.parquet --format parquet --workers 8
+    python qldat/sync_qld_catalogue.py --output qld_datasets.csv --base-url http://127.0.0.1:5000/api/3/action
+
+Unlike package_list, package_search returns each dataset's metadata, a page
+of `--rows` datasets per request. Pages are fetched concurrently over one
+pooled session and written out as they arrive, so the catalogue is never
+held in memory. The newest metadata_modified seen is kept in the state
+file. Later runs ask only for datasets modified since then and merge them
+into the existing output. Datasets deleted upstream only disappear on a
+`--full` sync, which also repairs the rare dataset skipped because others
+moved between pages while a sync was running.
+"""
+
+import os
+import csv
+import sys
+import json
+import argparse
+import tempfile
+from datetime import datetime, timezone
+from itertools import islice
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+BASE_URL = "https://data.qld.gov.au/api/3/action"
+DATASET_URL = "https://www.data.qld.gov.au/dataset/"
+PAGE_ROWS = 1000  # CKAN's default upper limit for package_search rows
+COLUMNS = ['id', 'name', 'title', 'organization', 'license_id', 'metadata_created', 'metadata_modified',
+           'num_resources', 'resource_formats', 'tags', 'url', 'notes']
+
+
+def make_session(workers=8):
+    # One keep-alive connection per worker; transient errors and 429s are retried with backoff
+    session = requests.Session()
+    retry = Retry(total=5, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=('GET',), respect_retry_after_header=True)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(workers, 1), max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'User-Agent': 'qld-catalogue-sync/1.0', 'Accept': 'application/json'})
+    return session
+
+
+def package_search(session, base_url, start=0, rows=PAGE_ROWS, fq=None, timeout=60):
+    params = {'start': start, 'rows': rows, 'sort': 'metadata_modified asc, id asc'}
+    if fq:
+        params['fq'] = fq
+    response = session.get(f"{base_url}/package_search", params=params, timeout=timeout)
+    response.raise_for_status()
+    body = response.json()
+    if not body.get('success'):
+        raise RuntimeError(f"package_search failed: {body.get('error')}")
+    return body['result']
+
+
+def modified_since_query(last_modified):
+    # CKAN stores metadata_modified as naive UTC; Solr wants millisecond precision and a Z.
+    # Inclusive, so nothing modified within the same millisecond is missed.
+    moment = datetime.fromisoformat(last_modified)
+    return f"metadata_modified:[{moment.strftime('%Y-%m-%dT%H:%M:%S')}.{moment.microsecond // 1000:03d}Z TO *]"
+
+
+def iter_pages(session, base_url, rows=PAGE_ROWS, fq=None, workers=8):
+    """Yields package_search result lists in catalogue order, with up to 2 x `workers` pages in flight."""
+    first = package_search(session, base_url, 0, rows, fq)
+    yield first['results']
+    starts = iter(range(rows, first['count'], rows))
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        pending = deque(executor.submit(package_search, session, base_url, start, rows, fq)
+                        for start in islice(starts, workers * 2))
+        while pending:
+            results = pending.popleft().result()['results']
+            for start in islice(starts, 1):
+                pending.append(executor.submit(package_search, session, base_url, start, rows, fq))
+            yield results
+
+
+def to_row(dataset):
+    organization = dataset.get('organization') or {}
+    resources = dataset.get('resources') or []
+    formats = sorted({(r.get('format') or '').upper() for r in resources} - {''})
+    return {
+        'id': dataset.get('id'),
+        'name': dataset.get('name'),
+        'title': dataset.get('title'),
+        'organization': organization.get('name'),
+        'license_id': dataset.get('license_id'),
+        'metadata_created': dataset.get('metadata_created'),
+        'metadata_modified': dataset.get('metadata_modified'),
+        'num_resources': dataset.get('num_resources', len(resources)),
+        'resource_formats': ';'.join(formats),
+        'tags': ';'.join(tag.get('name', '') for tag in dataset.get('tags') or []),
+        'url': DATASET_URL + (dataset.get('name') or ''),
+        'notes': (dataset.get('notes') or '').replace('\r', ' ').replace('\n', ' '),
+    }
+
+
+class _CSVSink:
+    def __init__(self, path):
+        self.tmp = tempfile.NamedTemporaryFile('w', delete=False, dir=os.path.dirname(os.path.abspath(path)),
+                                               suffix='.tmp', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.tmp, fieldnames=COLUMNS)
+        self.writer.writeheader()
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.tmp.close()
+        return self.tmp.name
+
+
+class _ParquetSink:
+    def __init__(self, path):
+        if pq is None:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)")
+        self.schema = pa.schema([(c, pa.int64() if c == 'num_resources' else pa.string()) for c in COLUMNS])
+        self.tmp_name = tempfile.NamedTemporaryFile(delete=False, dir=os.path.dirname(os.path.abspath(path)),
+                                                    suffix='.tmp').name
+        self.writer = pq.ParquetWriter(self.tmp_name, self.schema, compression='zstd')
+
+    def write(self, rows):
+        if rows:
+            self.writer.write_table(pa.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+        return self.tmp_name
+
+
+def _iter_existing(path, output_format, batch_size=10000):
+    # Row batches of a previous output file
+    if not os.path.exists(path):
+        return
+    if output_format == 'parquet':
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            yield batch.to_pylist()
+        return
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        batch = []
+        for row in csv.DictReader(f):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def load_state(path):
+    if path and os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(path, state):
+    with tempfile.NamedTemporaryFile('w', delete=False, dir=os.path.dirname(os.path.abspath(path))) as tmp:
+        json.dump(state, tmp, indent=4)
+        temp_name = tmp.name
+    os.replace(temp_name, path)
+
+
+def sync_catalogue(output, output_format='csv', state_file=None, full=False, base_url=BASE_URL, workers=8,
+                   rows=PAGE_ROWS, session=None):
+    """Full or incremental sync of the catalogue into `output`; returns a summary dict."""
+    state = {} if full else load_state(state_file)
+    if not os.path.exists(output) or state.get('format', output_format) != output_format:
+        state = {}
+    last_modified = state.get('last_modified')
+    fq = modified_since_query(last_modified) if last_modified else None
+    session = session or make_session(workers)
+    sink = _ParquetSink(output) if output_format == 'parquet' else _CSVSink(output)
+
+    seen, newest = set(), last_modified
+    changed = []
+    try:
+        for page in iter_pages(session, base_url, rows, fq, workers):
+            # Offsets can shift while paging through a changing catalogue; keep each id once
+            batch = [to_row(d) for d in page if d.get('id') not in seen]
+            seen.update(row['id'] for row in batch)
+            for row in batch:
+                if row['metadata_modified'] and (newest is None or row['metadata_modified'] > newest):
+                    newest = row['metadata_modified']
+            if fq:
+                changed.extend(batch)   # only the changes since the last sync, merged below
+            else:
+                sink.write(batch)
+        if fq:
+            # Unchanged rows of the previous output first, then every changed dataset
+            kept = 0
+            for batch in _iter_existing(output, output_format):
+                batch = [row for row in batch if row['id'] not in seen]
+                kept += len(batch)
+                sink.write(batch)
+            sink.write(changed)
+            total = kept + len(changed)
+        else:
+            total = len(seen)
+        temp_name = sink.close()
+    except BaseException:
+        temp_name = sink.close()
+        os.remove(temp_name)
+        raise
+    os.replace(temp_name, output)
+
+    state = {'last_modified': newest, 'synced_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+             'datasets': total, 'output': os.path.abspath(output), 'format': output_format}
+    if state_file:
+        save_state(state_file, state)
+    return {'mode': 'incremental' if fq else 'full', 'fetched': len(seen), 'datasets': total,
+            'last_modified': newest}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sync the QLD open data catalogue to CSV or Parquet.')
+    parser.add_argument('--output', default='qld_datasets.csv')
+    parser.add_argument('--format', choices=['csv', 'parquet'],
+                        help='default: from the output extension')
+    parser.add_argument('--state', help='sync state file (default: <output>.state.json)')
+    parser.add_argument('--full', action='store_true', help='ignore the state and re-fetch everything')
+    parser.add_argument('--base-url', default=BASE_URL, help='CKAN action API, e.g. a local stand-in')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--rows', type=int, default=PAGE_ROWS, help='datasets per package_search page')
+    args = parser.parse_args()
+
+    output_format = args.format or ('parquet' if args.output.endswith('.parquet') else 'csv')
+    try:
+        summary = sync_catalogue(args.output, output_format, args.state or args.output + '.state.json', args.full,
+                                 args.base_url.rstrip('/'), args.workers, args.rows)
+    except (requests.RequestException, RuntimeError) as e:
+        print(f"Error syncing datasets: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"{summary['mode'].capitalize()} sync: fetched {summary['fetched']} datasets, "
+          f"{summary['datasets']} in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
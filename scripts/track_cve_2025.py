@@ -5,6 +5,10 @@ Hardened CVE-2025 article tracker.
 - Uses environment variables for secrets (no hardcoded API keys).
 - Provides a fallback GitHub PAT placeholder as requested: "<-yourGitHubPatToken->"
 - Safe request handling with timeout + retries.
+- Pooled HTTP session and a disk cache of API responses (TTL + size cap).
+- Concurrent keyword fetch under a shared, adaptive token-bucket rate limit.
+- Paginated, streaming fetch that stops at the last run's high-water date.
+- Persistent, deduplicated per-CVE state merged incrementally across runs.
 - Atomic writes for JSON + README.
 - Idempotent README update using explicit markers.
 - Sanitizes all external text to prevent HTML or Markdown injection.
@@ -16,11 +20,18 @@ import time
 import json
 import logging
 import tempfile
+import threading
+import queue
 import requests
+from requests.adapters import HTTPAdapter
 import re
 import html
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import hashlib
+import argparse
+from datetime import datetime, timezone, timedelta
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Iterator
 
 # ---------------- Configuration ----------------
 # Provide real values via environment variables when running:
@@ -34,10 +45,31 @@ GOOGLE_CSE_ID = os.getenv("GOOGLE_CSE_ID")
 GH_TOKEN = os.getenv("GH_TOKEN", "<-yourGitHubPatToken->")
 
 OUTPUT_FILE = os.getenv("OUTPUT_FILE", "cve_2025_articles.json")
+STATE_FILE = os.getenv("STATE_FILE", "cve_2025_state.json")
+# CSE returns at most 10 results per page and 100 per query (start <= 91); every page costs a query.
+# MAX_PAGES caps the pages per keyword. Unset, it is DEFAULT_PAGES, or up to 10 once a high-water
+# date is known, since paging then stops at that date (see pages_per_query).
+MAX_PAGES = int(os.getenv("MAX_PAGES", "0")) or None
+DEFAULT_PAGES = int(os.getenv("DEFAULT_PAGES", "2"))
+PAGE_SIZE = 10
+CSE_SORT = os.getenv("CSE_SORT", "date")  # newest first, so paging can stop at the high-water date
+HIGH_WATER_OVERLAP_DAYS = float(os.getenv("HIGH_WATER_OVERLAP_DAYS", "1"))
+# Days a merged article's link and hash are remembered for de-duplication; the state stays bounded
+ARTICLE_RETENTION_DAYS = float(os.getenv("ARTICLE_RETENTION_DAYS", "180"))
 README_FILE = os.getenv("README_FILE", "README.md")  # prefer repo-root README.md
 MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
 RETRY_BACKOFF = float(os.getenv("RETRY_BACKOFF", "2"))  # exponential
 REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "15"))
+# Shared CSE rate limit: sustained queries per second and burst size
+CSE_QPS = float(os.getenv("CSE_QPS", "1.0"))
+CSE_BURST = int(os.getenv("CSE_BURST", "5"))
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "4"))
+# Response cache: identical queries on the same UTC day and within CACHE_TTL seconds cost no quota
+# (empty CACHE_DIR disables). Keep the TTL well below the run interval so a nightly run never
+# reuses the previous night's results.
+CACHE_DIR = os.getenv("CACHE_DIR", ".cve_cache")
+CACHE_TTL = float(os.getenv("CACHE_TTL", str(4 * 3600)))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
 USER_AGENT = "cve-2025-tracker/1.0 (+https://github.com/your/repo)"
 
 # HEADERS for README section markers (idempotent updates)
@@ -62,21 +94,185 @@ KEYWORDS = [
 ]
 
 CVE_RE = re.compile(r"(CVE-\d{4}-\d{4,7})", re.IGNORECASE)
+VICTIM_WORDS = ("victim", "affected", "compromised", "ransom")
+# Query parameters that only track the reader and never change the article
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref|ref_src|cmpid)$", re.IGNORECASE)
 
 
 # ---------------- Helper functions ----------------
-def safe_request(url: str, params: dict, retries: int = MAX_RETRIES) -> Optional[dict]:
-    headers = {"User-Agent": USER_AGENT, "Accept": "application/json"}
+class RateLimiter:
+    """
+    Token bucket shared by all fetch workers.
+    - Tokens refill at `rate` per second up to `burst`; acquire() blocks for one.
+    - A 429/503 halves the rate and pauses every worker (Retry-After if given).
+    - Each success recovers the rate additively towards the configured maximum.
+    """
+
+    def __init__(self, rate: float = CSE_QPS, burst: int = CSE_BURST, min_rate: float = 0.05):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.min_rate = min(min_rate, rate)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def on_throttled(self, retry_after: Optional[float] = None):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            # Drop the burst so resumed workers do not hit the quota together
+            self._tokens = min(self._tokens, 0.0)
+            pause = retry_after if retry_after is not None else 1 / self.rate
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            logging.warning("Throttled by API; rate now %.2f req/s, pausing %.1fs.", self.rate, pause)
+
+
+class ResponseCache:
+    """
+    Disk cache of JSON responses, one file per request.
+    - Keyed by URL + sorted params + the UTC date; the API key is left out of the key.
+    - Entries older than `ttl` seconds are ignored and removed on lookup.
+    - When the directory grows past `max_bytes`, oldest entries are evicted first.
+    """
+
+    IGNORED_PARAMS = ("key",)
+
+    def __init__(self, directory: str = CACHE_DIR, ttl: float = CACHE_TTL, max_bytes: int = CACHE_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(e.stat().st_size for e in os.scandir(directory) if e.name.endswith(".json"))
+
+    def key(self, url: str, params: dict) -> str:
+        normalized = sorted((str(k), str(v).strip()) for k, v in params.items() if k not in self.IGNORED_PARAMS)
+        # The date keeps re-runs of one day cached while the next day's run always asks again
+        day = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        return hashlib.sha256(json.dumps([url, normalized, day]).encode("utf-8")).hexdigest()
+
+    def get(self, url: str, params: dict) -> Optional[dict]:
+        path = os.path.join(self.directory, self.key(url, params) + ".json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("stored", 0) > self.ttl:
+            self._remove(path)
+            return None
+        return entry.get("data")
+
+    def set(self, url: str, params: dict, data: dict):
+        path = os.path.join(self.directory, self.key(url, params) + ".json")
+        payload = json.dumps({"stored": time.time(), "url": url, "data": data}, ensure_ascii=False)
+        with tempfile.NamedTemporaryFile("w", delete=False, dir=self.directory, encoding="utf-8",
+                                         suffix=".tmp") as tmp:
+            tmp.write(payload)
+            temp_name = tmp.name
+        with self._lock:
+            old = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(temp_name, path)
+            self._size += os.path.getsize(path) - old
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _remove(self, path: str):
+        with self._lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                self._size -= size
+            except OSError:
+                pass
+
+    def _evict(self):
+        # Drop oldest entries until the cache is back under 90% of the cap
+        entries = sorted((e.stat().st_mtime, e.stat().st_size, e.path)
+                         for e in os.scandir(self.directory) if e.name.endswith(".json"))
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._size <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+                self._size -= size
+            except OSError:
+                pass
+
+
+_session_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+
+
+def get_session() -> requests.Session:
+    """Shared keep-alive session; its connection pool is sized for the fetch workers."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(FETCH_WORKERS, 10))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"User-Agent": USER_AGENT, "Accept": "application/json"})
+            _session = session
+        return _session
+
+
+def _retry_after(resp) -> Optional[float]:
+    value = resp.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+def safe_request(url: str, params: dict, retries: int = MAX_RETRIES,
+                 limiter: Optional[RateLimiter] = None, cache: Optional[ResponseCache] = None,
+                 session: Optional[requests.Session] = None) -> Optional[dict]:
+    if cache:
+        cached = cache.get(url, params)
+        if cached is not None:
+            logging.info("Served from cache: %s", params.get("q", url))
+            return cached
+    session = session or get_session()
     attempt = 0
     while attempt < retries:
+        if limiter:
+            limiter.acquire()
         try:
-            resp = requests.get(url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
+            resp = session.get(url, params=params, timeout=REQUEST_TIMEOUT)
             if resp.status_code == 200:
+                if limiter:
+                    limiter.on_success()
                 try:
-                    return resp.json()
+                    data = resp.json()
                 except ValueError:
                     logging.warning("Response not valid JSON.")
                     return None
+                if cache:
+                    cache.set(url, params, data)
+                return data
+            elif resp.status_code in (429, 503) and limiter:
+                # The shared limiter slows every worker down, not just this one
+                limiter.on_throttled(_retry_after(resp))
             elif resp.status_code in (429, 503):
                 wait = (RETRY_BACKOFF ** attempt)
                 logging.warning("Rate limited/service unavailable (status %s). Backing off %ss.", resp.status_code, wait)
@@ -164,79 +360,331 @@ def atomic_write_file(path: str, data: str, encoding: str = "utf-8"):
 
 
 # ---------------- Core logic ----------------
-def fetch_articles(keywords: List[str]) -> List[Dict[str, Any]]:
-    base_url = "https://www.googleapis.com/customsearch/v1"
+CSE_URL = "https://www.googleapis.com/customsearch/v1"
+
+
+def parse_items(data: dict) -> List[Dict[str, Any]]:
     results = []
+    for it in data.get("items", []):
+        title = it.get("title") or ""
+        link = it.get("link") or ""
+        snippet = it.get("snippet") or ""
+        pub = None
+        # Try to get publish date from common places
+        pagemap = it.get("pagemap", {})
+        if isinstance(pagemap, dict):
+            metatags = pagemap.get("metatags")
+            if isinstance(metatags, list) and metatags:
+                meta0 = metatags[0]
+                pub = meta0.get("article:published_time") or meta0.get("og:published_time") or meta0.get("date")
+        pub = pub or it.get("published") or it.get("isoDate") or None
+        results.append({
+            "title": title,
+            "link": link,
+            "snippet": snippet,
+            "publish_date_raw": pub,
+            "raw": it
+        })
+    return results
+
+
+def default_cache() -> Optional[ResponseCache]:
+    return ResponseCache() if CACHE_DIR and CACHE_TTL > 0 else None
+
+
+def _page_is_older(page: List[Dict[str, Any]], since: datetime) -> bool:
+    # True when every dated article of the page predates `since`
+    dates = [parse_date(art.get("publish_date_raw")) for art in page]
+    dates = [_utc_naive(d) for d in dates if d]
+    return bool(dates) and max(dates) < since
+
+
+class FetchError(RuntimeError):
+    """A keyword's results could not be fetched (safe_request gave up)."""
+
+
+def iter_keyword_pages(q: str, limiter: Optional[RateLimiter] = None, cache: Optional[ResponseCache] = None,
+                       max_pages: int = 1, since: Optional[datetime] = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield one keyword's result pages as they arrive, using the CSE `start` parameter.
+    Stops after `max_pages`, when the response has no `nextPage`, or after a
+    page whose dated results are all older than `since` (results are sorted
+    by date then). A short page is not the end: CSE drops near-duplicate
+    results from a page and still has more after it. A request that fails
+    for good raises FetchError, so a failure never looks like no results.
+    """
+    since = _utc_naive(since) if since else None
+    for page_no in range(min(max_pages, 100 // PAGE_SIZE)):
+        params = {"q": q, "key": GOOGLE_API_KEY, "cx": GOOGLE_CSE_ID}
+        if max_pages > 1:
+            params.update({"start": 1 + page_no * PAGE_SIZE, "num": PAGE_SIZE})
+        if since and CSE_SORT:
+            params["sort"] = CSE_SORT
+        logging.info("Querying CSE for: %s (page %d)", q, page_no + 1)
+        data = safe_request(CSE_URL, params, limiter=limiter, cache=cache)
+        if data is None:
+            raise FetchError(f"CSE request failed for {q!r} (page {page_no + 1})")
+        page = parse_items(data)
+        if page:
+            yield page
+        if not data or "nextPage" not in (data.get("queries") or {}):
+            return
+        if since and _page_is_older(page, since):
+            logging.info("Reached high-water date for: %s", q)
+            return
+
+
+def pages_per_query(since: Optional[datetime] = None) -> int:
+    # Each page is a query against the daily quota; only a high-water date bounds deep paging
+    if MAX_PAGES:
+        return MAX_PAGES
+    return 100 // PAGE_SIZE if since and CSE_SORT else DEFAULT_PAGES
+
+
+def fetch_keyword(q: str, limiter: Optional[RateLimiter] = None, cache: Optional[ResponseCache] = None,
+                  max_pages: int = 1, since: Optional[datetime] = None,
+                  failed: Optional[set] = None) -> List[Dict[str, Any]]:
+    # Pages fetched before a failure are kept; the keyword is added to `failed`
+    articles: List[Dict[str, Any]] = []
+    try:
+        for page in iter_keyword_pages(q, limiter, cache, max_pages, since):
+            articles.extend(page)
+    except Exception as e:
+        logging.error("Fetching %r failed: %s", q, e)
+        if failed is not None:
+            failed.add(q)
+    return articles
+
+
+def iter_articles(keywords: List[str], workers: int = FETCH_WORKERS, limiter: Optional[RateLimiter] = None,
+                  cache: Optional[ResponseCache] = None, max_pages: Optional[int] = None,
+                  since: Optional[datetime] = None, failed: Optional[set] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Like fetch_articles, but a generator: articles are yielded as soon as
+    their page arrives, from all keywords at once, in arrival order.
+    Closing the generator stops the workers after their current request.
+    `max_pages` defaults to pages_per_query(since). Keywords whose fetch
+    failed are logged and added to `failed`.
+    """
+    if not GOOGLE_API_KEY or not GOOGLE_CSE_ID:
+        logging.error("Google CSE credentials not set. iter_articles yields nothing.")
+        return
+    if not keywords:
+        return
+
+    max_pages = max_pages or pages_per_query(since)
+    limiter = limiter or RateLimiter()
+    cache = cache if cache is not None else default_cache()
+    pages: queue.Queue = queue.Queue()
+    stop = threading.Event()
+    done = object()
+
+    def worker(q):
+        try:
+            for page in iter_keyword_pages(q, limiter, cache, max_pages, since):
+                if stop.is_set():
+                    break
+                pages.put(page)
+        except Exception as e:
+            logging.error("Fetching %r failed: %s", q, e)
+            if failed is not None:
+                failed.add(q)
+        finally:
+            pages.put(done)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(workers, len(keywords))))
+    try:
+        for q in keywords:
+            executor.submit(worker, q)
+        remaining = len(keywords)
+        while remaining:
+            page = pages.get()
+            if page is done:
+                remaining -= 1
+                continue
+            yield from page
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_articles(keywords: List[str], workers: int = FETCH_WORKERS,
+                   limiter: Optional[RateLimiter] = None,
+                   cache: Optional[ResponseCache] = None, max_pages: int = 1,
+                   since: Optional[datetime] = None, failed: Optional[set] = None) -> List[Dict[str, Any]]:
+    """
+    Query every keyword on a bounded worker pool.
+    All workers share one token bucket (CSE_QPS / CSE_BURST), so the
+    request rate stays within the CSE quota however many keywords there
+    are. Results are returned in keyword order. Responses cached on disk
+    (see ResponseCache) are reused without spending quota. See
+    iter_keyword_pages for `max_pages` and `since`. Keywords whose fetch
+    failed are logged and added to `failed`.
+    """
     if not GOOGLE_API_KEY or not GOOGLE_CSE_ID:
         logging.error("Google CSE credentials not set. fetch_articles will return empty list.")
-        return results
+        return []
 
-    for q in keywords:
-        params = {"q": q, "key": GOOGLE_API_KEY, "cx": GOOGLE_CSE_ID}
-        logging.info("Querying CSE for: %s", q)
-        data = safe_request(base_url, params)
-        if not data:
-            continue
-        items = data.get("items", [])
-        for it in items:
-            title = it.get("title") or ""
-            link = it.get("link") or ""
-            snippet = it.get("snippet") or ""
-            pub = None
-            # Try to get publish date from common places
-            pagemap = it.get("pagemap", {})
-            if isinstance(pagemap, dict):
-                metatags = pagemap.get("metatags")
-                if isinstance(metatags, list) and metatags:
-                    meta0 = metatags[0]
-                    pub = meta0.get("article:published_time") or meta0.get("og:published_time") or meta0.get("date")
-            pub = pub or it.get("published") or it.get("isoDate") or None
-            results.append({
-                "title": title,
-                "link": link,
-                "snippet": snippet,
-                "publish_date_raw": pub,
-                "raw": it
-            })
-        # polite sleep to reduce rate risk
-        time.sleep(1.0)
-    return results
+    limiter = limiter or RateLimiter()
+    cache = cache if cache is not None else default_cache()
+    workers = max(1, min(workers, len(keywords)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pages = list(executor.map(lambda q: fetch_keyword(q, limiter, cache, max_pages, since, failed), keywords))
+    return [article for page in pages for article in page]
 
 
-def summarize_articles(articles: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
-    summary: Dict[str, Dict[str, Any]] = {}
+def canonical_link(link: str) -> str:
+    """Lowercase scheme/host, no "www.", fragment, tracking params or trailing slash; '' for no link."""
+    if not link or not link.strip():
+        return ""
+    try:
+        parts = urlsplit(link.strip())
+    except ValueError:
+        return link.strip()
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not TRACKING_PARAMS.match(k)))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower() or "https", host, path, query, ""))
+
+
+def content_hash(article: Dict[str, Any]) -> str:
+    # Same story syndicated under another URL has the same title + snippet;
+    # without either, the canonical link is all that tells articles apart
+    text = " ".join(filter(None, [article.get("title"), article.get("snippet")]))
+    text = re.sub(r"\s+", " ", text).strip().lower()
+    if not text:
+        text = "link:" + canonical_link(article.get("link") or "")
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _utc_naive(dt: datetime) -> datetime:
+    # Mixed aware/naive dates cannot be compared; keep everything naive UTC
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def new_state() -> Dict[str, Any]:
+    return {"version": 2, "updated": None, "high_water": None, "articles": {}, "cves": {}}
+
+
+def load_state(path: str = STATE_FILE) -> Dict[str, Any]:
+    """
+    State file layout:
+    - articles: {canonical link: [content hash, date merged]} of the articles
+      merged in the last ARTICLE_RETENTION_DAYS (version 1 stored just the hash)
+    - cves: {CVE: {article_count, first_observed_date, victims}}
+    - high_water: newest publish date merged so far
+    """
+    state = new_state()
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state.update(json.load(f))
+        except (OSError, ValueError) as e:
+            logging.error("Could not read state %s (%s); starting from empty state.", path, e)
+            state = new_state()
+    if state.get("version", 1) < 2:
+        # Version 1 entries were bare hashes; date them by the last update
+        merged = (state.get("updated") or datetime.now(timezone.utc).isoformat())[:10]
+        state["articles"] = {link: [digest, merged] for link, digest in state["articles"].items()}
+        state["version"] = 2
+    state["_hashes"] = {entry[0] for entry in state["articles"].values()}
+    return state
+
+
+def prune_articles(state: Dict[str, Any], days: float = ARTICLE_RETENTION_DAYS) -> int:
+    """Forgets articles merged more than `days` ago; returns how many were dropped."""
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).date().isoformat()
+    articles = state["articles"]
+    expired = [link for link, (digest, merged) in articles.items() if merged < cutoff]
+    for link in expired:
+        del articles[link]
+    if expired:
+        state["_hashes"] = {entry[0] for entry in articles.values()}
+    return len(expired)
+
+
+def save_state(state: Dict[str, Any], path: str = STATE_FILE):
+    dropped = prune_articles(state)
+    if dropped:
+        logging.info("Forgot %d articles merged more than %g days ago", dropped, ARTICLE_RETENTION_DAYS)
+    state["updated"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    data = {k: v for k, v in state.items() if not k.startswith("_")}
+    atomic_write_file(path, json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+
+
+def merge_articles(state: Dict[str, Any], articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Merge articles into the state, skipping any already seen by canonical
+    link or content hash (also within this batch). Only the new articles
+    are scanned, and they are returned.
+    """
+    seen = state["articles"]
+    hashes = state.setdefault("_hashes", {entry[0] for entry in seen.values()})
+    today = datetime.now(timezone.utc).date().isoformat()
+    cves = state["cves"]
+    high_water = state.get("high_water")
+    new = []
     for art in articles:
+        link = canonical_link(art.get("link") or "")
+        digest = content_hash(art)
+        if (link and link in seen) or digest in hashes:
+            continue
+        seen[link or digest] = [digest, today]
+        hashes.add(digest)
+        new.append(art)
+
+        pub_dt = parse_date(art.get("publish_date_raw"))
+        pub_dt = _utc_naive(pub_dt) if pub_dt else None
+        # Future dates are bogus metadata and would stop paging for good
+        if pub_dt and pub_dt <= _utc_naive(datetime.now(timezone.utc)) and (
+                high_water is None or pub_dt > datetime.fromisoformat(high_water)):
+            high_water = pub_dt.isoformat()
+
         combined = " ".join(filter(None, [art.get("title"), art.get("snippet")]))
         cve = extract_cve(combined)
         if not cve:
             continue
-        if cve not in summary:
-            summary[cve] = {"article_count": 0, "first_observed_date": None, "victims": set()}
-        summary[cve]["article_count"] += 1
+        entry = cves.setdefault(cve, {"article_count": 0, "first_observed_date": None, "victims": []})
+        entry["article_count"] += 1
 
-        # Parse publish date
-        pub_dt = parse_date(art.get("publish_date_raw"))
         if pub_dt:
-            cur = summary[cve]["first_observed_date"]
-            if cur is None or pub_dt < cur:
-                summary[cve]["first_observed_date"] = pub_dt
-
-        # Basic victim detection and store snippet truncated
-        snippet = (art.get("snippet") or "").lower()
-        if any(key in snippet for key in ("victim", "affected", "compromised", "ransom")):
-            snippet_short = (art.get("snippet") or "")[:400]
-            summary[cve]["victims"].add(snippet_short)
-
-    # Convert to safe serializable structure and sanitize text
-    out: Dict[str, Dict[str, Any]] = {}
-    for cve, data in summary.items():
-        victims_list = [sanitize_for_markdown(v, maxlen=500) for v in data["victims"]]
-        out[cve] = {
-            "article_count": data["article_count"],
-            "first_observed_date": data["first_observed_date"].isoformat() if data["first_observed_date"] else None,
-            "victims": victims_list
-        }
-    return out
+            cur = entry["first_observed_date"]
+            if cur is None or pub_dt < _utc_naive(datetime.fromisoformat(cur)):
+                entry["first_observed_date"] = pub_dt.isoformat()
+
+        # Basic victim detection, stored sanitized
+        snippet = art.get("snippet") or ""
+        if any(key in snippet.lower() for key in VICTIM_WORDS):
+            victim = sanitize_for_markdown(snippet[:400], maxlen=500)
+            if victim not in entry["victims"]:
+                entry["victims"].append(victim)
+    state["high_water"] = high_water
+    return new
+
+
+def state_since(state: Dict[str, Any]) -> Optional[datetime]:
+    # Paging stops a little before the high-water date: late-indexed articles still get picked up
+    if not state.get("high_water"):
+        return None
+    return datetime.fromisoformat(state["high_water"]) - timedelta(days=HIGH_WATER_OVERLAP_DAYS)
+
+
+def state_summary(state: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    return {cve: {"article_count": d["article_count"], "first_observed_date": d["first_observed_date"],
+                  "victims": sorted(d["victims"])}
+            for cve, d in state["cves"].items()}
+
+
+def summarize_articles(articles: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    # Summary of one batch alone, duplicates counted once
+    state = new_state()
+    merge_articles(state, articles)
+    return state_summary(state)
 
 
 def write_articles_json(path: str, data: List[Dict[str, Any]]):
@@ -301,21 +749,44 @@ def update_readme_section(readme_path: str, summary: Dict[str, Dict[str, Any]]):
 
 
 def main():
-    articles = fetch_articles(KEYWORDS)
-    logging.info("Fetched %d articles", len(articles))
-
-    summary = summarize_articles(articles)
-    logging.info("Summarized %d CVEs", len(summary))
+    parser = argparse.ArgumentParser(description="Track CVE-2025 articles and summarize them in the README.")
+    parser.add_argument("--readme-only", action="store_true",
+                        help="regenerate the README section from the saved state without fetching")
+    args = parser.parse_args()
+
+    state = load_state(STATE_FILE)
+    if not args.readme_only:
+        articles: List[Dict[str, Any]] = []
+        new = []
+        failed: set = set()
+        high_water = state.get("high_water")
+        # Merge page by page as results stream in
+        for art in iter_articles(KEYWORDS, since=state_since(state), failed=failed):
+            articles.append(art)
+            new.extend(merge_articles(state, [art]))
+        logging.info("Fetched %d articles", len(articles))
+        if failed:
+            # The high-water date is shared by all keywords; moving it past
+            # articles a failed keyword never fetched would skip them next run
+            logging.error("%d keywords failed (%s); high-water date kept at %s",
+                          len(failed), ", ".join(sorted(failed)), high_water)
+            state["high_water"] = high_water
+
+        logging.info("Merged %d new articles; %d CVEs tracked", len(new), len(state["cves"]))
+        try:
+            save_state(state, STATE_FILE)
+        except Exception as e:
+            logging.error("Failed to save state: %s", e)
 
-    # Write sanitized JSON output
-    try:
-        write_articles_json(OUTPUT_FILE, articles)
-    except Exception as e:
-        logging.error("Failed to write articles JSON: %s", e)
+        # Write sanitized JSON output
+        try:
+            write_articles_json(OUTPUT_FILE, articles)
+        except Exception as e:
+            logging.error("Failed to write articles JSON: %s", e)
 
     # Update README idempotently and safely
     try:
-        update_readme_section(README_FILE, summary)
+        update_readme_section(README_FILE, state_summary(state))
     except Exception as e:
         logging.error("Failed to update README: %s", e)
 
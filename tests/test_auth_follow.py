@@ -0,0 +1,56 @@
+import json
+import socket
+
+import pytest
+
+from my_queen.auth_follow import AuthLogFollower
+
+
+def _journal_line(message, cursor):
+    return json.dumps({'MESSAGE': message, '__CURSOR': cursor, '__REALTIME_TIMESTAMP': '1714557600000000',
+                       '_HOSTNAME': 'pi', 'SYSLOG_IDENTIFIER': 'sshd', '_PID': '42'}).encode() + b'\n'
+
+
+def test_journal_follower_skips_invalid_json(caplog):
+    follower = AuthLogFollower(None, 'pi', 'user', journal=True)
+    chunks = [_journal_line('Failed password for root from 10.0.0.1 port 22 ssh2', 's=1'),
+              b'{"MESSAGE": "Failed password for root from 10.0\n', b'[1, 2]\n',
+              _journal_line('Failed password for admin from 10.0.0.2 port 22 ssh2', 's=2')]
+    follower._stream = lambda client, command: iter(chunks)
+
+    events = list(follower._follow_journal(None))
+
+    assert [event['ip'] for event in events] == ['10.0.0.1', '10.0.0.2']
+    assert follower.journal_cursor == 's=2'
+    assert len([r for r in caplog.records if 'not valid JSON' in r.getMessage()]) == 2
+
+
+class _TimedOutStdout:
+    class channel:
+        closed = False
+
+        @classmethod
+        def close(cls):
+            cls.closed = True
+
+    def read(self):
+        raise socket.timeout('timed out')
+
+
+class _Client:
+    def __init__(self):
+        self.timeouts = []
+
+    def exec_command(self, command, timeout=None):
+        self.timeouts.append(timeout)
+        return None, _TimedOutStdout(), None
+
+
+def test_inode_lookup_times_out_and_closes_its_channel():
+    follower = AuthLogFollower(None, 'pi', 'user', command_timeout=3)
+    client = _Client()
+
+    with pytest.raises(OSError):
+        follower._inode(client)
+    assert client.timeouts == [3]
+    assert _TimedOutStdout.channel.closed
